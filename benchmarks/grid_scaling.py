@@ -0,0 +1,77 @@
+"""Scaling of grid_search: combinations per second by worker count, against the
+per-combination loop it replaced (a fresh RealDataSim parsed from the CSV and a
+scalar StoikovStrategy run for every combination, one process).
+
+    python -m benchmarks.grid_scaling --combos 64 --workers 1 2 4 8
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from grid_search import grid_search
+from strategy.batch_stoikov import param_grid
+
+
+def stoikov_grid(n):
+    # n combinations of gamma x k (n rounded up to a multiple of 4)
+    gammas = np.linspace(0.01, 0.2, -(-n // 4))
+    return param_grid(gamma=gammas.tolist(), k=[0.5, 1.0, 1.5, 3.0], lambda_inventory=[0.02],
+                      order_size=[1])
+
+
+def time_loop(csv_path, grid, limit):
+    # seconds per combination of the old loop, over the first `limit` combinations
+    from simulator.real_data_sim import RealDataSim
+    from strategy.stoikov import StoikovStrategy
+    n = min(limit, len(grid['gamma']))
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as workdir, contextlib.redirect_stdout(io.StringIO()):
+        cwd = os.getcwd()
+        os.chdir(workdir)  # StoikovStrategy writes logs.csv
+        try:
+            for i in range(n):
+                sim = RealDataSim(os.path.join(cwd, csv_path), seed=i, use_cache=False)
+                StoikovStrategy(sim=sim, gamma=grid['gamma'][i], k=grid['k'][i], sigma=sim.realized_sigma,
+                                terminal_time=True, adjust_delay=1, order_size=1, min_order_size=1,
+                                precision=2, lambda_inventory=grid['lambda_inventory'][i]).run()
+        finally:
+            os.chdir(cwd)
+    return (time.perf_counter() - start) / n
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure grid_search scaling.')
+    parser.add_argument('--csv', default='BTCUSDT_1min.csv')
+    parser.add_argument('--combos', type=int, default=64)
+    parser.add_argument('--workers', type=int, nargs='+', default=None,
+                        help='worker counts (default: powers of two up to the CPU count)')
+    parser.add_argument('--loop-combos', type=int, default=8, help='combinations timed with the old loop')
+    args = parser.parse_args()
+
+    cpus = os.cpu_count()
+    workers = args.workers or [2 ** i for i in range(cpus.bit_length()) if 2 ** i <= cpus]
+    grid = stoikov_grid(args.combos)
+    n = len(grid['gamma'])
+    print(f"{n} Stoikov combinations on {args.csv}, {cpus} CPU(s)")
+
+    loop = time_loop(args.csv, grid, args.loop_combos)
+    print(f"{'per-run loop':>14}  {n * loop:8.2f}s (est.)  {1 / loop:8.1f} combos/s")
+    base = None
+    for w in workers:
+        start = time.perf_counter()
+        grid_search(args.csv, grid, None, workers=w)
+        seconds = time.perf_counter() - start
+        base = base or seconds * w
+        print(f"{w:>6} workers  {seconds:8.2f}s          {n / seconds:8.1f} combos/s  "
+              f"{n * loop / seconds:6.1f}x vs loop  efficiency {base / (seconds * w):5.0%}")
+    if cpus < max(workers):
+        print(f"note: more workers than the {cpus} CPU(s) here; efficiency beyond that is not meaningful")
+
+
+if __name__ == '__main__':
+    main()
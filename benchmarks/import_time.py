@@ -0,0 +1,68 @@
+"""Import-time budget for the command-line entry point.
+
+Each target imports its modules in a fresh interpreter under
+`python -X importtime`; the cost is the cumulative import time of those
+modules (median over --repeat runs). A target fails when it is over its
+budget or when it pulls in any of the heavy modules it must not load
+(plotting, network client, pandas).
+
+    python -m benchmarks.import_time            # exit code 1 when over budget
+    python -m benchmarks.import_time --repeat 9 --scale 2
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HEAVY = ('pandas', 'matplotlib', 'seaborn', 'ccxt')
+BACKTEST = ('cli', 'simulator.real_data_sim', 'strategy.stoikov', 'strategy.naive_mm',
+            'strategy.kernel', 'scripts.pnl')
+
+# name -> (modules, budget in ms, modules that must not be loaded). numpy alone is ~130 ms of
+# the backtest budget.
+TARGETS = {
+    'cli': (('cli',), 60, HEAVY),
+    'backtest': (BACKTEST, 350, HEAVY),
+}
+
+
+def measure(modules, forbidden):
+    # (import time in ms, forbidden modules that were loaded)
+    code = ("import sys\n" + "".join(f"import {m}\n" for m in modules) +
+            f"print(__import__('json').dumps([m for m in {list(forbidden)!r} if m in sys.modules]))")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=root,
+                          capture_output=True, text=True, check=True)
+    total_us = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line.split('|')
+        if name.strip() in modules and not name[1:].startswith(' '):
+            total_us += int(cumulative)
+    return total_us / 1000, json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--scale', type=float, default=1.0, help="multiply budgets (slow machines)")
+    args = parser.parse_args()
+
+    failed = False
+    for name, (modules, budget, forbidden) in TARGETS.items():
+        runs = [measure(modules, forbidden) for _ in range(args.repeat)]
+        ms = statistics.median(r[0] for r in runs)
+        loaded = sorted(set().union(*(r[1] for r in runs)))
+        limit = budget * args.scale
+        ok = ms <= limit and not loaded
+        failed |= not ok
+        extra = f"  loads {', '.join(loaded)}" if loaded else ""
+        print(f"{name:>10}  {ms:7.1f} ms  (budget {limit:.0f} ms)  {'ok' if ok else 'OVER BUDGET'}{extra}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""Startup time and memory of the columnar MarketData store vs. the old
+SimpleNamespace-per-row md_queue.
+
+    python -m benchmarks.md_store --rows 200000
+"""
+import argparse
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from simulator.market_data import MarketData
+
+
+def synthetic_frame(rows, start_price=60000.0, seed=0):
+    rng = np.random.default_rng(seed)
+    close = start_price * np.exp(np.cumsum(rng.normal(0, 5e-4, rows)))
+    return pd.DataFrame({
+        'timestamp': 1709251200000 + 1000 * np.arange(rows, dtype=np.int64),
+        'open': close,
+        'high': close,
+        'low': close,
+        'close': close,
+        'volume': rng.exponential(10.0, rows),
+    })
+
+
+def build_legacy(df, spread):
+    return [
+        SimpleNamespace(
+            receive_ts=row['timestamp'],
+            price=row['close'],
+            bid_price=row['close'] - spread / 2,
+            ask_price=row['close'] + spread / 2,
+            type='md'
+        )
+        for _, row in df.iterrows()
+        if not np.isnan(row['close'])
+    ]
+
+
+def build_columnar(df, spread):
+    return MarketData.from_frame(df, spread)
+
+
+def measure(build, df, spread):
+    tracemalloc.start()
+    start = time.perf_counter()
+    md_queue = build(df, spread)
+    elapsed = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return md_queue, elapsed, retained, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--spread', type=float, default=1.0)
+    args = parser.parse_args()
+
+    df = synthetic_frame(args.rows)
+    print(f"rows: {args.rows}")
+    results = {}
+    for name, build in (('legacy', build_legacy), ('columnar', build_columnar)):
+        md_queue, elapsed, retained, peak = measure(build, df, args.spread)
+        results[name] = md_queue
+        print(f"{name:>9}: build {elapsed:8.3f}s  retained {retained / 2**20:9.1f} MiB  "
+              f"peak {peak / 2**20:9.1f} MiB")
+
+    legacy, columnar = results['legacy'], results['columnar']
+    assert len(legacy) == len(columnar)
+    assert legacy[-1].price == columnar[-1].price
+    assert legacy[0].receive_ts == columnar[0].receive_ts
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,298 @@
+"""Benchmark suite on synthetic data at scale.
+
+Generates GBM/jump price paths of the requested sizes as binary tick caches
+(chunked, so 10^8 bars fit), then times simulator construction, tick()
+throughput, both strategies, compute_pnl, analyze_fills and batched reports. Every case runs
+in a fresh process so its peak RSS is measured in isolation. The compiled Stoikov kernel
+records whether it ran JIT-compiled (Numba installed) or as plain Python, and its speedup
+over the stoikov_run case of the same size. With --history,
+results are appended to a JSON history (default results/benchmark_history.json,
+untracked) and compared against the previous entry.
+
+    python -m benchmarks.run --sizes 1e4 1e5 1e6 --history
+    python -m benchmarks.run --sizes 1e8 --cases sim_construct tick
+"""
+import argparse
+import datetime
+import json
+import multiprocessing as mp
+import os
+import platform
+import resource
+import subprocess
+import tempfile
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from simulator.synthetic import write_synthetic_cache
+
+HISTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'results',
+                       'benchmark_history.json')
+REGRESSION_RATIO = 1.2
+
+
+def _stoikov(sim, verbose=False):
+    from strategy.stoikov import StoikovStrategy
+    return StoikovStrategy(sim=sim, gamma=0.05, k=1.5, sigma=sim.realized_sigma, terminal_time=True,
+                           adjust_delay=1, order_size=1, min_order_size=1, precision=2,
+                           verbose=verbose)
+
+
+def _synthetic_trades(n_ticks, n_trades, seed=0):
+    rng = np.random.default_rng(seed)
+    ts = np.sort(rng.integers(0, n_ticks, n_trades))
+    sides = np.where(rng.random(n_trades) < 0.5, 'BID', 'ASK')
+    prices = 60000 + rng.normal(0, 50, n_trades)
+    return [SimpleNamespace(order_id=i, ts=int(t), side=s, size=1, price=float(p), type='own_trade')
+            for i, (t, s, p) in enumerate(zip(ts, sides, prices))]
+
+
+def bench_sim_construct(data, n):
+    from simulator.real_data_sim import RealDataSim
+    start = time.perf_counter()
+    RealDataSim(data['ticks'])
+    return time.perf_counter() - start
+
+
+def bench_sim_construct_csv(data, n):
+    from simulator.real_data_sim import RealDataSim
+    start = time.perf_counter()
+    RealDataSim(data['csv'], use_cache=False)
+    return time.perf_counter() - start
+
+
+def bench_tick(data, n):
+    from simulator.real_data_sim import RealDataSim
+    sim = RealDataSim(data['ticks'])
+    tick = sim.tick
+    start = time.perf_counter()
+    while tick()[1] is not None:
+        pass
+    return time.perf_counter() - start
+
+
+def bench_stoikov_run(data, n):
+    from simulator.real_data_sim import RealDataSim
+    strategy = _stoikov(RealDataSim(data['ticks'], seed=0))
+    start = time.perf_counter()
+    strategy.run()
+    return time.perf_counter() - start
+
+
+def bench_stoikov_kernel(data, n):
+    from simulator.real_data_sim import RealDataSim
+    from strategy.kernel import HAVE_NUMBA, run_compiled
+    if HAVE_NUMBA:
+        run_compiled(_stoikov(RealDataSim(data['ticks'], seed=0)))  # JIT compile outside the timing
+    strategy = _stoikov(RealDataSim(data['ticks'], seed=0))
+    start = time.perf_counter()
+    run_compiled(strategy)
+    return time.perf_counter() - start, {'jit': HAVE_NUMBA}
+
+
+def bench_naive_run(data, n):
+    from simulator.real_data_sim import RealDataSim
+    from strategy.naive_mm import NaiveMMStrategy
+    strategy = NaiveMMStrategy(RealDataSim(data['ticks'], seed=0), base_spread=5, volatility_multiplier=2.0)
+    start = time.perf_counter()
+    strategy.run()
+    return time.perf_counter() - start
+
+
+def bench_compute_pnl(data, n):
+    from main_comparison import compute_pnl
+    from simulator import tick_cache
+    _, cols = tick_cache.open_columns(data['ticks'])
+    mid_prices = cols['close'].tolist()
+    trades = _synthetic_trades(n, max(1, n // 5))
+    start = time.perf_counter()
+    compute_pnl(trades, mid_prices)
+    return time.perf_counter() - start
+
+
+def bench_analyze_fills(data, n):
+    import contextlib
+    import io
+    from scripts.analyze_fills import analyze_fills
+    trades = _synthetic_trades(n, max(1, n // 5))
+    orders = [SimpleNamespace(order_id=i, ts=i, side='BID', size=1, price=60000.0, type='limit_order')
+              for i in range(n)]
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        analyze_fills(trades, orders)
+    return time.perf_counter() - start
+
+
+def bench_reports(data, n):
+    # 16 runs of n ticks each, rendered and summarized by the report subsystem
+    from scripts.report import generate_reports, run_data
+    from simulator import tick_cache
+    _, cols = tick_cache.open_columns(data['ticks'])
+    mid_prices = cols['close']
+    orders = [SimpleNamespace(type='limit_order')] * (n // 2)
+    runs = [run_data(f'run{i}', _synthetic_trades(n, max(1, n // 5), seed=i), orders, mid_prices)
+            for i in range(16)]
+    start = time.perf_counter()
+    generate_reports(runs, 'results/reports')
+    return time.perf_counter() - start
+
+
+# name -> (function, largest size run by default)
+CASES = {
+    'sim_construct': (bench_sim_construct, 10**8),
+    'sim_construct_csv': (bench_sim_construct_csv, 10**6),
+    'tick': (bench_tick, 10**8),
+    'stoikov_run': (bench_stoikov_run, 10**6),
+    'stoikov_kernel': (bench_stoikov_kernel, 10**7),
+    'naive_run': (bench_naive_run, 10**6),
+    'compute_pnl': (bench_compute_pnl, 10**7),
+    'analyze_fills': (bench_analyze_fills, 10**6),
+    'reports': (bench_reports, 10**6),
+}
+
+
+def _child(name, data, n, workdir, queue):
+    os.chdir(workdir)  # strategies and analyze_fills write logs.csv / results/*.png
+    os.environ['MPLBACKEND'] = 'Agg'
+    # a case returns its seconds, or (seconds, extra fields for its result)
+    seconds = CASES[name][0](data, n)
+    seconds, extra = seconds if isinstance(seconds, tuple) else (seconds, {})
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put({'seconds': seconds, 'peak_rss_mb': peak_kb / 1024, **extra})
+
+
+def run_case(name, data, n, workdir, timeout):
+    ctx = mp.get_context('spawn')
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_child, args=(name, data, n, workdir, queue))
+    proc.start()
+    proc.join(timeout)
+    if proc.is_alive():
+        proc.terminate()
+        proc.join()
+        return {'case': name, 'n': n, 'status': 'timeout'}
+    if proc.exitcode != 0 or queue.empty():
+        return {'case': name, 'n': n, 'status': f'failed (exit code {proc.exitcode})'}
+    result = queue.get()
+    return {'case': name, 'n': n, 'status': 'ok', **result, 'per_second': n / result['seconds']}
+
+
+def prepare_data(n, workdir, model, with_csv):
+    ticks = os.path.join(workdir, f'synthetic_{n}.ticks')
+    write_synthetic_cache(ticks, n, model=model, seed=n)
+    data = {'ticks': ticks}
+    if with_csv:
+        from simulator import tick_cache
+        import pandas as pd
+        _, cols = tick_cache.open_columns(ticks)
+        data['csv'] = os.path.join(workdir, f'synthetic_{n}.csv')
+        pd.DataFrame({name: cols[name] for name, _ in tick_cache.CACHE_COLUMNS}).to_csv(data['csv'], index=False)
+    return data
+
+
+def add_kernel_speedups(results):
+    # stoikov_kernel speedup over the reference loop (stoikov_run) at the same size, when both ran
+    reference = {r['n']: r['seconds'] for r in results if r['case'] == 'stoikov_run' and r['status'] == 'ok'}
+    for r in results:
+        if r['case'] == 'stoikov_kernel' and r['status'] == 'ok':
+            r['speedup'] = reference[r['n']] / r['seconds'] if r['n'] in reference else None
+
+
+def _numba_version():
+    try:
+        import numba
+    except ImportError:
+        return None
+    return numba.__version__
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare_to_previous(previous, results):
+    if previous is None:
+        return
+    before = {(r['case'], r['n']): r for r in previous['results'] if r.get('status') == 'ok'}
+    for r in results:
+        old = before.get((r['case'], r['n']))
+        if old is None or r.get('status') != 'ok':
+            continue
+        ratio = r['seconds'] / old['seconds']
+        flag = '  <-- REGRESSION' if ratio > REGRESSION_RATIO else ''
+        if r.get('jit') != old.get('jit'):
+            flag += '  (JIT on)' if r.get('jit') else '  (JIT off: numba not installed)'
+        print(f"{r['case']:>18} n={r['n']:<10} {ratio:6.2f}x vs {previous.get('commit')}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run benchmarks on synthetic data.')
+    parser.add_argument('--sizes', type=float, nargs='+', default=[1e4, 1e5])
+    parser.add_argument('--cases', nargs='+', choices=sorted(CASES), default=list(CASES))
+    parser.add_argument('--model', default='jump', choices=('arithmetic', 'gbm', 'jump'))
+    parser.add_argument('--no-limits', action='store_true', help='ignore per-case size limits')
+    parser.add_argument('--timeout', type=float, default=1800, help='seconds per case')
+    parser.add_argument('--history', nargs='?', const=HISTORY, default=None, metavar='PATH',
+                        help=f"append results to a JSON history and compare with the previous run "
+                             f"(default path: {os.path.relpath(HISTORY)})")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        os.makedirs(os.path.join(workdir, 'results'))
+        for n in sorted(int(s) for s in args.sizes):
+            cases = [c for c in args.cases if args.no_limits or n <= CASES[c][1]]
+            if not cases:
+                continue
+            data = prepare_data(n, workdir, args.model, with_csv='sim_construct_csv' in cases)
+            for name in cases:
+                r = run_case(name, data, n, workdir, args.timeout)
+                results.append(r)
+                if r['status'] == 'ok':
+                    print(f"{name:>18} n={n:<10} {r['seconds']:10.3f}s  {r['per_second']:14,.0f}/s  "
+                          f"peak RSS {r['peak_rss_mb']:9.1f} MiB")
+                else:
+                    print(f"{name:>18} n={n:<10} {r['status']}")
+            for path in data.values():
+                os.remove(path)
+    add_kernel_speedups(results)
+    for r in results:
+        if 'jit' in r:
+            speedup = f"{r['speedup']:.1f}x vs stoikov_run" if r['speedup'] else 'no stoikov_run to compare'
+            print(f"{'stoikov_kernel':>18} n={r['n']:<10} {'Numba JIT' if r['jit'] else 'plain Python (numba not installed)'}, {speedup}")
+
+    if not args.history:
+        return
+    history = load_history(args.history)
+    compare_to_previous(history[-1] if history else None, results)
+    history.append({
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'numba': _numba_version(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'model': args.model,
+        'results': results,
+    })
+    os.makedirs(os.path.dirname(os.path.abspath(args.history)), exist_ok=True)
+    with open(args.history, 'w') as f:
+        json.dump(history, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+"""Command-line entry point.
+
+    python cli.py backtest BTCUSDT_1min.ticks --gamma 0.1 --json results/run.json
+    python cli.py compare --seed 7 --stoikov gamma=0.1
+    python cli.py fetch --symbols BTC/USDT --timeframes 1m
+    python cli.py report BTCUSDT_1min.csv
+    python cli.py montecarlo BTCUSDT_1min.csv --paths 2000 --level 0.99
+
+Only argparse is imported up front; each subcommand imports what it needs
+when it runs. `backtest` is headless and stays on numpy: no plotting, no
+network client, and no pandas when the data is a .ticks file (or has a fresh
+.ticks cache next to it). Plotting libraries are loaded by `compare` and
+`report`, ccxt by `fetch`, the multiprocessing replays by `montecarlo`.
+`python -m benchmarks.import_time` checks the import-time budget.
+"""
+import argparse
+import sys
+
+
+def _add_run_args(parser, choose_strategy=True):
+    parser.add_argument('data', nargs='?', default='BTCUSDT_1min.csv', help="OHLCV CSV or .ticks file")
+    if choose_strategy:
+        parser.add_argument('--strategy', choices=('stoikov', 'naive'), default='stoikov')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--gamma', type=float, default=0.05)
+    parser.add_argument('--k', type=float, default=1.5)
+    parser.add_argument('--order-size', type=int, default=1)
+    parser.add_argument('--adjust-delay', type=int, default=1)
+    if choose_strategy:
+        parser.add_argument('--base-spread', type=float, default=5, help="naive strategy spread")
+        parser.add_argument('--volatility-multiplier', type=float, default=2.0, help="naive strategy")
+    parser.add_argument('--compiled', action='store_true',
+                        help="run Stoikov through the compiled kernel (strategy.kernel)")
+    parser.add_argument('--walk-forward', type=int, metavar='BARS', default=None,
+                        help="recalibrate Stoikov k / sigma and the fill model every BARS bars "
+                             "from the preceding BARS bars (strategy.calibration)")
+    parser.add_argument('--calib-cache', default=None, help="pickle file to keep calibration fits")
+    parser.add_argument('--verbose', action='store_true', help="print risk events as they happen")
+
+
+def run_backtest(args):
+    # (strategy, trades, orders, mid prices) for the parsed backtest arguments
+    from simulator.real_data_sim import RealDataSim
+    sim = RealDataSim(args.data, seed=args.seed)
+    if getattr(args, 'strategy', 'stoikov') == 'naive':
+        for flag, value in (('--compiled', args.compiled), ('--walk-forward', args.walk_forward),
+                            ('--calib-cache', args.calib_cache)):
+            if value:
+                raise SystemExit(f"{flag} applies to the Stoikov strategy only, not --strategy naive")
+        from strategy.naive_mm import NaiveMMStrategy
+        strategy = NaiveMMStrategy(sim, base_spread=args.base_spread,
+                                   volatility_multiplier=args.volatility_multiplier,
+                                   order_size=args.order_size)
+        trades, mid_prices = strategy.run()
+        return strategy, trades, None, mid_prices
+
+    from strategy.stoikov import StoikovStrategy
+    strategy = StoikovStrategy(sim=sim, gamma=args.gamma, k=args.k, sigma=sim.realized_sigma,
+                               terminal_time=True, adjust_delay=args.adjust_delay,
+                               order_size=args.order_size, min_order_size=1, precision=2,
+                               verbose=args.verbose)
+    if args.walk_forward:
+        if args.compiled:
+            raise SystemExit("--walk-forward changes parameters mid-run; it cannot be --compiled")
+        from strategy.calibration import FitCache, calibrate, run_walk_forward
+        cache = FitCache.load(args.calib_cache) if args.calib_cache else None
+        calib = calibrate(sim.md_queue, window=args.walk_forward, symbol=args.data, cache=cache)
+        if args.calib_cache:
+            cache.save(args.calib_cache)
+        trades, _, _, orders = run_walk_forward(strategy, calib)
+    elif args.compiled:
+        from strategy.kernel import run_compiled
+        trades, _, _, orders = run_compiled(strategy)
+    else:
+        trades, _, _, orders = strategy.run()
+    # the recorder keeps no md by default; every bar was replayed, so the mids are the sim's
+    return strategy, trades, orders, sim.md_queue.price
+
+
+def backtest(args):
+    import json
+    from scripts.pnl import pnl_series, summary
+    strategy, trades, _, mid_prices = run_backtest(args)
+    stats = summary(pnl_series(trades, mid_prices))
+    # resting orders placed, counted by the engine whether or not the recorder keeps them
+    stats.update(n_trades=len(trades), n_orders=strategy.engine.n_orders)
+    print(f"[{args.strategy}] PnL {stats['final_pnl']:.2f}, max drawdown {stats['max_drawdown']:.2f}, "
+          f"max |inventory| {stats['max_abs_inventory']:.0f}, {stats['n_trades']} trades")
+    if args.json:
+        with open(args.json, 'w') as f:
+            options = {name: value for name, value in vars(args).items() if name != 'func'}
+            json.dump({'args': options, 'summary': stats}, f, indent=2)
+
+
+def _param(text):
+    # NAME=VALUE with VALUE read as int, float, true/false or else a string
+    name, sep, value = text.partition('=')
+    if not sep or not name:
+        raise argparse.ArgumentTypeError(f"expected NAME=VALUE, got {text!r}")
+    for convert in (int, float):
+        try:
+            return name, convert(value)
+        except ValueError:
+            pass
+    return name, {'true': True, 'false': False}.get(value.lower(), value)
+
+
+def compare(args):
+    from main_comparison import main
+    main(show=args.show, seed=args.seed, cache_dir=None if args.no_cache else args.cache_dir,
+         stoikov_params=dict(args.stoikov), naive_params=dict(args.naive))
+
+
+def fetch(args):
+    from get_binance_data import main
+    main(args.fetch_args)
+
+
+def montecarlo(args):
+    from monte_carlo import main
+    main(args.forward_args)
+
+
+def report(args):
+    from scripts.report import generate_reports, run_data
+    runs = []
+    for seed in args.seeds or [args.seed]:
+        args.seed = seed
+        strategy, trades, orders, mid_prices = run_backtest(args)
+        name = 'run' if seed is None else f'seed{seed}'
+        runs.append(run_data(name, trades, orders, mid_prices, strategy.logs))
+    rows = generate_reports(runs, args.out_dir, workers=args.workers, max_points=args.max_points,
+                            horizon=args.horizon)
+    for row in rows:
+        print(f"{row['run']}: fill rate {row['fill_rate']:.2%}, avg fill {row['avg_fill_price']:.2f}, "
+              f"adverse selection {row['adverse_selection']:.2f}, PnL {row['final_pnl']:.2f}, "
+              f"max drawdown {row['max_drawdown']:.2f}")
+    print(f"reports and summary.csv written to {args.out_dir}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='cli.py', description="mm-lab market-making simulator")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('backtest', help="headless backtest, prints a PnL summary")
+    _add_run_args(p)
+    p.add_argument('--json', help="also write the arguments and summary to this JSON file")
+    p.set_defaults(func=backtest)
+
+    p = sub.add_parser('compare', help="Stoikov vs naive market maker, plot saved to results/comparison.png")
+    p.add_argument('--show', action='store_true', help="also open the plot window")
+    p.add_argument('--seed', type=int, default=None,
+                   help="seed the fills; seeded runs are cached (simulator.run_cache)")
+    p.add_argument('--cache-dir', default='results/cache')
+    p.add_argument('--no-cache', action='store_true', help="always simulate")
+    p.add_argument('--stoikov', type=_param, action='append', default=[], metavar='NAME=VALUE',
+                   help="override a StoikovStrategy parameter, e.g. --stoikov gamma=0.1 (repeatable)")
+    p.add_argument('--naive', type=_param, action='append', default=[], metavar='NAME=VALUE',
+                   help="override a NaiveMMStrategy parameter, e.g. --naive base_spread=8 (repeatable)")
+    p.set_defaults(func=compare)
+
+    # everything after `fetch` is passed on to get_binance_data.py
+    p = sub.add_parser('fetch', add_help=False,
+                       help="download OHLCV history (get_binance_data.py; see fetch --help)")
+    p.set_defaults(func=fetch)
+
+    # everything after `montecarlo` is passed on to monte_carlo.py
+    p = sub.add_parser('montecarlo', add_help=False,
+                       help="PnL / drawdown distributions, VaR and CVaR over many fill seeds "
+                            "(monte_carlo.py; see montecarlo --help)")
+    p.set_defaults(func=montecarlo)
+
+    p = sub.add_parser('report', help="headless Stoikov run reports (PNG per run + summary.csv)")
+    _add_run_args(p, choose_strategy=False)
+    p.add_argument('--seeds', type=int, nargs='+', help="one run per seed")
+    p.add_argument('--out-dir', default='results/reports')
+    p.add_argument('--workers', type=int, default=None, help="report processes (default: all cores)")
+    p.add_argument('--max-points', type=int, default=2000, help="points per plotted series")
+    p.add_argument('--horizon', type=int, default=10, help="adverse selection horizon in bars")
+    p.set_defaults(func=report)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args, rest = parser.parse_known_args(argv)
+    if args.command == 'fetch':
+        args.fetch_args = rest
+    elif args.command == 'montecarlo':
+        args.forward_args = rest
+    elif rest:
+        parser.error(f"unrecognized arguments: {' '.join(rest)}")
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
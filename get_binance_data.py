@@ -1,24 +1,58 @@
-import ccxt
-import pandas as pd
-
-
-symbol = 'BTC/USDT'
-timeframe = '1m'  
-since = ccxt.binance().parse8601('2024-03-01T00:00:00Z')
-limit = 1000  
-
-
-exchange = ccxt.binance()
-
-
-ohlcv = exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=limit)
-
-
-df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-df['datetime'] = pd.to_datetime(df['timestamp'], unit='ms')
-
-
-df.to_csv('BTCUSDT_1min.csv', index=False)
-
-
-print(df.head())
+import argparse
+import asyncio
+import os
+
+from simulator.downloader import StubExchange, download, store_path
+from simulator import tick_cache
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Download OHLCV history into .ticks stores '
+                                                 '(BTC/USDT 1m -> BTCUSDT_1min.ticks), resuming '
+                                                 'after the last stored bar.')
+    parser.add_argument('--symbols', nargs='+', default=['BTC/USDT'])
+    parser.add_argument('--timeframes', nargs='+', default=['1m'])
+    parser.add_argument('--since', default='2024-03-01T00:00:00Z', help='ISO 8601 start (ignored when resuming)')
+    parser.add_argument('--until', default=None, help='ISO 8601 end, exclusive (default: last closed bar)')
+    parser.add_argument('--exchange', default='binance')
+    parser.add_argument('--out-dir', default='.')
+    parser.add_argument('--limit', type=int, default=1000, help='bars per request')
+    parser.add_argument('--max-concurrent', type=int, default=4)
+    parser.add_argument('--stub', action='store_true', help='use the offline StubExchange')
+    return parser.parse_args(argv)
+
+
+async def run(args):
+    if args.stub:
+        exchange = StubExchange()
+    else:
+        import ccxt.async_support as ccxt
+        exchange = getattr(ccxt, args.exchange)({'enableRateLimit': False})  # RateLimiter paces requests
+    try:
+        since = exchange.parse8601(args.since) if hasattr(exchange, 'parse8601') else _parse8601(args.since)
+        until = None
+        if args.until:
+            until = exchange.parse8601(args.until) if hasattr(exchange, 'parse8601') else _parse8601(args.until)
+        pairs = [(s, tf) for s in args.symbols for tf in args.timeframes]
+        return await download(exchange, pairs, args.out_dir, since, until, args.limit, args.max_concurrent)
+    finally:
+        if hasattr(exchange, 'close'):
+            await exchange.close()
+
+
+def _parse8601(text):
+    from datetime import datetime
+    return int(datetime.fromisoformat(text.replace('Z', '+00:00')).timestamp() * 1000)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    added = asyncio.run(run(args))
+    for (symbol, timeframe), n in added.items():
+        path = store_path(args.out_dir, symbol, timeframe)
+        total = tick_cache.read_header(path).n_rows if os.path.exists(path) else 0
+        print(f"{symbol} {timeframe}: +{n} bars, {total} stored in {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+"""Parallel parameter sweep for StoikovStrategy and NaiveMMStrategy.
+
+The CSV is parsed once; workers attach to one shared-memory copy of the market
+data. Stoikov combinations are evaluated in vectorized chunks with
+BatchStoikovEngine, NaiveMM combinations one run per task. Every task gets a
+seed derived from (base seed, task id), so results do not depend on the number
+of workers or on scheduling order. Both strategies are marked to the bar close
+price at every bar: final_pnl and max_drawdown are comparable across rows.
+
+    python grid_search.py --gamma 0.01 0.05 0.1 --k 0.5 1.5 --workers 8
+"""
+import argparse
+import csv
+import multiprocessing as mp
+import os
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from simulator.market_data import MarketData
+from scripts.pnl import pnl_series, summary
+from simulator.real_data_sim import RealDataSim
+from strategy.batch_stoikov import BatchStoikovEngine, param_grid
+from strategy.naive_mm import NaiveMMStrategy
+
+STOIKOV_FIELDS = ('gamma', 'k', 'lambda_inventory', 'order_size')
+NAIVE_FIELDS = ('base_spread', 'volatility_multiplier', 'order_size', 'max_inventory')
+
+_worker = {}
+
+
+def task_seeds(base_seed, n):
+    return [int(s.generate_state(1)[0]) for s in np.random.SeedSequence(base_seed).spawn(n)]
+
+
+def build_tasks(stoikov_grid, naive_grid, base_seed=0, chunk_size=64):
+    # Returns [(kind, [(task_id, seed, params), ...]), ...]; Stoikov tasks are chunked into batch lanes.
+    tasks = []
+    n_stoikov = len(next(iter(stoikov_grid.values()))) if stoikov_grid else 0
+    n_naive = len(next(iter(naive_grid.values()))) if naive_grid else 0
+    seeds = task_seeds(base_seed, n_stoikov + n_naive)
+
+    lanes = [(i, seeds[i], {f: stoikov_grid[f][i] for f in stoikov_grid}) for i in range(n_stoikov)]
+    for start in range(0, n_stoikov, chunk_size):
+        tasks.append(('stoikov', lanes[start:start + chunk_size]))
+    for j in range(n_naive):
+        i = n_stoikov + j
+        tasks.append(('naive', [(i, seeds[i], {f: naive_grid[f][j] for f in naive_grid})]))
+    return tasks
+
+
+def _init_worker(shm_name, n_rows, realized_sigma, sim_kwargs):
+    shm, md_queue = MarketData.attach_shared(shm_name, n_rows)
+    _worker.update(shm=shm, md_queue=md_queue, sigma=realized_sigma, sim_kwargs=sim_kwargs)
+
+
+def _run_task(task):
+    kind, lanes = task
+    md_queue, sigma, sim_kwargs = _worker['md_queue'], _worker['sigma'], _worker['sim_kwargs']
+    if kind == 'stoikov':
+        return run_stoikov_lanes(md_queue, sigma, sim_kwargs, lanes)
+    return [run_naive(md_queue, sigma, sim_kwargs, *lane) for lane in lanes]
+
+
+def run_stoikov_lanes(md_queue, sigma, sim_kwargs, lanes):
+    sim = RealDataSim.from_market_data(md_queue, sigma, **sim_kwargs)
+    params = {f: np.array([p[f] for _, _, p in lanes]) for f in lanes[0][2]}
+    engine = BatchStoikovEngine(sim, sigma=sigma, seeds=[s for _, s, _ in lanes], **params)
+    res = engine.run()
+    mid = np.asarray(md_queue.price)
+    rows = []
+    for j, (task_id, seed, p) in enumerate(lanes):
+        # the series are sampled before each step's orders: shift by one to the state after a step
+        cash = np.append(res.realized_pnl[j][1:], res.cash[j])
+        inventory = np.append(res.inventory[j][1:], res.cur_pos[j])
+        series = mark_to_mid(res.time, cash, inventory, mid)
+        drawdown = summary(series)['max_drawdown']
+        rows.append(dict(task_id=task_id, strategy='stoikov', seed=seed, **p, max_inventory=engine.max_inventory,
+                         final_pnl=res.cash[j] + res.cur_pos[j] * mid[-1], max_drawdown=drawdown,
+                         cur_pos=res.cur_pos[j], cash=res.cash[j],
+                         n_trades=res.n_trades[j], n_orders=res.n_orders[j]))
+    return rows
+
+
+def run_naive(md_queue, sigma, sim_kwargs, task_id, seed, params):
+    sim = RealDataSim.from_market_data(md_queue, sigma, seed=seed, **sim_kwargs)
+    strategy = NaiveMMStrategy(sim=sim, **params)
+    trades, mid_prices = strategy.run()
+    inventory, cash = strategy.cur_pos, strategy.cash
+    # every NAIVE_FIELDS column, from the strategy's settings (defaults included)
+    settings = {f: getattr(strategy, f) for f in NAIVE_FIELDS}
+    return dict(task_id=task_id, strategy='naive', seed=seed, **settings,
+                final_pnl=cash + inventory * mid_prices[-1] if mid_prices else cash,
+                max_drawdown=summary(pnl_series(trades, mid_prices))['max_drawdown'],
+                cur_pos=inventory, cash=cash, n_trades=len(trades),
+                n_orders=strategy.engine.n_orders)
+
+
+def mark_to_mid(times, cash, inventory, mid):
+    # PnL series at every mid price (scripts.pnl.pnl_series fields) of a run whose cash and
+    # inventory are known after each step in `times`; the state after step t holds from mid index
+    # t on, as trades with ts == t do in pnl_series
+    idx = np.searchsorted(times, np.arange(len(mid)), side='right') - 1
+    held = idx >= 0
+    inventory = np.where(held, inventory[idx], 0.0)
+    cash = np.where(held, cash[idx], 0.0)
+    unrealized = inventory * mid
+    pnl = cash + unrealized
+    peak = np.maximum(np.maximum.accumulate(pnl), 0.0) if len(pnl) else pnl
+    return SimpleNamespace(inventory=inventory, cash=cash, realized=cash, unrealized=unrealized,
+                           pnl=pnl, drawdown=peak - pnl)
+
+
+def grid_search(csv_path, stoikov_grid=None, naive_grid=None, workers=None, base_seed=0,
+                chunk_size=None, out_path=None, spread=1.0):
+    sim = RealDataSim(csv_path, spread=spread)
+    sigma, md_queue = sim.realized_sigma, sim.md_queue
+    sim_kwargs = dict(spread=spread)
+    workers = workers or os.cpu_count()
+
+    n_stoikov = len(next(iter(stoikov_grid.values()))) if stoikov_grid else 0
+    if chunk_size is None:
+        # A few chunks per worker keeps the pool balanced while lanes stay vectorized.
+        chunk_size = max(1, min(256, -(-n_stoikov // (4 * workers))))
+    tasks = build_tasks(stoikov_grid, naive_grid, base_seed, chunk_size)
+
+    shm = md_queue.to_shared_memory()
+    rows = []
+    out_file = writer = None
+    try:
+        with mp.Pool(workers, initializer=_init_worker,
+                     initargs=(shm.name, len(md_queue), sigma, sim_kwargs)) as pool:
+            for chunk in pool.imap_unordered(_run_task, tasks):
+                rows.extend(chunk)
+                if out_path:
+                    if writer is None:
+                        out_file = open(out_path, 'w', newline='')
+                        fields = ['task_id', 'strategy', 'seed', *STOIKOV_FIELDS, *NAIVE_FIELDS,
+                                  'final_pnl', 'max_drawdown', 'cur_pos', 'cash', 'n_trades', 'n_orders']
+                        writer = csv.DictWriter(out_file, fieldnames=list(dict.fromkeys(fields)))
+                        writer.writeheader()
+                    writer.writerows(chunk)
+                    out_file.flush()
+    finally:
+        if out_file is not None:
+            out_file.close()
+        shm.close()
+        shm.unlink()
+
+    return pd.DataFrame(rows).sort_values('task_id').reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--csv', default='BTCUSDT_1min.csv')
+    parser.add_argument('--gamma', type=float, nargs='+', default=[0.01, 0.05, 0.1, 0.2])
+    parser.add_argument('--k', type=float, nargs='+', default=[0.5, 1.0, 1.5, 3.0])
+    parser.add_argument('--lambda-inventory', type=float, nargs='+', default=[0.02])
+    parser.add_argument('--order-size', type=float, nargs='+', default=[1])
+    parser.add_argument('--base-spread', type=float, nargs='*', default=[5, 10])
+    parser.add_argument('--volatility-multiplier', type=float, nargs='*', default=[1.5, 2.0])
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default='results/grid_search.csv')
+    args = parser.parse_args()
+
+    stoikov_grid = param_grid(gamma=args.gamma, k=args.k, lambda_inventory=args.lambda_inventory,
+                              order_size=args.order_size)
+    naive_grid = None
+    if args.base_spread and args.volatility_multiplier:
+        naive_grid = param_grid(base_spread=args.base_spread,
+                                volatility_multiplier=args.volatility_multiplier)
+    results = grid_search(args.csv, stoikov_grid, naive_grid, workers=args.workers,
+                          base_seed=args.seed, out_path=args.out)
+    print(results.sort_values('final_pnl', ascending=False).head(10).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
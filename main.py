@@ -1,75 +1,61 @@
-import ccxt
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+import asyncio
 import time
 
 from strategy.stoikov import StoikovStrategy
 from simulator.real_data_sim import RealDataSim
-from scripts.analyze_fills import analyze_fills
-
-plt.ion()
-
-
-print("Fetching fresh data from Binance...")
-symbol = 'BTC/USDT'
-timeframe = '1m'
-since = int((time.time() - 60 * 60 * 24) * 1000)
-limit = 1000
-
-exchange = ccxt.binance()
-ohlcv = exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=limit)
-df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-df['datetime'] = pd.to_datetime(df['timestamp'], unit='ms')
-df.to_csv('BTCUSDT_1min.csv', index=False)
-print("Data fetched and saved.")
-
-# --- Run simulation ---
-sns.set_style("whitegrid")
-sim = RealDataSim('BTCUSDT_1min.csv', spread=1.0, k_bid=1.5, k_ask=1.5)
-sigma = sim.realized_sigma
-print(f"Realized sigma: {sigma:.4f}")
-
-strategy = StoikovStrategy(
-    sim=sim,
-    gamma=0.05,
-    k=1.5,
-    sigma=sigma,
-    terminal_time=True,
-    adjust_delay=1,
-    order_size=1,
-    min_order_size=1,
-    precision=2
-)
-
-trades, md, updates, orders = strategy.run()
-
-
-plt.figure(figsize=(12, 8))
-
-plt.plot(strategy.time_list, strategy.realized_pnl_list, label='Realized PnL', color='blue')
-plt.plot(strategy.time_list, strategy.unrealized_pnl_list, label='Unrealized PnL', color='orange', linestyle='--')
-plt.plot(strategy.time_list, strategy.pnl_list, label='Total PnL', color='green')
-
-for log in strategy.logs:
-    if log['event'] == 'drawdown_pause':
-        plt.axvline(log['time'], color='red', linestyle='--', alpha=0.6, label='Pause' if 'Pause' not in plt.gca().get_legend_handles_labels()[1] else "")
-    elif log['event'] == 'resume_trading':
-        plt.axvline(log['time'], color='lime', linestyle='--', alpha=0.6, label='Resume' if 'Resume' not in plt.gca().get_legend_handles_labels()[1] else "")
-
-plt.title('PnL Breakdown with Risk Events')
-plt.xlabel('Time')
-plt.ylabel('PnL')
-plt.legend()
-plt.grid(True)
-plt.tight_layout()
-plt.savefig('results/pnl_breakdown_with_logs.png')
-plt.show()
-
-analyze_fills(trades, orders)
-
-
-
-
-
-
+from simulator.downloader import store_path, sync_store
+from simulator.tick_cache import realized_sigma
+
+
+def main():
+    # network and plotting libraries are imported here, not at module import
+    import ccxt
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    from scripts.analyze_fills import analyze_fills
+    from scripts.report import plot_pnl_breakdown
+
+    plt.ion()
+
+    print("Syncing recent data from Binance...")
+    symbol = 'BTC/USDT'
+    timeframe = '1m'
+    since = int((time.time() - 60 * 60 * 24) * 1000)
+    limit = 1000
+
+    # Appends only bars newer than the last stored one, so repeated runs fetch just the new minutes
+    exchange = ccxt.binance()
+    store = store_path('.', symbol, timeframe)
+    added = asyncio.run(sync_store(exchange, symbol, timeframe, store, since))
+    print(f"{added} new bars appended to {store}.")
+
+    # --- Run simulation ---
+    sns.set_style("whitegrid")
+    # simulate the most recent `limit` bars of the store
+    md_queue = RealDataSim(store).md_queue[-limit:]
+    sigma = realized_sigma(md_queue.price)
+    sim = RealDataSim.from_market_data(md_queue, sigma, spread=1.0, k_bid=1.5, k_ask=1.5)
+    print(f"Realized sigma: {sigma:.4f}")
+
+    strategy = StoikovStrategy(
+        sim=sim,
+        gamma=0.05,
+        k=1.5,
+        sigma=sigma,
+        terminal_time=True,
+        adjust_delay=1,
+        order_size=1,
+        min_order_size=1,
+        precision=2
+    )
+
+    trades, _, _, orders = strategy.run()
+
+    plot_pnl_breakdown(strategy, 'results/pnl_breakdown_with_logs.png')
+    plt.show()
+
+    analyze_fills(trades, orders, mid_prices=md_queue.price)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,82 +1,133 @@
 
+import numpy as np
+
 from strategy.stoikov import StoikovStrategy
 from strategy.naive_mm import NaiveMMStrategy
 from simulator.real_data_sim import RealDataSim
-import matplotlib.pyplot as plt
-import seaborn as sns
-import pandas as pd
-
-sns.set_style("whitegrid")
-
-sim = RealDataSim('BTCUSDT_1min.csv', spread=1.0, k_bid=1.5, k_ask=1.5)
-sigma = sim.realized_sigma
-print(f"Realized sigma: {sigma:.4f}")
-
-stoikov = StoikovStrategy(
-    sim=sim,
-    gamma=0.05,
-    k=1.5,
-    sigma=sigma,
-    terminal_time=True,
-    adjust_delay=1,
-    order_size=1,
-    min_order_size=1,
-    precision=2
-)
-trades_stoikov, md, updates_stoikov, orders_stoikov = stoikov.run()
-
-sim_naive = RealDataSim('BTCUSDT_1min.csv', spread=1.0, k_bid=1.5, k_ask=1.5)
-naive = NaiveMMStrategy(
-    sim=sim_naive,
-    base_spread=5,            
-    volatility_multiplier=2.0, 
-    order_size=1,
-    max_inventory=10,
-    precision=2
-)
-trades_naive, mid_prices_naive = naive.run()
-print(f"[NaiveMM] Executed {len(trades_naive)} trades")
+from scripts.pnl import pnl_series, summary, trade_arrays
+from scripts.report import minmax_decimate
+from simulator import tick_cache
+from simulator.run_cache import RunCache, code_digest
+
+SIM_SETTINGS = dict(spread=1.0, k_bid=1.5, k_ask=1.5)
+STOIKOV_PARAMS = dict(gamma=0.05, k=1.5, terminal_time=True, adjust_delay=1, order_size=1,
+                      min_order_size=1, precision=2)
+NAIVE_PARAMS = dict(base_spread=5, volatility_multiplier=2.0, order_size=1, max_inventory=10,
+                    precision=2)
+# modules whose source is part of the cache key
+RUN_MODULES = ('strategy.stoikov', 'strategy.naive_mm', 'strategy.engine', 'strategy.quotes',
+               'strategy.volatility', 'strategy.execution', 'strategy.recorder',
+               'simulator.real_data_sim', 'simulator.market_data', 'simulator.tick_cache')
+
 
 # --- Evaluate PnL and Inventory ---
 def compute_pnl(trades, mid_prices):
-    inventory, pnl, pos, cash = [], [], 0, 0
-    for i, mid in enumerate(mid_prices):
-        ts_trades = [tr for tr in trades if tr.ts == i]
-        for tr in ts_trades:
-            if tr.side == 'BID':
-                pos += tr.size
-                cash -= tr.price * tr.size
-            else:
-                pos -= tr.size
-                cash += tr.price * tr.size
-        inventory.append(pos)
-        pnl.append(cash + pos * mid)
-    return pd.Series(inventory), pd.Series(pnl)
-
-mid_prices = [u.price for u in md]
-inv_s, pnl_s = compute_pnl(trades_stoikov, mid_prices)
-inv_n, pnl_n = compute_pnl(trades_naive, mid_prices_naive)
-
-
-plt.figure(figsize=(14, 10))
-
-plt.subplot(3, 1, 1)
-plt.plot(mid_prices, label='Mid Price')
-plt.title("Mid Price")
-plt.legend()
-
-plt.subplot(3, 1, 2)
-plt.plot(inv_s, label='Stoikov Inventory', alpha=0.6)
-plt.plot(inv_n, label='NaiveMM Inventory', alpha=0.6)
-plt.title("Inventory Comparison")
-plt.legend()
-
-plt.subplot(3, 1, 3)
-plt.plot(pnl_s, label='Stoikov PnL', alpha=0.9)
-plt.plot(pnl_n, label='NaiveMM PnL', alpha=0.9)
-plt.title("PnL Comparison")
-plt.xlabel("Time")
-plt.legend()
-
-plt.tight_layout()
-plt.show()
+    import pandas as pd
+    series = pnl_series(trades, mid_prices)
+    return pd.Series(series.inventory), pd.Series(series.pnl)
+
+
+def run_outputs(trades, mid_prices, sigma, n_orders=0):
+    # compact, cacheable form of a run: fills as (ts, signed size, price) arrays plus the mids
+    ts, signed_size, price = trade_arrays(trades)
+    return dict(ts=ts, signed_size=signed_size, price=price,
+                mid=np.asarray(mid_prices, dtype=np.float64), sigma=sigma, n_orders=n_orders)
+
+
+def compare_runs(data='BTCUSDT_1min.csv', seed=None, cache=None, stoikov_params=None,
+                 naive_params=None):
+    # {'Stoikov': outputs, 'NaiveMM': outputs}. With a seed and a RunCache, each run is read from
+    # the cache when its data, settings, parameters, seed and code are unchanged, and the data
+    # is only loaded if some run has to be simulated.
+    stoikov_params = {**STOIKOV_PARAMS, **(stoikov_params or {})}
+    naive_params = {**NAIVE_PARAMS, **(naive_params or {})}
+    loaded = {}
+
+    def market_data():
+        if not loaded:
+            sim = RealDataSim(data, **SIM_SETTINGS)
+            loaded.update(md_queue=sim.md_queue, sigma=sim.realized_sigma)
+        return loaded['md_queue'], loaded['sigma']
+
+    def run_stoikov():
+        md_queue, sigma = market_data()
+        sim = RealDataSim.from_market_data(md_queue, sigma, seed=seed, **SIM_SETTINGS)
+        stoikov = StoikovStrategy(sim=sim, sigma=sigma, **stoikov_params)
+        trades, _, _, orders = stoikov.run()
+        return run_outputs(trades, md_queue.price, sigma, len(orders))
+
+    def run_naive():
+        md_queue, sigma = market_data()
+        sim = RealDataSim.from_market_data(md_queue, sigma, seed=seed, **SIM_SETTINGS)
+        naive = NaiveMMStrategy(sim=sim, **naive_params)
+        trades, mid_prices = naive.run()
+        return run_outputs(trades, mid_prices, sigma, naive.engine.n_orders)
+
+    runs = {'Stoikov': (run_stoikov, stoikov_params), 'NaiveMM': (run_naive, naive_params)}
+    if cache is None or seed is None:
+        return {name: run() for name, (run, _) in runs.items()}
+    # digest of the file actually read (a fetched or converted .ticks next to the CSV wins)
+    common = dict(data=cache.data_digest(tick_cache.source_path(data)), sim=SIM_SETTINGS, seed=seed,
+                  code=code_digest(RUN_MODULES))
+    return {name: cache.cached(cache.key(strategy=name, params=params, **common), run)
+            for name, (run, params) in runs.items()}
+
+
+def main(show=True, max_points=5000, seed=None, cache_dir='results/cache', data='BTCUSDT_1min.csv',
+         stoikov_params=None, naive_params=None):
+    # seed=None keeps the unseeded (random) fills and does not use the cache; *_params override
+    # STOIKOV_PARAMS / NAIVE_PARAMS
+    import matplotlib
+    if not show:
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    sns.set_style("whitegrid")
+
+    cache = RunCache(cache_dir) if cache_dir and seed is not None else None
+    runs = compare_runs(data, seed, cache, stoikov_params, naive_params)
+    out_s, out_n = runs['Stoikov'], runs['NaiveMM']
+    print(f"Realized sigma: {float(out_s['sigma']):.4f}")
+    print(f"[NaiveMM] Executed {len(out_n['ts'])} trades")
+    if cache is not None:
+        print(f"run cache: {cache.hits} hits, {cache.misses} simulated ({cache.root})")
+
+    mid_prices = out_s['mid']
+    series_s = pnl_series((out_s['ts'], out_s['signed_size'], out_s['price']), mid_prices)
+    series_n = pnl_series((out_n['ts'], out_n['signed_size'], out_n['price']), out_n['mid'])
+    inv_s, pnl_s = series_s.inventory, series_s.pnl
+    inv_n, pnl_n = series_n.inventory, series_n.pnl
+    for name, series in (('Stoikov', series_s), ('NaiveMM', series_n)):
+        stats = summary(series)
+        print(f"[{name}] PnL {stats['final_pnl']:.2f}, max drawdown {stats['max_drawdown']:.2f}, "
+              f"max |inventory| {stats['max_abs_inventory']:.0f}")
+
+
+    plt.figure(figsize=(14, 10))
+
+    plt.subplot(3, 1, 1)
+    plt.plot(*minmax_decimate(mid_prices, max_points), label='Mid Price')
+    plt.title("Mid Price")
+    plt.legend()
+
+    plt.subplot(3, 1, 2)
+    plt.plot(*minmax_decimate(inv_s, max_points), label='Stoikov Inventory', alpha=0.6)
+    plt.plot(*minmax_decimate(inv_n, max_points), label='NaiveMM Inventory', alpha=0.6)
+    plt.title("Inventory Comparison")
+    plt.legend()
+
+    plt.subplot(3, 1, 3)
+    plt.plot(*minmax_decimate(pnl_s, max_points), label='Stoikov PnL', alpha=0.9)
+    plt.plot(*minmax_decimate(pnl_n, max_points), label='NaiveMM PnL', alpha=0.9)
+    plt.title("PnL Comparison")
+    plt.xlabel("Time")
+    plt.legend()
+
+    plt.tight_layout()
+    plt.savefig('results/comparison.png')
+    if show:
+        plt.show()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,311 @@
+"""Monte Carlo replays of one Stoikov backtest.
+
+Fills are random, so one run is one draw. Here the same market data and
+strategy configuration is replayed for many independent fill seeds: each task
+runs a chunk of seeds as lanes of BatchStoikovEngine (vectorized across
+paths), tasks are spread over worker processes attached to one shared-memory
+copy of the market data, and every task is reduced to a small mergeable
+`Distribution` per metric before it is sent back. No per-path series are
+kept. The tails needed for exact VaR / CVaR grow with the number of paths
+(about (1 - level) * paths values per metric), so they are capped at
+`max_tail`: memory is bounded by max_tail and the sample size, and runs that
+would need a longer tail estimate the tail figures from the sample. Final PnL
+is marked at the last close, as in grid_search.py. Seeds are derived from
+(base seed, path index), so results do not depend on the number of workers.
+
+    python monte_carlo.py BTCUSDT_1min.csv --paths 10000 --workers 8 --level 0.99
+    python cli.py montecarlo BTCUSDT_1min.csv --paths 2000
+"""
+import argparse
+import math
+import multiprocessing as mp
+import os
+from types import SimpleNamespace
+
+import numpy as np
+
+from simulator.market_data import MarketData
+from simulator.real_data_sim import RealDataSim
+from simulator.tick_cache import realized_sigma
+from strategy.batch_stoikov import BatchStoikovEngine
+
+METRICS = ('final_pnl', 'worst_drawdown', 'cur_pos', 'n_trades')
+QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+
+_worker = {}
+
+
+def path_seeds(base_seed, start, stop):
+    # seed of path i depends only on (base_seed, i)
+    return [int(np.random.SeedSequence([base_seed, i]).generate_state(1)[0]) for i in range(start, stop)]
+
+
+def normal_quantile(p):
+    # inverse standard normal CDF by bisection on erf (no scipy)
+    lo, hi = -10.0, 10.0
+    for _ in range(100):
+        mid = (lo + hi) / 2
+        if 0.5 * (1 + math.erf(mid / math.sqrt(2))) < p:
+            lo = mid
+        else:
+            hi = mid
+    return (lo + hi) / 2
+
+
+def tail_size(n_paths, level, confidence=0.95, max_tail=100_000):
+    # order statistics needed for the level-quantile, its confidence interval and the tail mean,
+    # at most max_tail
+    z = normal_quantile((1 + confidence) / 2)
+    needed = int(math.ceil((1 - level) * n_paths + z * math.sqrt(n_paths * level * (1 - level)))) + 2
+    return min(needed, max_tail)
+
+
+class Distribution:
+    # Streaming summary of one per-path metric. Exact: count, mean and variance (Chan's parallel
+    # update), min / max, and the `tail` smallest and largest values. Approximate beyond
+    # `sample_size` paths: body quantiles, from a uniform reservoir sample (and tail figures that
+    # need more than `tail` values). Memory is O(tail + sample_size). Two Distributions
+    # merge into the Distribution of the union of their paths.
+    def __init__(self, tail=1000, sample_size=10_000, seed=0):
+        self.tail = tail
+        self.sample_size = sample_size
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.low = np.empty(0)
+        self.high = np.empty(0)
+        self.sample = np.empty(0)
+        self._rng = np.random.default_rng(seed)
+
+    @classmethod
+    def of(cls, values, tail=1000, sample_size=10_000, seed=0):
+        dist = cls(tail, sample_size, seed)
+        dist.update(values)
+        return dist
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if not len(values):
+            return self
+        other = Distribution(self.tail, self.sample_size)
+        other.n = len(values)
+        other.mean = float(values.mean())
+        other.m2 = float(((values - other.mean) ** 2).sum())
+        other.min, other.max = float(values.min()), float(values.max())
+        other.low = other.high = values
+        other.sample = values if len(values) <= self.sample_size else \
+            self._rng.choice(values, self.sample_size, replace=False)
+        return self.merge(other)
+
+    def merge(self, other):
+        if not other.n:
+            return self
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.mean += delta * other.n / n
+        self.m2 += other.m2 + delta * delta * self.n * other.n / n
+        self.min, self.max = min(self.min, other.min), max(self.max, other.max)
+        self.low = _smallest(np.concatenate((self.low, other.low)), self.tail)
+        self.high = -_smallest(-np.concatenate((self.high, other.high)), self.tail)
+        # reservoir merge: the number drawn from `other` is hypergeometric in the path counts
+        m = min(self.sample_size, n)
+        k = self._rng.hypergeometric(other.n, self.n, m) if self.n else m
+        self.sample = np.concatenate((
+            self._rng.choice(self.sample, m - k, replace=False),
+            self._rng.choice(other.sample, k, replace=False)))
+        self.n = n
+        return self
+
+    @property
+    def std(self):
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else 0.0
+
+    def mean_ci(self, confidence=0.95):
+        half = normal_quantile((1 + confidence) / 2) * self.std / math.sqrt(max(self.n, 1))
+        return self.mean - half, self.mean + half
+
+    def quantiles(self, qs=QUANTILES):
+        # exact where the order statistic is in a kept tail, from the sample otherwise
+        return {q: self.quantile(q) for q in qs}
+
+    def quantile(self, q):
+        rank = _rank(q, self.n)
+        if rank <= len(self.low):
+            return float(self.low[rank - 1])
+        if self.n - rank < len(self.high):
+            return float(self.high[self.n - rank])
+        return float(np.quantile(self.sample, q, method='inverted_cdf')) if len(self.sample) else math.nan
+
+    def lower_tail(self, level, confidence=0.95):
+        # (quantile at 1 - level, its distribution-free CI from order statistics, mean of the
+        # values at or below it). Exact from the kept tail; estimated from the sample when the
+        # tail is too short (capped), nan when there is neither.
+        ranks = _tail_ranks(1 - level, self.n, confidence)
+        if ranks[2] <= len(self.low):
+            values = self.low
+        else:
+            values = np.sort(self.sample)
+            ranks = _tail_ranks(1 - level, len(values), confidence)
+            if not len(values):
+                return math.nan, (math.nan, math.nan), math.nan
+        k, lo, hi = ranks
+        return (float(values[k - 1]), (float(values[lo - 1]), float(values[hi - 1])),
+                float(values[:k].mean()))
+
+    def upper_tail(self, level, confidence=0.95):
+        value, (lo, hi), tail_mean = _negated(self).lower_tail(level, confidence)
+        return -value, (-hi, -lo), -tail_mean
+
+    def summary(self, confidence=0.95):
+        return dict(n=self.n, mean=self.mean, std=self.std, mean_ci=self.mean_ci(confidence),
+                    min=self.min, max=self.max, quantiles=self.quantiles())
+
+
+def _rank(q, n):
+    # 1-based rank of the lower empirical q-quantile (q * n is often a float just above an integer,
+    # e.g. (1 - 0.99) * 50000)
+    return min(max(int(math.ceil(q * n - 1e-9)), 1), n)
+
+
+def _tail_ranks(q, n, confidence):
+    # 1-based ranks of the q-quantile and of its confidence bounds among n values
+    half = normal_quantile((1 + confidence) / 2) * math.sqrt(n * q * (1 - q))
+    lo, hi = max(int(math.floor(q * n - half)), 1), int(math.ceil(q * n + half)) + 1
+    return _rank(q, n), lo, min(hi, n)
+
+
+def _smallest(values, k):
+    if len(values) > k:
+        values = np.partition(values, k - 1)[:k]
+    return np.sort(values)
+
+
+def _negated(dist):
+    neg = Distribution(dist.tail, dist.sample_size)
+    neg.n, neg.low, neg.sample = dist.n, -dist.high, -dist.sample
+    return neg
+
+
+def _init_worker(shm_name, n_rows, sigma, params, tail, sample_size):
+    shm, md_queue = MarketData.attach_shared(shm_name, n_rows)
+    _worker.update(shm=shm, md_queue=md_queue, sigma=sigma, params=params, tail=tail,
+                   sample_size=sample_size)
+
+
+def _run_task(task):
+    start, stop, base_seed = task
+    w = _worker
+    return run_paths(w['md_queue'], w['sigma'], w['params'], path_seeds(base_seed, start, stop),
+                     w['tail'], w['sample_size'], seed=start)
+
+
+def run_paths(md_queue, sigma, params, seeds, tail=1000, sample_size=10_000, seed=0):
+    # {metric: Distribution} over one vectorized chunk of paths
+    sim = RealDataSim.from_market_data(md_queue, sigma)
+    res = BatchStoikovEngine(sim, sigma=sigma, seeds=seeds, record_series=False, **params).run()
+    values = {m: getattr(res, m) for m in METRICS}
+    # res.final_pnl is marked at the central price of the last readjust, before its fills
+    values['final_pnl'] = res.cash + res.cur_pos * float(md_queue.price[-1])
+    return {m: Distribution.of(values[m], tail, sample_size, seed) for m in METRICS}
+
+
+def monte_carlo(data, n_paths=1000, workers=None, base_seed=0, chunk_size=256, level=0.95,
+                confidence=0.95, sample_size=10_000, max_tail=100_000, progress=None, **params):
+    # Replays StoikovStrategy on `data` (csv / .ticks path or MarketData) for n_paths fill seeds.
+    # params go to BatchStoikovEngine (gamma, k, lambda_inventory, order_size, adjust_delay, ...).
+    # Returns {metric: Distribution} merged over all paths plus risk figures (see risk_report).
+    if isinstance(data, MarketData):
+        md_queue, sigma = data, realized_sigma(data.price)
+    else:
+        sim = RealDataSim(data)
+        md_queue, sigma = sim.md_queue, sim.realized_sigma
+    sigma = params.pop('sigma', None) or sigma
+    params.setdefault('gamma', 0.05)
+    params.setdefault('k', 1.5)
+    # chunk_size does not depend on `workers`, so the merge order and the result do not either
+    tasks = [(start, min(start + chunk_size, n_paths), base_seed) for start in range(0, n_paths, chunk_size)]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(tasks)))
+    tail = tail_size(n_paths, level, confidence, max_tail)
+
+    dists = {m: Distribution(tail, sample_size, seed=base_seed) for m in METRICS}
+
+    def collect(chunks):
+        for done, chunk in enumerate(chunks, 1):
+            for m in METRICS:
+                dists[m].merge(chunk[m])
+            if progress is not None:
+                progress(min(done * chunk_size, n_paths), n_paths)
+
+    if workers == 1:
+        collect(run_paths(md_queue, sigma, params, path_seeds(base_seed, a, b), tail, sample_size, seed=a)
+                for a, b, _ in tasks)
+    else:
+        shm = md_queue.to_shared_memory()
+        try:
+            with mp.Pool(workers, initializer=_init_worker,
+                         initargs=(shm.name, len(md_queue), sigma, params, tail, sample_size)) as pool:
+                # imap keeps task order, so merges (and reservoir draws) are reproducible
+                collect(pool.imap(_run_task, tasks))
+        finally:
+            shm.close()
+            shm.unlink()
+    return SimpleNamespace(distributions=dists, **risk_report(dists, level, confidence))
+
+
+def risk_report(dists, level=0.95, confidence=0.95):
+    pnl, dd = dists['final_pnl'], dists['worst_drawdown']
+    q, q_ci, shortfall = pnl.lower_tail(level, confidence)
+    dd_q, dd_ci, dd_tail = dd.upper_tail(level, confidence)
+    return dict(
+        n_paths=pnl.n, level=level, confidence=confidence,
+        mean_pnl=pnl.mean, mean_pnl_ci=pnl.mean_ci(confidence), std_pnl=pnl.std,
+        var=-q, var_ci=(-q_ci[1], -q_ci[0]), cvar=-shortfall,
+        drawdown_quantile=dd_q, drawdown_quantile_ci=dd_ci, drawdown_tail_mean=dd_tail,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='monte_carlo.py', description=__doc__.splitlines()[0])
+    parser.add_argument('data', nargs='?', default='BTCUSDT_1min.csv', help="OHLCV CSV or .ticks file")
+    parser.add_argument('--paths', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0, help="base seed of the path seeds")
+    parser.add_argument('--chunk-size', type=int, default=256, help="paths per vectorized task")
+    parser.add_argument('--level', type=float, default=0.95, help="VaR / CVaR level")
+    parser.add_argument('--confidence', type=float, default=0.95, help="confidence intervals")
+    parser.add_argument('--max-tail', type=int, default=100_000,
+                        help="values kept per tail and metric; longer tails are estimated from the sample")
+    parser.add_argument('--gamma', type=float, default=0.05)
+    parser.add_argument('--k', type=float, default=1.5)
+    parser.add_argument('--order-size', type=int, default=1)
+    parser.add_argument('--adjust-delay', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    res = monte_carlo(args.data, args.paths, workers=args.workers, base_seed=args.seed,
+                      chunk_size=args.chunk_size, level=args.level, confidence=args.confidence,
+                      max_tail=args.max_tail,
+                      gamma=args.gamma, k=args.k, order_size=args.order_size,
+                      adjust_delay=args.adjust_delay)
+    print_report(res)
+    return res
+
+
+def print_report(res):
+    pct = f"{res.level:.0%}"
+    ci = f"{res.confidence:.0%} CI"
+    print(f"{res.n_paths} paths")
+    print(f"mean PnL {res.mean_pnl:.2f} ({ci} {res.mean_pnl_ci[0]:.2f} .. {res.mean_pnl_ci[1]:.2f}), "
+          f"std {res.std_pnl:.2f}")
+    print(f"VaR {pct} {res.var:.2f} ({ci} {res.var_ci[0]:.2f} .. {res.var_ci[1]:.2f}), "
+          f"CVaR {pct} {res.cvar:.2f}")
+    print(f"max drawdown {pct} quantile {res.drawdown_quantile:.2f} ({ci} {res.drawdown_quantile_ci[0]:.2f} .. "
+          f"{res.drawdown_quantile_ci[1]:.2f}), mean beyond {res.drawdown_tail_mean:.2f}")
+    print(f"{'':>15}" + "".join(f"{q:>10.0%}" for q in QUANTILES))
+    for m, dist in res.distributions.items():
+        print(f"{m:>15}" + "".join(f"{v:10.2f}" for v in dist.quantiles().values()))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,42 +1,46 @@
-import pandas as pd
-import matplotlib.pyplot as plt
+import numpy as np
 
-def analyze_fills(trades, orders):
-    df_trades = pd.DataFrame([vars(tr) for tr in trades])
-    df_orders = pd.DataFrame([vars(o) for o in orders])
+from scripts.pnl import pnl_series, summary, trade_arrays
+from scripts.report import fill_stats, order_types
 
-    
-    total_orders = len(df_orders)
-    filled_orders = len(df_trades)
-    fill_rate = filled_orders / total_orders if total_orders else 0
-    avg_fill_price = df_trades['price'].mean()
-    min_price, max_price = df_trades['price'].min(), df_trades['price'].max()
+def analyze_fills(trades, orders, mid_prices=None, out_dir='results'):
+    # Columnar: no per-trade DataFrame rows. Figures are written with the Agg canvas (no show()).
+    from matplotlib.figure import Figure
+
+    fills = trade_arrays(trades)
+    types = order_types(orders)
+    stats = fill_stats(fills, sum(types.values()), np.asarray(mid_prices if mid_prices is not None else []))
 
     print("\n🧾 Execution Report")
-    print(f"Total Orders: {total_orders}")
-    print(f"Filled Orders: {filled_orders}")
-    print(f"✅ Fill Rate: {fill_rate:.2%}")
-    print(f"💰 Avg Fill Price: {avg_fill_price:.2f}")
-    print(f"📉 Min / Max Fill Price: {min_price:.2f} / {max_price:.2f}")
-
-    
-    plt.figure(figsize=(10, 4))
-    plt.hist(df_trades['price'], bins=50, alpha=0.7, color='green', edgecolor='black')
-    plt.title("Histogram of Fill Prices")
-    plt.xlabel("Price")
-    plt.ylabel("Frequency")
-    plt.grid(True)
-    plt.tight_layout()
-    plt.savefig("results/hist_fill_prices.png")
-    plt.show()
-
-
-    if 'type' in df_orders.columns:
-        plt.figure(figsize=(6, 4))
-        df_orders['type'].value_counts().plot(kind='bar', color='steelblue')
-        plt.title("Order Type Counts")
-        plt.xticks(rotation=0)
-        plt.grid(axis='y')
-        plt.tight_layout()
-        plt.savefig("results/order_type_counts.png")
-        plt.show()
+    print(f"Total Orders: {stats['n_orders']}")
+    print(f"Filled Orders: {stats['n_fills']}")
+    print(f"✅ Fill Rate: {stats['fill_rate']:.2%}")
+    print(f"💰 Avg Fill Price: {stats['avg_fill_price']:.2f}")
+    print(f"📉 Min / Max Fill Price: {stats['min_fill_price']:.2f} / {stats['max_fill_price']:.2f}")
+    if mid_prices is not None:
+        stats = summary(pnl_series(fills, mid_prices))
+        print(f"📈 Final PnL: {stats['final_pnl']:.2f}")
+        print(f"🔻 Max Drawdown: {stats['max_drawdown']:.2f}")
+        print(f"📦 Final / Max |Inventory|: {stats['final_inventory']:.0f} / {stats['max_abs_inventory']:.0f}")
+
+
+    fig = Figure(figsize=(10, 4))
+    ax = fig.subplots()
+    ax.hist(fills[2], bins=50, alpha=0.7, color='green', edgecolor='black')
+    ax.set_title("Histogram of Fill Prices")
+    ax.set_xlabel("Price")
+    ax.set_ylabel("Frequency")
+    ax.grid(True)
+    fig.tight_layout()
+    fig.savefig(f"{out_dir}/hist_fill_prices.png")
+
+
+    if types:
+        fig = Figure(figsize=(6, 4))
+        ax = fig.subplots()
+        counts = sorted(types.items(), key=lambda item: -item[1])
+        ax.bar([name for name, _ in counts], [n for _, n in counts], color='steelblue')
+        ax.set_title("Order Type Counts")
+        ax.grid(axis='y')
+        fig.tight_layout()
+        fig.savefig(f"{out_dir}/order_type_counts.png")
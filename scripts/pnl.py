@@ -0,0 +1,60 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+
+def trade_arrays(trades):
+    # (ts, signed size, price) arrays from own_trade records; BID fills add inventory
+    if hasattr(trades, 'to_array'):
+        # fills spilled to disk by strategy.recorder.SpillFile (side 0 = BID)
+        rec = trades.to_array()
+        return rec['ts'], np.where(rec['side'] == 0, rec['size'], -rec['size']), rec['price']
+    n = len(trades)
+    ts = np.fromiter((tr.ts for tr in trades), dtype=np.int64, count=n)
+    signed_size = np.fromiter((tr.size if tr.side == 'BID' else -tr.size for tr in trades),
+                              dtype=np.float64, count=n)
+    price = np.fromiter((tr.price for tr in trades), dtype=np.float64, count=n)
+    return ts, signed_size, price
+
+
+def pnl_series(trades, mid_prices):
+    # Inventory / cash / PnL after each mid price in one pass: trades with ts == i are applied at
+    # mid index i (trades outside the mid range are ignored). Trades are stably sorted by ts and
+    # accumulated with cumsum, so cash is summed in the same order as a trade-by-trade replay.
+    mid = np.asarray(mid_prices, dtype=np.float64)
+    ts, signed_size, price = trades if isinstance(trades, tuple) else trade_arrays(trades)
+
+    order = np.argsort(ts, kind='stable')
+    ts, signed_size, price = ts[order], signed_size[order], price[order]
+    pos = np.concatenate(([0.0], np.cumsum(signed_size)))
+    cash = np.concatenate(([0.0], np.cumsum(-signed_size * price)))
+
+    # number of trades with ts <= i minus those with ts < 0, for every mid index i
+    first = np.searchsorted(ts, 0, side='left')
+    last = np.searchsorted(ts, np.arange(len(mid)), side='right')
+    inventory = pos[last] - pos[first]
+    cash = cash[last] - cash[first]
+
+    unrealized = inventory * mid
+    pnl = cash + unrealized
+    peak = np.maximum(np.maximum.accumulate(pnl), 0.0) if len(pnl) else pnl
+    return SimpleNamespace(
+        inventory=inventory,
+        cash=cash,
+        realized=cash,
+        unrealized=unrealized,
+        pnl=pnl,
+        drawdown=peak - pnl,
+        fills_per_tick=np.diff(np.concatenate(([first], last))),
+    )
+
+
+def summary(series):
+    if not len(series.pnl):
+        return {'final_pnl': 0.0, 'max_drawdown': 0.0, 'final_inventory': 0.0, 'max_abs_inventory': 0.0}
+    return {
+        'final_pnl': float(series.pnl[-1]),
+        'max_drawdown': float(series.drawdown.max()),
+        'final_inventory': float(series.inventory[-1]),
+        'max_abs_inventory': float(np.abs(series.inventory).max()),
+    }
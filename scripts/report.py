@@ -0,0 +1,187 @@
+"""Headless, batched run reports.
+
+A run is reduced to columnar arrays once (`run_data`): fill ts / signed size /
+price, order counts by type, mid prices and risk events. Reports are computed
+from those arrays, without per-trade objects or DataFrames. Figures are drawn
+with matplotlib's Figure API on the Agg canvas, so nothing is shown or blocks
+and no pyplot state builds up across runs. Long series are min/max-decimated
+before plotting. `generate_reports` renders many runs in worker processes and
+writes one summary table (fill rate, average fill price, adverse selection,
+PnL, drawdown, inventory):
+
+    runs = [run_data(f'seed{s}', trades, orders, mid_prices) for s, (trades, orders, mid_prices) in ...]
+    rows = generate_reports(runs, 'results/reports', workers=8)
+"""
+import csv
+import multiprocessing as mp
+import os
+from collections import Counter
+from functools import partial
+from types import SimpleNamespace
+
+import numpy as np
+
+from scripts.pnl import pnl_series, summary, trade_arrays
+
+STATS_FIELDS = ('run', 'n_orders', 'n_fills', 'fill_rate', 'avg_fill_price', 'min_fill_price',
+                'max_fill_price', 'adverse_selection', 'final_pnl', 'max_drawdown',
+                'final_inventory', 'max_abs_inventory')
+
+
+def order_types(orders):
+    # {order type: count}; spilled order logs have a single type
+    if hasattr(orders, 'to_array'):
+        return {orders.type: len(orders)} if len(orders) else {}
+    return dict(Counter(o.type for o in orders))
+
+
+def run_data(name, trades, orders, mid_prices, logs=()):
+    # Compact, picklable form of one run for the report functions
+    return SimpleNamespace(
+        name=name,
+        fills=trade_arrays(trades),
+        order_types=order_types(orders),
+        mid=np.asarray(mid_prices, dtype=np.float64),
+        events=[(log['time'], log['event']) for log in logs],
+    )
+
+
+def minmax_decimate(y, max_points, x=None):
+    # (x, y) with at most ~max_points points: the series is cut into max_points / 2 buckets and
+    # each bucket keeps its min and its max in time order, so spikes and drawdowns stay visible
+    y = np.asarray(y, dtype=np.float64)
+    x = np.arange(len(y)) if x is None else np.asarray(x)
+    n = len(y)
+    if n <= max_points:
+        return x, y
+    size = -(-n // max(1, max_points // 2))
+    n_buckets = -(-n // size)
+    pad = n_buckets * size - n
+    lo = np.concatenate((y, np.full(pad, np.inf))).reshape(n_buckets, size).argmin(axis=1)
+    hi = np.concatenate((y, np.full(pad, -np.inf))).reshape(n_buckets, size).argmax(axis=1)
+    start = np.arange(n_buckets) * size
+    idx = np.unique(np.concatenate((start + lo, start + hi)))
+    return x[idx], y[idx]
+
+
+def fill_stats(fills, n_orders, mid, horizon=10):
+    # Fill rate (fills / recorded orders, as in analyze_fills), fill prices, and adverse
+    # selection: size-weighted average of (fill price - mid `horizon` bars later) * side, i.e. what
+    # the market moved against each filled unit (positive = adverse)
+    ts, signed_size, price = fills
+    n_fills = len(ts)
+    stats = {
+        'n_orders': n_orders,
+        'n_fills': n_fills,
+        'fill_rate': n_fills / n_orders if n_orders else 0.0,
+        'avg_fill_price': float(price.mean()) if n_fills else float('nan'),
+        'min_fill_price': float(price.min()) if n_fills else float('nan'),
+        'max_fill_price': float(price.max()) if n_fills else float('nan'),
+        'adverse_selection': float('nan'),
+    }
+    inside = (ts >= 0) & (ts < len(mid))
+    if inside.any():
+        later = mid[np.minimum(ts[inside] + horizon, len(mid) - 1)]
+        size = signed_size[inside]
+        stats['adverse_selection'] = float((size * (price[inside] - later)).sum() / np.abs(size).sum())
+    return stats
+
+
+def run_stats(run, horizon=10):
+    series = pnl_series(run.fills, run.mid)
+    stats = {'run': run.name}
+    stats.update(fill_stats(run.fills, sum(run.order_types.values()), run.mid, horizon))
+    stats.update(summary(series))
+    return stats, series
+
+
+def render_run(run, series, path, max_points=2000):
+    from matplotlib.figure import Figure  # Agg canvas: no GUI backend, nothing to show
+
+    fig = Figure(figsize=(12, 12))
+    ax_mid, ax_inv, ax_pnl, ax_hist = fig.subplots(4, 1)
+    ax_mid.plot(*minmax_decimate(run.mid, max_points), color='black', linewidth=0.8)
+    ax_mid.set_title(f"{run.name}: mid price")
+    ax_inv.plot(*minmax_decimate(series.inventory, max_points), color='purple', linewidth=0.8)
+    ax_inv.set_title("Inventory")
+    ax_pnl.plot(*minmax_decimate(series.realized, max_points), label='Realized PnL', color='blue')
+    ax_pnl.plot(*minmax_decimate(series.unrealized, max_points), label='Unrealized PnL',
+                color='orange', linestyle='--')
+    ax_pnl.plot(*minmax_decimate(series.pnl, max_points), label='Total PnL', color='green')
+    for event, color, label in (('drawdown_pause', 'red', 'Pause'), ('resume_trading', 'lime', 'Resume')):
+        times = [t for t, e in run.events if e == event]
+        if times:
+            ax_pnl.vlines(times, 0, 1, transform=ax_pnl.get_xaxis_transform(), color=color,
+                          linestyle='--', alpha=0.6, label=label)
+    ax_pnl.set_title("PnL")
+    ax_pnl.legend()
+    ax_hist.hist(run.fills[2], bins=50, alpha=0.7, color='green', edgecolor='black')
+    ax_hist.set_title("Fill prices")
+    for ax in (ax_mid, ax_inv, ax_pnl, ax_hist):
+        ax.grid(True)
+    # fixed margins: tight_layout() would cost about as much as drawing the figure
+    fig.subplots_adjust(left=0.07, right=0.98, bottom=0.04, top=0.97, hspace=0.3)
+    fig.savefig(path)
+
+
+def report_run(run, out_dir=None, max_points=2000, horizon=10):
+    # Summary row for one run; with out_dir, also writes <out_dir>/<run name>.png
+    stats, series = run_stats(run, horizon)
+    if out_dir is not None:
+        render_run(run, series, os.path.join(out_dir, f"{run.name}.png"), max_points)
+    return stats
+
+
+def write_table(rows, path):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, STATS_FIELDS, lineterminator='\n')
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({k: (f"{v:.6g}" if isinstance(v, float) else v) for k, v in row.items()})
+
+
+def generate_reports(runs, out_dir, workers=None, max_points=2000, horizon=10, plots=True,
+                     table='summary.csv'):
+    # One figure per run (rendered in `workers` processes) plus <out_dir>/<table> with one row per
+    # run, in input order. Returns the rows.
+    os.makedirs(out_dir, exist_ok=True)
+    job = partial(report_run, out_dir=out_dir if plots else None, max_points=max_points,
+                  horizon=horizon)
+    runs = list(runs)
+    workers = min(workers or os.cpu_count() or 1, len(runs))
+    if workers <= 1:
+        rows = [job(run) for run in runs]
+    else:
+        with mp.Pool(workers) as pool:
+            rows = pool.map(job, runs, chunksize=max(1, len(runs) // (4 * workers)))
+    if table:
+        write_table(rows, os.path.join(out_dir, table))
+    return rows
+
+
+def plot_pnl_breakdown(strategy, path='results/pnl_breakdown_with_logs.png', max_points=5000):
+    # Realized / unrealized / total PnL of a finished StoikovStrategy with its drawdown pauses
+    # and resumes marked (pyplot figure, for interactive scripts such as main.py)
+    import matplotlib.pyplot as plt
+
+    fig = plt.figure(figsize=(12, 8))
+
+    time = strategy.time_list
+    plt.plot(*minmax_decimate(strategy.realized_pnl_list, max_points, time), label='Realized PnL', color='blue')
+    plt.plot(*minmax_decimate(strategy.unrealized_pnl_list, max_points, time), label='Unrealized PnL', color='orange', linestyle='--')
+    plt.plot(*minmax_decimate(strategy.pnl_list, max_points, time), label='Total PnL', color='green')
+
+    for log in strategy.logs:
+        if log['event'] == 'drawdown_pause':
+            plt.axvline(log['time'], color='red', linestyle='--', alpha=0.6, label='Pause' if 'Pause' not in plt.gca().get_legend_handles_labels()[1] else "")
+        elif log['event'] == 'resume_trading':
+            plt.axvline(log['time'], color='lime', linestyle='--', alpha=0.6, label='Resume' if 'Resume' not in plt.gca().get_legend_handles_labels()[1] else "")
+
+    plt.title('PnL Breakdown with Risk Events')
+    plt.xlabel('Time')
+    plt.ylabel('PnL')
+    plt.legend()
+    plt.grid(True)
+    plt.tight_layout()
+    plt.savefig(path)
+    return fig
@@ -0,0 +1,197 @@
+"""Paginated, concurrent OHLCV downloader writing into tick-cache stores.
+
+Each (symbol, timeframe) pair goes to its own .ticks file, named like the
+bundled data (BTC/USDT 1m -> BTCUSDT_1min.ticks), so RealDataSim('BTCUSDT_1min.csv')
+and the CLI defaults read freshly fetched bars. Downloads resume
+after the last stored bar and only append closed bars. Pages for all pairs on
+one exchange are fetched concurrently, but go through one RateLimiter that
+spaces requests by the exchange's ``rateLimit`` and retries network /
+rate-limit errors with backoff.
+
+Any object with ``fetch_ohlcv(symbol, timeframe, since=, limit=)`` works,
+async (``ccxt.async_support``) or blocking (``ccxt``, run in a thread).
+``StubExchange`` serves deterministic bars offline.
+"""
+import asyncio
+import math
+import os
+
+import numpy as np
+
+from simulator import tick_cache
+
+TIMEFRAME_UNITS_MS = {'s': 1000, 'm': 60_000, 'h': 3_600_000, 'd': 86_400_000, 'w': 604_800_000}
+
+
+def timeframe_ms(timeframe):
+    return int(timeframe[:-1]) * TIMEFRAME_UNITS_MS[timeframe[-1]]
+
+
+def store_name(symbol, timeframe):
+    # BTC/USDT, 1m -> BTCUSDT_1min (minutes spelled 'min' as in BTCUSDT_1min.csv; 1M is a month)
+    label = timeframe[:-1] + 'min' if timeframe.endswith('m') else timeframe
+    return f"{symbol.replace('/', '')}_{label}"
+
+
+def store_path(out_dir, symbol, timeframe):
+    return os.path.join(out_dir, store_name(symbol, timeframe) + tick_cache.SUFFIX)
+
+
+def last_timestamp(path):
+    if not os.path.exists(path):
+        return None
+    header, cols = tick_cache.open_columns(path)
+    return int(cols['timestamp'][-1]) if header.n_rows else None
+
+
+def _retryable_errors():
+    try:
+        import ccxt
+    except ImportError:
+        return (ConnectionError, TimeoutError)
+    # RateLimitExceeded and DDoSProtection are NetworkErrors
+    return (ConnectionError, TimeoutError, ccxt.NetworkError)
+
+
+class RateLimiter:
+    # Spaces requests at least `interval` seconds apart (across all tasks sharing it) with at
+    # most `max_concurrent` in flight.
+    def __init__(self, interval, max_concurrent=4):
+        self.interval = interval
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+        self._slots = asyncio.Semaphore(max_concurrent)
+
+    @classmethod
+    def for_exchange(cls, exchange, max_concurrent=4):
+        return cls(getattr(exchange, 'rateLimit', 0) / 1000, max_concurrent)
+
+    async def __aenter__(self):
+        await self._slots.acquire()
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            now = loop.time()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    async def __aexit__(self, *exc):
+        self._slots.release()
+
+    async def backoff(self, seconds):
+        # push every task's next slot back, e.g. after the exchange reports a rate limit
+        async with self._lock:
+            self._next = max(self._next, asyncio.get_running_loop().time() + seconds)
+
+
+async def fetch_page(exchange, limiter, symbol, timeframe, since, limit, retries=5):
+    fetch = exchange.fetch_ohlcv
+    retryable = _retryable_errors()
+    delay = max(limiter.interval, 0.5)
+    for attempt in range(retries + 1):
+        try:
+            async with limiter:
+                if asyncio.iscoroutinefunction(fetch):
+                    return await fetch(symbol, timeframe, since=since, limit=limit)
+                return await asyncio.to_thread(fetch, symbol, timeframe, since=since, limit=limit)
+        except retryable:
+            if attempt == retries:
+                raise
+            await limiter.backoff(delay)
+            delay *= 2
+
+
+async def iter_pages(exchange, limiter, symbol, timeframe, since, until, limit=1000):
+    # Yields (n, 6) float arrays of bars with since <= ts < until, oldest first
+    step = timeframe_ms(timeframe)
+    while since < until:
+        page = await fetch_page(exchange, limiter, symbol, timeframe, since, limit)
+        if not page:
+            return
+        bars = np.asarray(page, dtype=np.float64)
+        bars = bars[(bars[:, 0] >= since) & (bars[:, 0] < until)]
+        if not len(bars):
+            return
+        yield bars
+        since = int(bars[-1, 0]) + step
+
+
+async def sync_store(exchange, symbol, timeframe, path, since, until=None, limit=1000, limiter=None):
+    # Appends closed bars in [max(since, last stored + 1 bar), until) to `path`; returns rows added.
+    step = timeframe_ms(timeframe)
+    if until is None:
+        now = _now_ms(exchange)
+        until = now - now % step  # the bar starting at `until` is still forming
+    if os.path.exists(path):
+        header = tick_cache.read_header(path)
+        if (header.symbol, header.timeframe) != (symbol[:16], timeframe[:8]) and header.symbol:
+            raise ValueError(f"{path} holds {header.symbol} {header.timeframe}, not {symbol} {timeframe}")
+    last = last_timestamp(path)
+    if last is not None:
+        since = max(since, last + step)
+    limiter = limiter or RateLimiter.for_exchange(exchange)
+
+    added = 0
+    async for bars in iter_pages(exchange, limiter, symbol, timeframe, since, until, limit):
+        if last is not None:
+            bars = bars[bars[:, 0] > last]
+            if not len(bars):
+                continue
+        columns = {name: bars[:, j].astype(dtype) for j, (name, dtype) in enumerate(tick_cache.CACHE_COLUMNS)}
+        tick_cache.append_rows(path, columns, symbol, timeframe)
+        last = int(bars[-1, 0])
+        added += len(bars)
+    return added
+
+
+async def download(exchange, pairs, out_dir='.', since=0, until=None, limit=1000, max_concurrent=4):
+    # pairs: iterable of (symbol, timeframe); returns {(symbol, timeframe): rows added}
+    pairs = list(pairs)
+    limiter = RateLimiter.for_exchange(exchange, max_concurrent)
+    os.makedirs(out_dir, exist_ok=True)
+    added = await asyncio.gather(*(
+        sync_store(exchange, symbol, timeframe, store_path(out_dir, symbol, timeframe), since, until,
+                   limit, limiter)
+        for symbol, timeframe in pairs))
+    return dict(zip(pairs, added))
+
+
+def _now_ms(exchange):
+    if hasattr(exchange, 'milliseconds'):
+        return exchange.milliseconds()
+    import time
+    return int(time.time() * 1000)
+
+
+class StubExchange:
+    # Offline stand-in for a ccxt exchange: deterministic bars from `start` to `now`, pages of at
+    # most `max_limit`; every `fail_every`-th call raises ConnectionError to exercise retries.
+    rateLimit = 0
+
+    def __init__(self, start=1709251200000, now=None, max_limit=1000, fail_every=None, base_price=60000.0):
+        self.start = start
+        self.now = now if now is not None else start + 86_400_000
+        self.max_limit = max_limit
+        self.fail_every = fail_every
+        self.base_price = base_price
+        self.calls = 0
+
+    def milliseconds(self):
+        return self.now
+
+    def fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=None):
+        self.calls += 1
+        if self.fail_every and self.calls % self.fail_every == 0:
+            raise ConnectionError('stub exchange: simulated network error')
+        step = timeframe_ms(timeframe)
+        since = self.start if since is None else max(since, self.start)
+        first = -(-since // step) * step  # bars start on timeframe boundaries
+        limit = min(limit or self.max_limit, self.max_limit)
+        rows = []
+        offset = sum(map(ord, symbol)) % 1000
+        for ts in range(first, min(first + limit * step, self.now + 1), step):
+            close = self.base_price + offset + 100 * math.sin(ts / step / 50)
+            open_ = self.base_price + offset + 100 * math.sin((ts / step - 1) / 50)
+            rows.append([ts, open_, max(open_, close) + 5, min(open_, close) - 5, close, 1.0 + ts / step % 7])
+        return rows
@@ -0,0 +1,159 @@
+import math
+from bisect import bisect_left, bisect_right
+import numpy as np
+
+from simulator.orders import Order
+from simulator.real_data_sim import RealDataSim
+
+PATHS = ('auto', 'ohlc', 'olhc', 'bridge')
+
+
+def ohlc_vertices(open, high, low, close, order='auto'):
+    # (n, 4) piecewise-linear sub-bar paths O -> first extreme -> second extreme -> C.
+    # 'auto' visits the extreme closer to the open first.
+    if order == 'auto':
+        high_first = (high - open) <= (open - low)
+    else:
+        high_first = np.full(len(open), order == 'ohlc')
+    first = np.where(high_first, high, low)
+    second = np.where(high_first, low, high)
+    return np.column_stack((open, first, second, close))
+
+
+def bridge_vertices(open, high, low, close, n_sub=8, rng=None, chunk=1 << 16):
+    # (n, n_sub + 1) Brownian bridges from O to C, with positive / negative excursions rescaled so
+    # each path reaches exactly H and L (at its highest / lowest interior vertex), clipped to [L, H]
+    if n_sub < 3:
+        raise ValueError("bridge paths need n_sub >= 3")
+    rng = rng if rng is not None else np.random.default_rng()
+    n = len(open)
+    out = np.empty((n, n_sub + 1))
+    frac = np.arange(n_sub + 1) / n_sub
+    for start in range(0, n, chunk):
+        sl = slice(start, min(start + chunk, n))
+        o, h, l, c = open[sl, None], high[sl, None], low[sl, None], close[sl, None]
+        walk = np.zeros((len(o), n_sub + 1))
+        np.cumsum(rng.standard_normal((len(o), n_sub)), axis=1, out=walk[:, 1:])
+        dev = walk - frac * walk[:, -1:]
+        lin = o + (c - o) * frac
+        rows = np.arange(len(o))
+        i_max, i_min = dev[:, 1:-1].argmax(axis=1) + 1, dev[:, 1:-1].argmin(axis=1) + 1
+        d_max, d_min = dev[rows, i_max], dev[rows, i_min]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            up = np.where(d_max > 0, (h[:, 0] - lin[rows, i_max]) / d_max, 0.0)
+            down = np.where(d_min < 0, (lin[rows, i_min] - l[:, 0]) / -d_min, 0.0)
+        path = lin + np.where(dev > 0, dev * up[:, None], dev * down[:, None])
+        path = np.clip(path, l, h)
+        path[rows, i_max] = h[:, 0]  # bridges without an up (down) excursion still touch H (L)
+        path[rows, i_min] = l[:, 0]
+        out[sl] = path
+    return out
+
+
+def time_below(vertices, chunk=1 << 14):
+    # (knots, under, below): each row's vertices sorted, and the share of the bar's time (segments
+    # of equal duration, price linear within a segment) the path spends strictly below / at or
+    # below each knot. They differ where the path is flat at a knot; between knots both are linear.
+    n, m = vertices.shape
+    knots = np.sort(vertices, axis=1)
+    under, below = np.empty((n, m)), np.empty((n, m))
+    for start in range(0, n, chunk):
+        sl = slice(start, min(start + chunk, n))
+        v, k = vertices[sl, None, :], knots[sl, :, None]
+        lo, hi = np.minimum(v[..., :-1], v[..., 1:]), np.maximum(v[..., :-1], v[..., 1:])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sloped = np.clip((k - lo) / (hi - lo), 0.0, 1.0)
+        flat = hi == lo
+        under[sl] = np.where(flat, k > lo, sloped).mean(axis=2)
+        below[sl] = np.where(flat, k >= lo, sloped).mean(axis=2)
+    return knots, under, below
+
+
+class IntraBarSim(RealDataSim):
+    # RealDataSim whose fills come from a synthetic sub-bar path of the next bar instead of the
+    # close-to-close model: a BID (ASK) at price p can only fill if that bar's path reaches p, with
+    # probability 1 - exp(-volume traded through p / (queue ahead + order size)), where
+    #   volume through p = bar volume * (touch_volume_fraction + share of the bar's time the path
+    #                      spends at or beyond p)
+    #   queue ahead      = queue_position_ratio * bar volume
+    # so quotes the path only grazes usually rest and quotes it trades through for long mostly
+    # fill; both the path and the queue change the odds. Bars
+    # without volume fill on touch. Fills are at the limit price. Paths and the time-share tables
+    # of all bars are built once, vectorized; an order is priced from its bar's table without numpy
+    # calls. The market data must be in memory (chunksize=... is rejected).
+    path = 'auto'
+    n_sub = 8
+    touch_volume_fraction = 0.1
+    path_seed = None
+
+    def __init__(self, csv_path, path='auto', n_sub=8, touch_volume_fraction=0.1, path_seed=None,
+                 **kwargs):
+        if path not in PATHS:
+            raise ValueError(f"unknown intra-bar path: {path} (expected one of {PATHS})")
+        if kwargs.get('chunksize') is not None:
+            raise ValueError("IntraBarSim builds the sub-bar paths of all bars up front; "
+                             "streamed (chunksize=...) input is not supported")
+        self.path = path
+        self.n_sub = n_sub
+        self.touch_volume_fraction = touch_volume_fraction
+        self.path_seed = path_seed
+        super().__init__(csv_path, **kwargs)
+
+    def _setup(self, *args):
+        super()._setup(*args)
+        md = self.md_queue
+        if self.path == 'bridge':
+            rng = np.random.default_rng(self.path_seed)
+            self.vertices = bridge_vertices(md.open, md.high, md.low, md.price, self.n_sub, rng)
+        else:
+            self.vertices = ohlc_vertices(md.open, md.high, md.low, md.price, self.path)
+        self.knots, self.under, self.below = time_below(self.vertices)
+        self._bar = None
+
+    def time_beyond(self, i, side, price):
+        # share of bar i's time its path spends at or below (BID) / at or above (ASK) price
+        if self._bar != i:
+            # one bar's table as lists: orders of the same bar are priced without numpy
+            self._bar = i
+            self._table = self.knots[i].tolist(), self.under[i].tolist(), self.below[i].tolist()
+        knots, under, below = self._table
+        if side == 'BID':
+            # at or below: right-continuous in price
+            if price < knots[0]:
+                return 0.0
+            if price >= knots[-1]:
+                return 1.0
+            k = bisect_right(knots, price)
+            if price == knots[k - 1]:
+                return below[k - 1]
+        else:
+            # 1 - strictly below: left-continuous in price
+            if price <= knots[0]:
+                return 1.0
+            if price > knots[-1]:
+                return 0.0
+            k = bisect_left(knots, price)
+            if price == knots[k]:
+                return 1.0 - under[k]
+        x0, x1 = knots[k - 1], knots[k]
+        share = below[k - 1] + (under[k] - below[k - 1]) * (price - x0) / (x1 - x0)
+        return share if side == 'BID' else 1.0 - share
+
+    def fill_probability(self, i, side, price, size):
+        # probability that an order resting through bar i fills (0 if the bar never reaches it)
+        md = self.md_queue
+        if side == 'BID' and price < md.low[i] or side == 'ASK' and price > md.high[i]:
+            return 0.0
+        volume = md.volume[i]
+        if not volume:
+            return 1.0
+        traded = volume * (self.touch_volume_fraction + self.time_beyond(i, side, price))
+        return 1.0 - math.exp(-traded / (self.queue_position_ratio * volume + size))
+
+    def place_order(self, ts, size, side, price):
+        if ts == 0 or ts >= len(self.md_queue):
+            return self._limit_order(ts, size, side, price)
+        prob = self.fill_probability(ts, side, price, size)
+        if prob and self.execution_model.next_uniform() < prob:
+            return Order(next(self._order_ids), ts, side, size, price, 'own_trade')
+        return self._limit_order(ts, size, side, price)
@@ -0,0 +1,296 @@
+"""Asyncio live / paper-trading mode.
+
+An exchange here is anything with an async ``tick()`` returning the same
+``(ts, updates)`` pairs as ``RealDataSim.tick()``, a ``horizon`` of
+``(t_min, t_max)`` and synchronous ``place_order`` / ``cancel_order``:
+
+- ``ReplayExchange`` plays a simulator (CSV, tick cache, OrderBookSim, ...)
+  back at a configurable speed, in process;
+- ``PaperExchange`` wraps a live feed (``CcxtFeed``) and fills orders with the
+  same execution model as ``RealDataSim``.
+
+``LiveRunner`` drives a strategy's ``step()`` as updates arrive. Quotes and
+cancels go through an ``AsyncOrderGateway`` that sends them after the step.
+Orders are 'pending' until sent; whether each one rested or filled comes back
+with the next update, so only orders the exchange rested are counted as
+resting. Tick-to-quote latency is the time from an update arriving to its
+quotes having been sent (the gateway flush completing); time spent waiting
+for the previous tick's send is reported separately.
+
+    python -m simulator.live --replay BTCUSDT_1min.csv --speed 600
+    python -m simulator.live --symbol BTC/USDT --timeframe 1m
+"""
+import argparse
+import array
+import asyncio
+import itertools
+import time
+from collections import deque
+from types import SimpleNamespace
+
+import numpy as np
+
+from simulator.real_data_sim import RealDataSim
+
+
+class ReplayExchange:
+    # speed: market milliseconds replayed per wall millisecond (None = as fast as possible)
+    def __init__(self, sim, speed=None):
+        self.sim = sim
+        self.speed = speed
+        self.horizon = (sim.md_queue[0].receive_ts, sim.md_queue[-1].receive_ts)
+        self._clock = None
+
+    async def tick(self):
+        # yield first, so requests flushed after the previous step reach the simulator before it
+        # advances (with zero gateway latency this replays in backtest order)
+        await asyncio.sleep(0)
+        ts, updates = self.sim.tick()
+        if updates is not None and self.speed:
+            md_ts = updates[0].receive_ts
+            if self._clock is None:
+                self._clock = (time.perf_counter(), md_ts)
+            start, md_start = self._clock
+            # pace against the first update so per-tick sleep jitter does not accumulate
+            delay = start + (md_ts - md_start) / 1000 / self.speed - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        return ts, updates
+
+    def place_order(self, ts, size, side, price):
+        return self.sim.place_order(ts, size, side, price)
+
+    def cancel_order(self, ts, order_id):
+        return self.sim.cancel_order(ts, order_id)
+
+
+class _LivePrices:
+    # Growing stand-in for MarketData: RealDataSim.place_order only reads md_queue.price
+    def __init__(self):
+        self.price = []
+
+    def __len__(self):
+        return len(self.price)
+
+
+class PaperExchange:
+    # Paper fills against a live feed, using RealDataSim's execution model on the prices seen so far
+    def __init__(self, feed, spread=1.0, k_bid=1.5, k_ask=1.5, seed=None):
+        self.feed = feed
+        self.horizon = feed.horizon
+        self._prices = _LivePrices()
+        self.sim = RealDataSim.from_market_data(self._prices, None, spread, k_bid, k_ask, seed=seed)
+
+    async def tick(self):
+        ts, updates = await self.feed.tick()
+        if updates is not None:
+            for update in updates:
+                if update.type == 'md':
+                    self._prices.price.append(update.price)
+        return ts, updates
+
+    def place_order(self, ts, size, side, price):
+        return self.sim.place_order(ts, size, side, price)
+
+    def cancel_order(self, ts, order_id):
+        return self.sim.cancel_order(ts, order_id)
+
+    async def close(self):
+        await self.feed.close()
+
+
+class CcxtFeed:
+    # Closed candles from an exchange via ccxt's asyncio API, polled every `poll_interval` seconds.
+    # Emits md updates shaped like RealDataSim's (bid/ask = close -/+ spread / 2).
+    def __init__(self, symbol='BTC/USDT', timeframe='1m', exchange_id='binance', spread=1.0,
+                 poll_interval=1.0, duration=None, exchange=None):
+        if exchange is None:
+            import ccxt.async_support as ccxt
+            exchange = getattr(ccxt, exchange_id)()
+        self.exchange = exchange
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.spread = spread
+        self.poll_interval = poll_interval
+        self.tf_ms = exchange.parse_timeframe(timeframe) * 1000
+        now = exchange.milliseconds()
+        self.since = now - now % self.tf_ms  # first candle to emit is the one currently forming
+        # session end for T_minus_t; defaults to one day of bars
+        self.horizon = (self.since, self.since + (duration or 86_400_000))
+        self.t = 0
+        self._pending = deque()
+
+    async def _poll(self):
+        ohlcv = await self.exchange.fetch_ohlcv(self.symbol, self.timeframe, since=self.since)
+        now = self.exchange.milliseconds()
+        for ts, o, h, l, c, v in ohlcv:
+            if ts < self.since or ts + self.tf_ms > now:
+                continue  # already emitted, or still forming
+            half = self.spread / 2
+            self._pending.append(SimpleNamespace(receive_ts=ts, price=c, bid_price=c - half, ask_price=c + half,
+                                                 volume=v, open=o, high=h, low=l, type='md'))
+            self.since = ts + self.tf_ms
+
+    async def tick(self):
+        while not self._pending:
+            if self.since >= self.horizon[1]:
+                return self.t, None
+            await self._poll()
+            if not self._pending:
+                await asyncio.sleep(self.poll_interval)
+        self.t += 1
+        return self.t, [self._pending.popleft()]
+
+    async def close(self):
+        await self.exchange.close()
+
+
+class AsyncOrderGateway:
+    # Looks like a simulator to the strategy: place_order / cancel_order only queue the request and
+    # return a 'pending' order with a client order id. flush() sends the queue after `latency`
+    # seconds; the outcome of each order is handed back on the next step, as an own_trade update
+    # (immediate fill) or the order itself with type 'limit_order' (resting), with client ids.
+    def __init__(self, exchange, latency=0.0):
+        self.exchange = exchange
+        self.latency = latency
+        self._ids = itertools.count(1)
+        self._outbox = []
+        self._inbox = []
+        self._to_exchange = {}
+        self._to_client = {}
+
+    def place_order(self, ts, size, side, price):
+        order = SimpleNamespace(order_id=next(self._ids), ts=ts, side=side, size=size, price=price,
+                                type='pending')
+        self._outbox.append(('place', order))
+        return order
+
+    def cancel_order(self, ts, order_id):
+        self._outbox.append(('cancel', SimpleNamespace(ts=ts, order_id=order_id)))
+
+    @property
+    def pending(self):
+        return len(self._outbox)
+
+    async def flush(self):
+        outbox, self._outbox = self._outbox, []
+        if not outbox:
+            return
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        for kind, req in outbox:
+            if kind == 'cancel':
+                exchange_id = self._to_exchange.pop(req.order_id, None)
+                if exchange_id is not None:
+                    self._to_client.pop(exchange_id, None)
+                    self.exchange.cancel_order(req.ts, exchange_id)
+                continue
+            result = self.exchange.place_order(req.ts, req.size, req.side, req.price)
+            if getattr(result, 'type', None) == 'own_trade':
+                result.order_id = req.order_id
+                self._inbox.append(result)
+            else:
+                self._to_exchange[req.order_id] = result.order_id
+                self._to_client[result.order_id] = req.order_id
+                req.type = 'limit_order'
+                self._inbox.append(req)
+
+    def inbound(self, updates):
+        # exchange updates + outcomes of the last flush, with exchange order ids mapped to client ids
+        for update in updates:
+            if update.type == 'own_trade':
+                update.order_id = self._to_client.get(update.order_id, update.order_id)
+        if self._inbox:
+            updates = updates + self._inbox
+            self._inbox = []
+        return updates
+
+
+class LiveRunner:
+    def __init__(self, strategy, exchange, latency=0.0):
+        self.strategy = strategy
+        self.exchange = exchange
+        self.gateway = AsyncOrderGateway(exchange, latency)
+        strategy.sim = self.gateway
+        # update arrival to its quotes having been sent, per tick that quoted
+        self.latency_ns = array.array('q')
+        # time spent waiting for the previous tick's orders to be sent (backpressure), kept out of
+        # the tick-to-quote latency
+        self.flush_wait_ns = array.array('q')
+
+    async def run(self):
+        strategy, gateway, waits = self.strategy, self.gateway, self.flush_wait_ns
+        clock = time.perf_counter_ns
+        strategy.start(*self.exchange.horizon)
+        sending = None
+        while True:
+            ts, updates = await self.exchange.tick()
+            if sending is not None:
+                waited = clock()
+                await sending
+                waits.append(clock() - waited)
+            received = clock()
+            if updates is None:
+                break
+            strategy.step(ts, gateway.inbound(updates))
+            sending = asyncio.ensure_future(self._send(received)) if gateway.pending else None
+        return strategy.finish()
+
+    async def _send(self, received):
+        await self.gateway.flush()
+        self.latency_ns.append(time.perf_counter_ns() - received)
+
+    def latency_stats(self):
+        return _stats_us(self.latency_ns)
+
+    def flush_wait_stats(self):
+        return _stats_us(self.flush_wait_ns)
+
+
+def _stats_us(samples_ns):
+    if not samples_ns:
+        return {}
+    us = np.frombuffer(samples_ns, dtype=np.int64) / 1000
+    return {'count': len(us), 'mean_us': float(us.mean()),
+            'p50_us': float(np.percentile(us, 50)), 'p99_us': float(np.percentile(us, 99)),
+            'max_us': float(us.max())}
+
+
+def main():
+    from strategy.stoikov import StoikovStrategy
+
+    parser = argparse.ArgumentParser(description='Run StoikovStrategy on a replayed or live feed.')
+    parser.add_argument('--replay', help='CSV or .ticks file to play back')
+    parser.add_argument('--speed', type=float, default=None, help='replay speed-up (default: unpaced)')
+    parser.add_argument('--symbol', default='BTC/USDT')
+    parser.add_argument('--timeframe', default='1m')
+    parser.add_argument('--exchange', default='binance')
+    parser.add_argument('--latency', type=float, default=0.0, help='simulated order gateway latency, s')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    if args.replay:
+        exchange = ReplayExchange(RealDataSim(args.replay, seed=args.seed), speed=args.speed)
+        sigma = exchange.sim.realized_sigma
+    else:
+        exchange = PaperExchange(CcxtFeed(args.symbol, args.timeframe, args.exchange), seed=args.seed)
+        sigma = 0.02
+    strategy = StoikovStrategy(sim=None, gamma=0.05, k=1.5, sigma=sigma, terminal_time=True,
+                               adjust_delay=1, order_size=1, min_order_size=1, precision=2)
+    runner = LiveRunner(strategy, exchange, latency=args.latency)
+
+    async def session():
+        try:
+            return await runner.run()
+        finally:
+            if hasattr(exchange, 'close'):
+                await exchange.close()
+
+    trades, _, _, orders = asyncio.run(session())
+    print(f"{len(trades)} fills, {len(orders)} resting orders, final position {strategy.cur_pos}")
+    print('tick-to-quote latency:', runner.latency_stats())
+    print('wait for previous send:', runner.flush_wait_stats())
+
+
+if __name__ == '__main__':
+    main()
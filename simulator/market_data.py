@@ -0,0 +1,151 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+
+COLUMNS = (
+    ('receive_ts', np.int64),
+    ('price', np.float64),
+    ('bid_price', np.float64),
+    ('ask_price', np.float64),
+    ('volume', np.float64),
+    ('open', np.float64),
+    ('high', np.float64),
+    ('low', np.float64),
+)
+
+
+class MdView:
+    # Lightweight per-tick view into MarketData; fields are read lazily from the columns.
+    __slots__ = ('_md', '_i')
+    type = 'md'
+
+    def __init__(self, md, i):
+        self._md = md
+        self._i = i
+
+    @property
+    def receive_ts(self):
+        return self._md.receive_ts[self._i]
+
+    @property
+    def price(self):
+        return self._md.price[self._i]
+
+    @property
+    def bid_price(self):
+        return self._md.bid_price[self._i]
+
+    @property
+    def ask_price(self):
+        return self._md.ask_price[self._i]
+
+    @property
+    def volume(self):
+        return self._md.volume[self._i]
+
+    @property
+    def open(self):
+        return self._md.open[self._i]
+
+    @property
+    def high(self):
+        return self._md.high[self._i]
+
+    @property
+    def low(self):
+        return self._md.low[self._i]
+
+    def __repr__(self):
+        return (f"MdView(receive_ts={self.receive_ts}, price={self.price}, "
+                f"bid_price={self.bid_price}, ask_price={self.ask_price})")
+
+
+class MarketData:
+    # Columnar market data: one contiguous NumPy array per field.
+    def __init__(self, receive_ts, price, bid_price, ask_price, volume=None,
+                 open=None, high=None, low=None):
+        self.receive_ts = np.ascontiguousarray(receive_ts, dtype=np.int64)
+        self.price = np.ascontiguousarray(price, dtype=np.float64)
+        self.bid_price = np.ascontiguousarray(bid_price, dtype=np.float64)
+        self.ask_price = np.ascontiguousarray(ask_price, dtype=np.float64)
+        if volume is None:
+            volume = np.zeros(len(self.price))
+        self.volume = np.ascontiguousarray(volume, dtype=np.float64)
+        # Bars without OHLC detail collapse to the close price
+        self.open = self.price if open is None else np.ascontiguousarray(open, dtype=np.float64)
+        self.high = self.price if high is None else np.ascontiguousarray(high, dtype=np.float64)
+        self.low = self.price if low is None else np.ascontiguousarray(low, dtype=np.float64)
+
+    @classmethod
+    def from_ohlcv(cls, timestamp, close, volume=None, spread=1.0, open=None, high=None, low=None):
+        close = np.asarray(close, dtype=np.float64)
+        keep = ~np.isnan(close)
+        if keep.all():
+            keep = slice(None)  # basic slicing keeps memory-mapped columns zero-copy
+        close = close[keep]
+
+        def column(values):
+            return None if values is None else np.asarray(values, dtype=np.float64)[keep]
+
+        return cls(
+            receive_ts=np.asarray(timestamp)[keep],
+            price=close,
+            bid_price=close - spread / 2,
+            ask_price=close + spread / 2,
+            volume=column(volume),
+            open=column(open),
+            high=column(high),
+            low=column(low),
+        )
+
+    @classmethod
+    def from_frame(cls, df, spread=1.0):
+        optional = {name: df[name].to_numpy() for name in ('volume', 'open', 'high', 'low')
+                    if name in df.columns}
+        return cls.from_ohlcv(df['timestamp'].to_numpy(), df['close'].to_numpy(), spread=spread,
+                              **optional)
+
+    @classmethod
+    def from_buffer(cls, buf, n):
+        # Zero-copy columns laid out back to back in `buf` (see to_shared_memory).
+        cols = {}
+        offset = 0
+        for name, dtype in COLUMNS:
+            cols[name] = np.ndarray((n,), dtype=dtype, buffer=buf, offset=offset)
+            offset += n * np.dtype(dtype).itemsize
+        return cls(**cols)
+
+    def to_shared_memory(self):
+        # Copies the columns into one SharedMemory block; workers attach with attach_shared().
+        # The caller owns the block and must close() and unlink() it.
+        shm = shared_memory.SharedMemory(create=True, size=max(self.nbytes, 1))
+        shared = MarketData.from_buffer(shm.buf, len(self))
+        for name, _ in COLUMNS:
+            getattr(shared, name)[:] = getattr(self, name)
+        return shm
+
+    @classmethod
+    def attach_shared(cls, name, n):
+        shm = shared_memory.SharedMemory(name=name)
+        return shm, cls.from_buffer(shm.buf, n)
+
+    def __len__(self):
+        return len(self.price)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return MarketData(**{name: getattr(self, name)[i] for name, _ in COLUMNS})
+        n = len(self.price)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError('market data index out of range')
+        return MdView(self, i)
+
+    def __iter__(self):
+        for i in range(len(self.price)):
+            yield MdView(self, i)
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name, _ in COLUMNS)
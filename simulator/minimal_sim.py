@@ -1,8 +1,16 @@
+import math
 import numpy as np
 from types import SimpleNamespace
+from simulator.orders import Order
+from simulator.synthetic import next_price
 
 class MinimalSim:
-    def __init__(self, T=200, start_price=100.0, sigma=0.1):
+    def __init__(self, T=200, start_price=100.0, sigma=0.1, seed=None, rng=None, model=None):
+        # model=None keeps the original i.i.d. noise around start_price; 'arithmetic', 'gbm' or
+        # 'jump' generate a random walk (see simulator.synthetic, where sigma is per step)
+        self.rng = rng if rng is not None else np.random.default_rng(seed)
+        self.model = model
+        self._path_price = start_price
         self.T = T
         self.t = 0
         self.cur_price = start_price
@@ -12,7 +20,10 @@ class MinimalSim:
         self.orders = {}
 
     def _generate_md(self, t):
-        price = self.cur_price + np.random.randn() * self.sigma
+        if self.model is None:
+            price = self.cur_price + self.rng.standard_normal() * self.sigma
+        else:
+            price = self._path_price = next_price(self._path_price, self.model, self.sigma, self.rng)
         return SimpleNamespace(
             receive_ts=t,
             price=price,
@@ -34,27 +45,12 @@ class MinimalSim:
         mid = self.cur_price
         dist = abs(mid - price)
         k_fill = 1.5  
-        fill_prob = 1 - np.exp(-k_fill * dist)
+        fill_prob = 1 - math.exp(-k_fill * dist)
 
-        order = SimpleNamespace(
-            order_id=self.order_id,
-            ts=ts,
-            size=size,
-            side=side,
-            price=price
-        )
-
-        if np.random.rand() < fill_prob:
-            trade = SimpleNamespace(
-                order_id=order.order_id,
-                side=side,
-                size=size,
-                ts=ts,
-                price=price,
-                type='own_trade'
-            )
-            return trade
+        if self.rng.random() < fill_prob:
+            return Order(self.order_id, ts, side, size, price, 'own_trade')
 
+        order = Order(self.order_id, ts, side, size, price, 'limit_order')
         self.orders[self.order_id] = order
         return order
 
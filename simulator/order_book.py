@@ -0,0 +1,175 @@
+import heapq
+
+from simulator.orders import Order
+from simulator.real_data_sim import RealDataSim
+
+
+class RestingOrder:
+    def __init__(self, order_id, ts, side, price, size, queue_ahead):
+        self.type = 'limit_order'
+        self.order_id = order_id
+        self.ts = ts
+        self.side = side
+        self.price = price
+        self.size = size
+        self.remaining = size
+        self.queue_ahead = queue_ahead
+
+    def __repr__(self):
+        return (f"RestingOrder(order_id={self.order_id}, side={self.side}, price={self.price}, "
+                f"remaining={self.remaining}, queue_ahead={self.queue_ahead:.4f})")
+
+
+class _BookSide:
+    # Price levels of one side. Each level is an insertion-ordered dict (FIFO, O(1) cancel);
+    # best price comes from a heap with lazy deletion of emptied levels: O(log n) per level.
+    def __init__(self, is_bid):
+        self.sign = -1.0 if is_bid else 1.0  # heap key so that the best price is on top
+        self.levels = {}
+        self.heap = []
+
+    def add(self, order):
+        level = self.levels.get(order.price)
+        if level is None:
+            level = self.levels[order.price] = {}
+            heapq.heappush(self.heap, self.sign * order.price)
+        level[order.order_id] = order
+
+    def remove(self, order):
+        level = self.levels[order.price]
+        del level[order.order_id]
+        if not level:
+            del self.levels[order.price]
+            # compact once stale heap keys dominate, so heavy cancel traffic can't grow the heap
+            if len(self.heap) > 64 and len(self.heap) > 4 * len(self.levels):
+                self.heap = [self.sign * p for p in self.levels]
+                heapq.heapify(self.heap)
+
+    def best(self):
+        heap = self.heap
+        while heap:
+            price = self.sign * heap[0]
+            if price in self.levels:
+                return price
+            heapq.heappop(heap)
+        return None
+
+    def __len__(self):
+        return sum(len(level) for level in self.levels.values())
+
+
+class OrderBook:
+    # Own resting orders with queue position tracked from traded volume.
+    def __init__(self):
+        self.bids = _BookSide(is_bid=True)
+        self.asks = _BookSide(is_bid=False)
+        self.orders = {}
+
+    def add(self, order):
+        self.orders[order.order_id] = order
+        (self.bids if order.side == 'BID' else self.asks).add(order)
+
+    def cancel(self, order_id):
+        order = self.orders.pop(order_id, None)
+        if order is not None:
+            (self.bids if order.side == 'BID' else self.asks).remove(order)
+        return order
+
+    def match(self, ts, low, high, volume, touch_volume):
+        # Matches resting orders against one bar. The volume traded at or through a level grows
+        # linearly from `touch_volume` at the bar's extreme (low for bids, high for asks) to the
+        # whole bar `volume` at the opposite end of the range; at each level it first works down
+        # the queue ahead of our orders (FIFO), and only the rest fills them. Volume that filled
+        # our orders at a better level does not reach deeper ones.
+        trades = []
+        self._match_side(self.bids, ts, low, high, volume, touch_volume, trades)
+        self._match_side(self.asks, ts, high, low, volume, touch_volume, trades)
+        return trades
+
+    def _match_side(self, book, ts, extreme, opposite, volume, touch_volume, trades):
+        sign, limit = book.sign, book.sign * extreme
+        best = book.best()
+        if best is None or sign * best > limit:
+            return
+        width = abs(opposite - extreme)
+        filled = 0.0
+        # every level the bar reached, best first: the queue ahead at each level sees that
+        # level's traded volume even when ours further up were not completely filled
+        for price in sorted((p for p in book.levels if sign * p <= limit), key=lambda p: sign * p):
+            depth = min(abs(price - extreme) / width, 1.0) if width > 0 else 0.0
+            available = touch_volume + (volume - touch_volume) * depth - filled
+            for order in list(book.levels[price].values()):
+                if available <= 0:
+                    break
+                used = min(available, order.queue_ahead)
+                order.queue_ahead -= used
+                available -= used
+                fill = min(available, order.remaining) if order.queue_ahead <= 0 else 0.0
+                available -= fill
+                filled += fill
+                if fill > 0:
+                    order.remaining -= fill
+                    trades.append(Order(order.order_id, ts, order.side, fill, order.price, 'own_trade'))
+                    if order.remaining <= 0:
+                        del self.orders[order.order_id]
+                        book.remove(order)
+
+    def __len__(self):
+        return len(self.orders)
+
+
+class OrderBookSim(RealDataSim):
+    # Event-driven variant of RealDataSim: limit orders rest in an OrderBook across ticks until
+    # filled by later bars or cancelled. Fills of resting orders arrive from tick() as
+    # 'own_trade' updates after the 'md' update. Orders crossing the current bid/ask fill
+    # immediately at the touch.
+    queue_position_ratio = 0.5  # share of the placement bar's volume assumed queued ahead of us
+    touch_volume_fraction = 0.1  # share of a bar's volume traded at its high/low extreme
+
+    def __init__(self, csv_path, queue_position_ratio=0.5, touch_volume_fraction=0.1, **kwargs):
+        super().__init__(csv_path, **kwargs)
+        self.queue_position_ratio = queue_position_ratio
+        self.touch_volume_fraction = touch_volume_fraction
+
+    def _setup(self, *args):
+        super()._setup(*args)
+        self.book = OrderBook()
+        self.n_events = 0
+
+    def tick(self):
+        if self.t >= len(self.md_queue):
+            return self.t, None
+        i = self.t
+        update = self.md_queue[i]
+        self.t += 1
+        if not self.book.orders:
+            return self.t, [update]
+        md = self.md_queue
+        trades = self.book.match(self.t, md.low[i], md.high[i], md.volume[i],
+                                 md.volume[i] * self.touch_volume_fraction)
+        self.n_events += len(trades)
+        return self.t, [update, *trades]
+
+    def place_order(self, ts, size, side, price):
+        self.n_events += 1
+        order_id = next(self._order_ids)
+        if ts > 0:
+            i = ts - 1
+            md = self.md_queue
+            if side == 'BID' and price >= md.ask_price[i]:
+                return self._trade(order_id, ts, side, size, md.ask_price[i])
+            if side == 'ASK' and price <= md.bid_price[i]:
+                return self._trade(order_id, ts, side, size, md.bid_price[i])
+            queue_ahead = self.queue_position_ratio * md.volume[i]
+        else:
+            queue_ahead = 0.0
+        order = RestingOrder(order_id, ts, side, price, size, queue_ahead)
+        self.book.add(order)
+        return order
+
+    def _trade(self, order_id, ts, side, size, price):
+        return Order(order_id, ts, side, size, price, 'own_trade')
+
+    def cancel_order(self, ts, order_id):
+        self.n_events += 1
+        return self.book.cancel(order_id) is not None
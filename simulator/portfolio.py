@@ -0,0 +1,157 @@
+import heapq
+import math
+
+from strategy.engine import BacktestEngine
+from strategy.recorder import Columns
+
+
+class PortfolioSim:
+    # Shared event clock over single-symbol simulators: tick() advances whichever symbol has the
+    # earliest next receive_ts (heap-based k-way merge, O(log k) per event; ties go to the symbol
+    # listed first).
+    def __init__(self, sims):
+        self.sims = dict(sims)
+        self.symbols = list(self.sims)
+        self._sims = [self.sims[s] for s in self.symbols]
+        self._ts_columns = [getattr(sim.md_queue, 'receive_ts', None) for sim in self._sims]
+        self._heap = []
+        for i in range(len(self._sims)):
+            ts = self._next_ts(i)
+            if ts is not None:
+                self._heap.append((ts, i))
+        heapq.heapify(self._heap)
+
+    def _next_ts(self, i):
+        sim = self._sims[i]
+        if sim.t >= len(sim.md_queue):
+            return None
+        column = self._ts_columns[i]
+        return int(column[sim.t]) if column is not None else sim.md_queue[sim.t].receive_ts
+
+    def next_event(self):
+        # (symbol index, receive_ts, sim ts, updates), or None when every stream is exhausted
+        heap = self._heap
+        if not heap:
+            return None
+        ts, i = heap[0]
+        cur_time, updates = self._sims[i].tick()
+        nxt = self._next_ts(i)
+        if nxt is None:
+            heapq.heappop(heap)
+        else:
+            heapq.heapreplace(heap, (nxt, i))
+        return i, ts, cur_time, updates
+
+    def tick(self):
+        event = self.next_event()
+        if event is None:
+            return None, None, None
+        i, _, cur_time, updates = event
+        return self.symbols[i], cur_time, updates
+
+
+class _SymbolRisk:
+    # Portfolio limits as seen by one strategy's engine (BacktestEngine.risk)
+    __slots__ = ('portfolio', 'i')
+
+    def __init__(self, portfolio, i):
+        self.portfolio = portfolio
+        self.i = i
+
+    def allow(self, side, size, cur_pos):
+        new_pos = cur_pos + size if side == 'BID' else cur_pos - size
+        if abs(new_pos) <= abs(cur_pos):
+            return True  # reducing exposure is always allowed
+        p = self.portfolio
+        if p.now < p.halted_until:
+            p.n_blocked += 1
+            return False
+        if p.max_gross_notional is not None:
+            projected = p.gross_notional - p._notional[self.i] + abs(new_pos) * p._mid[self.i]
+            if projected > p.max_gross_notional:
+                p.n_blocked += 1
+                return False
+        return True
+
+
+class Portfolio:
+    # One strategy per symbol (a strategy.engine.Strategy, e.g. StoikovStrategy or NaiveMMStrategy;
+    # limits are checked in its engine's place_order) on one event clock, with portfolio-level limits:
+    #   max_gross_notional - sum over symbols of |position| * last price; orders that would raise
+    #                        it above the limit are not placed
+    #   max_drawdown       - when portfolio PnL falls this far below its peak, orders that add
+    #                        exposure are blocked for `pause` (receive_ts units, ms by default)
+    def __init__(self, strategies, max_gross_notional=None, max_drawdown=None, pause=1_800_000,
+                 decimation=1):
+        self.strategies = dict(strategies)
+        self.symbols = list(self.strategies)
+        for symbol, st in self.strategies.items():
+            if not isinstance(getattr(st, 'engine', None), BacktestEngine):
+                raise TypeError(f"{symbol}: {type(st).__name__} does not route orders through a "
+                                "BacktestEngine, so portfolio limits cannot be applied to it")
+        self.sim = PortfolioSim({s: st.sim for s, st in self.strategies.items()})
+        self.max_gross_notional = max_gross_notional
+        self.max_drawdown = max_drawdown
+        self.pause = pause
+        self.decimation = decimation
+
+        n = len(self.symbols)
+        self._pnl = [0.0] * n
+        self._notional = [0.0] * n
+        self._mid = [math.nan] * n
+        self.pnl = 0.0
+        self.max_pnl = 0.0
+        self.gross_notional = 0.0
+        self.now = -math.inf
+        self.halted_until = -math.inf
+        self.n_events = 0
+        self.n_blocked = 0
+        self.logs = []
+        self.series = Columns(('receive_ts', 'pnl', 'gross_notional'))
+        for i, symbol in enumerate(self.symbols):
+            self.strategies[symbol].risk = _SymbolRisk(self, i)
+
+    def run(self):
+        strategies = [self.strategies[s] for s in self.symbols]
+        for st in strategies:
+            st.start(st.sim.md_queue[0].receive_ts, st.sim.md_queue[-1].receive_ts)
+        append_ts, append_pnl, append_gross = self.series.appenders()
+        next_event = self.sim.next_event
+        pnl_by, notional_by, mid_by = self._pnl, self._notional, self._mid
+
+        while True:
+            event = next_event()
+            if event is None:
+                break
+            i, ts, cur_time, updates = event
+            self.now = ts
+            st = strategies[i]
+            mid_by[i] = updates[0].price
+            st.step(cur_time, updates)
+
+            # mark this symbol to market; other symbols keep their last marks
+            pos = st.cur_pos
+            pnl = st.cash + pos * mid_by[i]
+            notional = abs(pos) * mid_by[i]
+            self.pnl += pnl - pnl_by[i]
+            self.gross_notional += notional - notional_by[i]
+            pnl_by[i] = pnl
+            notional_by[i] = notional
+            self._check_drawdown(ts)
+
+            if self.n_events % self.decimation == 0:
+                append_ts(ts)
+                append_pnl(self.pnl)
+                append_gross(self.gross_notional)
+            self.n_events += 1
+
+        return {symbol: st.finish() for symbol, st in zip(self.symbols, strategies)}
+
+    def _check_drawdown(self, ts):
+        if self.max_drawdown is None:
+            return
+        self.max_pnl = max(self.max_pnl, self.pnl)
+        drawdown = self.max_pnl - self.pnl
+        if drawdown > self.max_drawdown and ts >= self.halted_until:
+            self.halted_until = ts + self.pause
+            self.logs.append({'time': ts, 'event': 'portfolio_drawdown_pause', 'drawdown': drawdown})
@@ -0,0 +1,183 @@
+"""Opt-in hot-path instrumentation for backtest runs.
+
+    profiler = Profiler(label='stoikov', trace_memory=True)
+    with profiler.instrument(strategy):
+        strategy.run()
+    profiler.save('results/profile.json')
+
+    python -m simulator.profiling results/base.json results/profile.json
+
+instrument() swaps timed wrappers onto the instance attributes of the strategy
+and its simulator for the duration of the block and restores them afterwards,
+so un-profiled runs execute the original code with zero added overhead.
+"""
+import argparse
+import json
+import platform
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+
+# (attribute, phase name) pairs timed when present on the strategy
+STRATEGY_PHASES = (
+    ('_update_volatility', 'volatility'),
+    ('_check_drawdown', 'risk'),
+    ('_compute_quotes', 'quote'),
+    ('_emit', 'print'),
+)
+
+
+class Profiler:
+    def __init__(self, label='', trace_memory=False):
+        self.label = label
+        self.trace_memory = trace_memory
+        self.totals = defaultdict(float)
+        self.calls = defaultdict(int)
+        self.counters = defaultdict(int)
+        self.wall_time = 0.0
+        self.memory = {}
+
+    def _timed(self, phase, fn):
+        totals, calls, clock = self.totals, self.calls, time.perf_counter
+
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                totals[phase] += clock() - start
+                calls[phase] += 1
+        return wrapper
+
+    def _timed_tick(self, fn):
+        wrapper = self._timed('tick', fn)
+        counters = self.counters
+
+        def tick():
+            ts, updates = wrapper()
+            if updates is not None:
+                counters['ticks'] += 1
+                for update in updates:
+                    if update.type == 'own_trade':
+                        counters['fills'] += 1
+            return ts, updates
+        return tick
+
+    def _timed_place_order(self, fn):
+        wrapper = self._timed('place_order', fn)
+        counters = self.counters
+
+        def place_order(*args, **kwargs):
+            result = wrapper(*args, **kwargs)
+            counters['orders'] += 1
+            if getattr(result, 'type', None) == 'own_trade':
+                counters['fills'] += 1
+            return result
+        return place_order
+
+    def _timed_cancel(self, fn):
+        wrapper = self._timed('cancel_order', fn)
+        counters = self.counters
+
+        def cancel_order(*args, **kwargs):
+            counters['cancels'] += 1
+            return wrapper(*args, **kwargs)
+        return cancel_order
+
+    @contextmanager
+    def instrument(self, strategy, sim=None):
+        sim = sim if sim is not None else getattr(strategy, 'sim', None)
+        patches = []
+        if sim is not None:
+            patches += [(sim, 'tick', self._timed_tick(sim.tick)),
+                        (sim, 'place_order', self._timed_place_order(sim.place_order)),
+                        (sim, 'cancel_order', self._timed_cancel(sim.cancel_order))]
+        for attr, phase in STRATEGY_PHASES:
+            if hasattr(strategy, attr):
+                patches.append((strategy, attr, self._timed(phase, getattr(strategy, attr))))
+
+        saved = [(obj, attr, vars(obj).get(attr)) for obj, attr, _ in patches]
+        for obj, attr, wrapper in patches:
+            setattr(obj, attr, wrapper)
+        if self.trace_memory:
+            tracemalloc.start()
+            before = tracemalloc.take_snapshot()
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.wall_time += time.perf_counter() - start
+            if self.trace_memory:
+                after = tracemalloc.take_snapshot()
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                diff = after.compare_to(before, 'filename')
+                ticks = max(self.counters['ticks'], 1)
+                self.memory = {
+                    'peak_bytes': peak,
+                    'net_blocks_per_tick': sum(d.count_diff for d in diff) / ticks,
+                    'net_bytes_per_tick': sum(d.size_diff for d in diff) / ticks,
+                }
+            for obj, attr, original in saved:
+                if original is not None:
+                    setattr(obj, attr, original)
+                else:
+                    # drop the instance attribute so the class method is visible again
+                    delattr(obj, attr)
+
+    def report(self):
+        wall = self.wall_time or float('nan')
+        phases = {
+            phase: {
+                'calls': self.calls[phase],
+                'total_s': total,
+                'mean_us': 1e6 * total / self.calls[phase] if self.calls[phase] else 0.0,
+                'share': total / wall,
+            }
+            for phase, total in sorted(self.totals.items(), key=lambda kv: -kv[1])
+        }
+        counters = dict(self.counters)
+        return {
+            'label': self.label,
+            'python': platform.python_version(),
+            'wall_time_s': self.wall_time,
+            'phases': phases,
+            'counters': counters,
+            'rates': {f'{name}_per_s': counters.get(name, 0) / wall
+                      for name in ('ticks', 'orders', 'fills')},
+            'memory': self.memory,
+        }
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+
+
+def compare_reports(base, new):
+    # new / base ratios for wall time, rates and per-call phase cost
+    out = {'wall_time_ratio': new['wall_time_s'] / base['wall_time_s'] if base['wall_time_s'] else None,
+           'rates': {}, 'phases_mean_us_ratio': {}}
+    for name, value in new['rates'].items():
+        ref = base['rates'].get(name)
+        out['rates'][name] = value / ref if ref else None
+    for phase, stats in new['phases'].items():
+        ref = base['phases'].get(phase)
+        out['phases_mean_us_ratio'][phase] = stats['mean_us'] / ref['mean_us'] if ref and ref['mean_us'] else None
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare two profiler reports (new / base).')
+    parser.add_argument('base')
+    parser.add_argument('new')
+    args = parser.parse_args()
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    print(json.dumps(compare_reports(base, new), indent=2))
+
+
+if __name__ == '__main__':
+    main()
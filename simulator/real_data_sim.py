@@ -1,34 +1,78 @@
-import pandas as pd
 import numpy as np
-import math
-import random
-from types import SimpleNamespace
+import itertools
 from strategy.execution import ExecutionModel  
+from simulator.market_data import MarketData
+from simulator.orders import Order
+from simulator.streaming import ChunkedMarketData
+from simulator import tick_cache
 
 class RealDataSim:
-    def __init__(self, csv_path, spread=1.0, k_bid=1.5, k_ask=1.5):
-        self.df = pd.read_csv(csv_path).sort_values(by='timestamp')
+    queue_position_ratio = 0.5
+
+    def __init__(self, csv_path, spread=1.0, k_bid=1.5, k_ask=1.5, seed=None,
+                 chunksize=None, stream_stats=None, use_cache=True):
+        # where md_queue came from, so checkpoints can re-open it instead of storing it
+        self.source = None if chunksize is not None else (str(csv_path), spread, use_cache)
+        cache_path = csv_path if str(csv_path).endswith(tick_cache.SUFFIX) else tick_cache.cache_path_for(csv_path)
+        if use_cache and chunksize is None and tick_cache.is_fresh(cache_path, csv_path):
+            # Memory-mapped binary cache: no CSV parsing
+            md_queue, _ = tick_cache.load_market_data(cache_path, spread)
+            realized_sigma = tick_cache.realized_sigma(md_queue.price)
+            self._setup(md_queue, realized_sigma, spread, k_bid, k_ask, seed)
+            return
+
+        if chunksize is not None:
+            # Out-of-core replay: bounded memory, requires the file sorted by timestamp
+            md_queue = ChunkedMarketData(csv_path, chunksize, spread, stats=stream_stats)
+            self._setup(md_queue, md_queue.stats.realized_sigma, spread, k_bid, k_ask, seed)
+            return
+
+        import pandas as pd  # only needed to parse CSV input; cached / streamed data skip it
+        df = pd.read_csv(csv_path).sort_values(by='timestamp')
+        log_return = np.log(df['close'] / df['close'].shift(1))
+        realized_sigma = log_return.std() * np.sqrt(1440)
+
+        md_queue = MarketData.from_frame(df, spread)
+        self._setup(md_queue, realized_sigma, spread, k_bid, k_ask, seed)
+
+    @classmethod
+    def from_market_data(cls, md_queue, realized_sigma, spread=1.0, k_bid=1.5, k_ask=1.5, seed=None):
+        # Build a sim over already-loaded (possibly shared) market data without re-reading the CSV.
+        sim = cls.__new__(cls)
+        sim.source = None
+        sim._setup(md_queue, realized_sigma, spread, k_bid, k_ask, seed)
+        return sim
+
+    # Pickled state leaves out md_queue (re-attached by simulator.checkpoint) and stores the order
+    # id counter as a plain int.
+    def __getstate__(self):
+        if isinstance(self.md_queue, ChunkedMarketData):
+            raise TypeError("streaming (chunksize=...) replays cannot be checkpointed")
+        state = self.__dict__.copy()
+        next_id = next(self._order_ids)
+        self._order_ids = itertools.count(next_id)
+        state['_order_ids'] = next_id
+        state['md_queue'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._order_ids = itertools.count(state['_order_ids'])
+
+    def load_source(self):
+        csv_path, spread, use_cache = self.source
+        return RealDataSim(csv_path, spread, use_cache=use_cache).md_queue
+
+    def _setup(self, md_queue, realized_sigma, spread, k_bid, k_ask, seed):
         self.spread = spread
         self.k_bid = k_bid
         self.k_ask = k_ask
         self.t = 0
+        self.realized_sigma = realized_sigma
+        self.md_queue = md_queue
+        self._order_ids = itertools.count(1)
 
-        self.df['log_return'] = np.log(self.df['close'] / self.df['close'].shift(1))
-        self.realized_sigma = self.df['log_return'].std() * np.sqrt(1440)
-
-        self.md_queue = [
-            SimpleNamespace(
-                receive_ts=row['timestamp'],
-                price=row['close'],
-                bid_price=row['close'] - spread / 2,
-                ask_price=row['close'] + spread / 2,
-                type='md'
-            )
-            for _, row in self.df.iterrows()
-            if not np.isnan(row['close'])
-        ]
-
-        self.execution_model = ExecutionModel()  
+        self.execution_model = ExecutionModel(seed=seed)
 
     def tick(self):
         if self.t >= len(self.md_queue):
@@ -41,39 +85,25 @@ class RealDataSim:
         if ts == 0:
             return self._limit_order(ts, size, side, price)
 
-        mid = self.md_queue[ts - 1].price
-        new_mid = self.md_queue[ts].price if ts < len(self.md_queue) else mid
+        prices = self.md_queue.price
+        mid = prices[ts - 1]
+        new_mid = prices[ts] if ts < len(prices) else mid
         price_movement = new_mid - mid
 
         price_distance = abs(price - mid) / mid
-        queue_position_ratio = 0.5  
 
         result = self.execution_model.simulate_fill(
-            queue_position_ratio, price_distance, price_movement
+            self.queue_position_ratio, price_distance, price_movement
         )
 
         if result in ["filled", "slippage"]:
             exec_price = price if result == "filled" else new_mid  
-            return SimpleNamespace(
-                order_id=ts,
-                ts=ts,
-                side=side,
-                size=size,
-                price=exec_price,
-                type='own_trade'
-            )
+            return Order(next(self._order_ids), ts, side, size, exec_price, 'own_trade')
         else:
             return self._limit_order(ts, size, side, price)
 
     def _limit_order(self, ts, size, side, price):
-        return SimpleNamespace(
-            order_id=ts,
-            ts=ts,
-            side=side,
-            size=size,
-            price=price,
-            type='limit_order'
-        )
+        return Order(next(self._order_ids), ts, side, size, price, 'limit_order')
 
     def cancel_order(self, ts, order_id):
         pass  
@@ -0,0 +1,158 @@
+"""Content-addressed cache of run outputs.
+
+A run is identified by a hash of everything that determines its result: the
+data file's contents, simulator settings, strategy parameters, the seed and
+the source of the simulation code. Outputs are stored as one uncompressed
+.npz of flat numpy arrays per key (fills, mid prices, PnL series, ...). The
+directory is bounded by `max_bytes`; least recently used entries are evicted
+first. Unseeded runs are not deterministic and should not be cached.
+
+    cache = RunCache('results/cache')
+    key = cache.key(data=cache.data_digest('BTCUSDT_1min.csv'), code=code_digest(MODULES),
+                    params={'gamma': 0.05}, seed=7)
+    outputs = cache.cached(key, lambda: {'pnl': run()})   # simulated once, then read from disk
+"""
+import hashlib
+import importlib
+import json
+import os
+import zipfile
+
+import numpy as np
+
+FORMAT_VERSION = 1
+SUFFIX = '.npz'
+
+
+def file_digest(path, chunk_size=1 << 20):
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def code_digest(modules):
+    # hash of the source files of the given module names: editing the simulation code
+    # invalidates the runs cached with it
+    h = hashlib.blake2b(digest_size=16)
+    for name in modules:
+        with open(importlib.import_module(name).__file__, 'rb') as f:
+            h.update(name.encode())
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def _jsonable(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"cannot hash {type(value).__name__} in a run configuration")
+
+
+class RunCache:
+    def __init__(self, root='results/cache', max_bytes=256 * 2**20):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(root, exist_ok=True)
+        self._digests_path = os.path.join(root, 'digests.json')
+
+    def key(self, **config):
+        # Hex key of a JSON-serializable configuration (dict order does not matter)
+        text = json.dumps({'version': FORMAT_VERSION, **config}, sort_keys=True,
+                          separators=(',', ':'), default=_jsonable)
+        return hashlib.blake2b(text.encode(), digest_size=20).hexdigest()
+
+    def data_digest(self, path):
+        # file_digest(path), re-hashed only when the file's size or mtime changed
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        try:
+            with open(self._digests_path) as f:
+                digests = json.load(f)
+        except (FileNotFoundError, ValueError):
+            digests = {}
+        stamp = [st.st_size, st.st_mtime_ns]
+        entry = digests.get(path)
+        if entry is not None and entry[:2] == stamp:
+            return entry[2]
+        digest = file_digest(path)
+        digests[path] = stamp + [digest]
+        tmp = f"{self._digests_path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(digests, f)
+        os.replace(tmp, self._digests_path)
+        return digest
+
+    def path(self, key):
+        return os.path.join(self.root, key + SUFFIX)
+
+    def get(self, key):
+        # {name: array} stored under key, or None
+        path = self.path(key)
+        try:
+            with np.load(path, allow_pickle=False) as f:
+                outputs = {name: f[name] for name in f.files}
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError, zipfile.BadZipFile):
+            # truncated or foreign file: drop it and recompute
+            os.remove(path)
+            self.misses += 1
+            return None
+        os.utime(path)  # mtime is the recency used by evict()
+        self.hits += 1
+        return outputs
+
+    def put(self, key, outputs):
+        path = self.path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            np.savez(f, **outputs)
+        os.replace(tmp, path)
+        self.evict()
+
+    def cached(self, key, compute):
+        # outputs under key; on a miss, compute() (returning {name: array-like}) is run and stored
+        outputs = self.get(key)
+        if outputs is None:
+            outputs = {name: np.asarray(value) for name, value in compute().items()}
+            self.put(key, outputs)
+        return outputs
+
+    def entries(self):
+        # [(mtime_ns, size, path)] of the stored runs, least recently used first
+        out = []
+        with os.scandir(self.root) as it:
+            for entry in it:
+                if entry.name.endswith(SUFFIX):
+                    st = entry.stat()
+                    out.append((st.st_mtime_ns, st.st_size, entry.path))
+        return sorted(out)
+
+    def nbytes(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, max_bytes=None):
+        # Removes least recently used runs until the total is within max_bytes; returns the count
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self):
+        return self.evict(0)
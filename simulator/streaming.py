@@ -0,0 +1,143 @@
+import math
+from collections import deque
+from types import SimpleNamespace
+
+import numpy as np
+
+from simulator.market_data import MarketData
+
+# Out-of-core market data: bars are read in bounded-size chunks (CSV chunks or Parquet row
+# groups) and only the current and the previous chunk are kept in memory. Input must already be
+# sorted by timestamp, which is how get_binance_data.py writes it.
+
+CSV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+
+def iter_frames(path, chunksize):
+    path = str(path)
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq  # optional dependency, only needed for Parquet input
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        import pandas as pd
+        header = pd.read_csv(path, nrows=0).columns
+        usecols = [c for c in CSV_COLUMNS if c in header]
+        yield from pd.read_csv(path, chunksize=chunksize, usecols=usecols)
+
+
+def scan_stats(path, chunksize=100_000, bars_per_day=1440):
+    # One streaming pass: row count, first/last timestamp and the realized sigma that
+    # RealDataSim computes in memory (std of close-to-close log returns, ddof=1, annualised per day).
+    n_rows = 0
+    first_ts = last_ts = prev_ts = None
+    prev_close = np.nan
+    count, mean, m2 = 0, 0.0, 0.0
+    for df in iter_frames(path, chunksize):
+        ts = df['timestamp'].to_numpy()
+        close = df['close'].to_numpy(dtype=np.float64)
+        if len(ts) == 0:
+            continue
+        if np.any(np.diff(ts) < 0) or (prev_ts is not None and ts[0] < prev_ts):
+            raise ValueError(f"{path} is not sorted by timestamp; streaming requires sorted input")
+        prev_ts = ts[-1]
+
+        r = np.diff(np.log(np.concatenate(([prev_close], close))))
+        r = r[~np.isnan(r)]
+        prev_close = close[-1]
+        if len(r):
+            # Chan et al. parallel merge of (count, mean, M2)
+            c_mean = r.mean()
+            c_m2 = ((r - c_mean) ** 2).sum()
+            total = count + len(r)
+            delta = c_mean - mean
+            mean += delta * len(r) / total
+            m2 += c_m2 + delta * delta * count * len(r) / total
+            count = total
+
+        valid = ts[~np.isnan(close)]
+        if len(valid):
+            first_ts = valid[0] if first_ts is None else first_ts
+            last_ts = valid[-1]
+            n_rows += len(valid)
+
+    std = math.sqrt(m2 / (count - 1)) if count > 1 else float('nan')
+    return SimpleNamespace(n_rows=n_rows, first_ts=first_ts, last_ts=last_ts,
+                           realized_sigma=std * math.sqrt(bars_per_day))
+
+
+class _StreamColumn:
+    def __init__(self, source, name):
+        self._source = source
+        self._name = name
+
+    def __len__(self):
+        return len(self._source)
+
+    def __getitem__(self, i):
+        chunk, j = self._source._locate(i)
+        return getattr(chunk, self._name)[j]
+
+
+class ChunkedMarketData:
+    # Drop-in md_queue for RealDataSim that reads forward through the file lazily.
+    # Supports forward access (tick, one-bar lookahead in place_order) plus md_queue[0] and
+    # md_queue[-1], which are served from the pre-scan statistics.
+    def __init__(self, path, chunksize=100_000, spread=1.0, stats=None):
+        self.path = path
+        self.chunksize = chunksize
+        self.spread = spread
+        self.stats = stats or scan_stats(path, chunksize)
+        self._frames = iter_frames(path, chunksize)
+        self._chunks = deque()  # (start index, MarketData); at most two kept
+        self._loaded_end = 0
+        self.price = _StreamColumn(self, 'price')
+        self.bid_price = _StreamColumn(self, 'bid_price')
+        self.ask_price = _StreamColumn(self, 'ask_price')
+        self.volume = _StreamColumn(self, 'volume')
+        # bar extremes for OrderBookSim's touch matching (the close where the file has no OHLC)
+        self.open = _StreamColumn(self, 'open')
+        self.high = _StreamColumn(self, 'high')
+        self.low = _StreamColumn(self, 'low')
+        self.receive_ts = _StreamColumn(self, 'receive_ts')
+
+    def __len__(self):
+        return self.stats.n_rows
+
+    def _load_next(self):
+        for df in self._frames:
+            chunk = MarketData.from_frame(df, self.spread)
+            if len(chunk):
+                self._chunks.append((self._loaded_end, chunk))
+                self._loaded_end += len(chunk)
+                if len(self._chunks) > 2:
+                    self._chunks.popleft()
+                return True
+        return False
+
+    def _locate(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError('market data index out of range')
+        while i >= self._loaded_end:
+            if not self._load_next():
+                raise IndexError('market data index out of range')
+        for start, chunk in self._chunks:
+            if start <= i < start + len(chunk):
+                return chunk, i - start
+        raise IndexError(f'index {i} was already released; streaming market data is forward-only')
+
+    def __getitem__(self, i):
+        # md_queue[0] / md_queue[-1] outside the resident window (StoikovStrategy reads their
+        # timestamps): answer from the pre-scan instead of seeking back or reading ahead.
+        if i == -1 and len(self) - 1 >= self._loaded_end:
+            return SimpleNamespace(receive_ts=self.stats.last_ts, type='md')
+        if i == 0 and self._chunks and self._chunks[0][0] > 0:
+            return SimpleNamespace(receive_ts=self.stats.first_ts, type='md')
+        chunk, j = self._locate(i)
+        return chunk[j]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
@@ -0,0 +1,74 @@
+import math
+
+import numpy as np
+
+from simulator import tick_cache
+
+# Synthetic price paths for scale testing. Models (per step, sigma = per-step volatility):
+#   'arithmetic' - price += sigma * N(0, 1)
+#   'gbm'        - price *= exp(sigma * N(0, 1) - sigma**2 / 2)
+#   'jump'       - gbm plus Poisson(jump_intensity) jumps of log-size N(0, jump_std)
+MODELS = ('arithmetic', 'gbm', 'jump')
+
+
+def next_price(price, model, sigma, rng, jump_intensity=0.001, jump_std=0.01):
+    # Scalar step, used by MinimalSim._generate_md
+    if model not in MODELS:
+        raise ValueError(f"unknown price model: {model}")
+    z = rng.standard_normal()
+    if model == 'arithmetic':
+        return price + z * sigma
+    log_step = sigma * z - 0.5 * sigma * sigma
+    if model == 'jump' and rng.random() < jump_intensity:
+        log_step += rng.normal(0.0, jump_std)
+    return price * math.exp(log_step)
+
+
+def price_path(n, model='gbm', start_price=60000.0, sigma=5e-4, rng=None,
+               jump_intensity=0.001, jump_std=0.01):
+    # Vectorized path of n prices following `model`, starting one step after start_price.
+    rng = rng if rng is not None else np.random.default_rng()
+    z = rng.standard_normal(n)
+    if model == 'arithmetic':
+        return start_price + np.cumsum(z * sigma)
+    if model not in MODELS:
+        raise ValueError(f"unknown price model: {model}")
+    log_steps = sigma * z - 0.5 * sigma * sigma
+    if model == 'jump':
+        jumps = rng.poisson(jump_intensity, n)
+        hit = jumps > 0
+        log_steps[hit] += rng.normal(0.0, jump_std, hit.sum()) * np.sqrt(jumps[hit])
+    return start_price * np.exp(np.cumsum(log_steps))
+
+
+def iter_ohlcv_chunks(n, chunk_size=1_000_000, model='gbm', start_price=60000.0, sigma=5e-4,
+                      seed=0, start_ts=1709251200000, step_ms=1000, **model_kwargs):
+    # Yields tick_cache column dicts for n bars, chunk by chunk, so 10^8-bar paths never have to
+    # be held in memory at once. Intra-bar high/low are drawn around open/close.
+    rng = np.random.default_rng(seed)
+    price = start_price
+    for start in range(0, n, chunk_size):
+        m = min(chunk_size, n - start)
+        close = price_path(m, model, price, sigma, rng, **model_kwargs)
+        open_ = np.concatenate(([price], close[:-1]))
+        wiggle = np.abs(rng.standard_normal((2, m))) * sigma * 0.5 * close
+        yield {
+            'timestamp': start_ts + step_ms * np.arange(start, start + m, dtype=np.int64),
+            'open': open_,
+            'high': np.maximum(open_, close) + wiggle[0],
+            'low': np.minimum(open_, close) - wiggle[1],
+            'close': close,
+            'volume': rng.exponential(10.0, m),
+        }
+        price = close[-1]
+
+
+def write_synthetic_cache(path, n, chunk_size=1_000_000, symbol='SYN/USD', timeframe='1s', **kwargs):
+    first = True
+    for cols in iter_ohlcv_chunks(n, chunk_size, **kwargs):
+        if first:
+            tick_cache.write_cache(path, cols, symbol, timeframe, capacity=n)
+            first = False
+        else:
+            tick_cache.append_rows(path, cols)
+    return path
@@ -0,0 +1,166 @@
+"""Binary tick-data cache.
+
+Layout: a 64-byte little-endian header followed by fixed-width columns, each
+`capacity` rows long and stored back to back (timestamp int64, then open, high,
+low, close, volume float64). Columns are memory-mapped directly, so loading is
+zero-copy. Spare capacity lets new bars be appended in place.
+
+    python -m simulator.tick_cache BTCUSDT_1min.csv --symbol BTC/USDT --timeframe 1m
+"""
+import argparse
+import math
+import os
+import struct
+from types import SimpleNamespace
+
+import numpy as np
+
+from simulator.market_data import MarketData
+
+MAGIC = b'MMTICKS1'
+VERSION = 1
+HEADER = struct.Struct('<8sHHQQ16s8s')
+HEADER_SIZE = 64
+CACHE_COLUMNS = (
+    ('timestamp', np.int64),
+    ('open', np.float64),
+    ('high', np.float64),
+    ('low', np.float64),
+    ('close', np.float64),
+    ('volume', np.float64),
+)
+SUFFIX = '.ticks'
+
+
+def cache_path_for(csv_path):
+    return os.path.splitext(str(csv_path))[0] + SUFFIX
+
+
+def source_path(path):
+    # the file RealDataSim(path) reads: the .ticks next to a CSV when it is fresh, else path itself
+    cache = path if str(path).endswith(SUFFIX) else cache_path_for(path)
+    return cache if is_fresh(cache, path) else path
+
+
+def is_fresh(cache_path, csv_path):
+    # Usable when the cache exists and is at least as new as the CSV it was built from.
+    if not os.path.exists(cache_path):
+        return False
+    return not os.path.exists(csv_path) or os.path.getmtime(cache_path) >= os.path.getmtime(csv_path)
+
+
+def read_header(path):
+    with open(path, 'rb') as f:
+        raw = f.read(HEADER_SIZE)
+    if len(raw) < HEADER_SIZE:
+        raise ValueError(f"{path}: truncated tick cache header")
+    magic, version, n_cols, n_rows, capacity, symbol, timeframe = HEADER.unpack_from(raw)
+    if magic != MAGIC or version != VERSION or n_cols != len(CACHE_COLUMNS):
+        raise ValueError(f"{path}: not a version {VERSION} tick cache file")
+    return SimpleNamespace(n_rows=n_rows, capacity=capacity,
+                           symbol=symbol.rstrip(b'\0').decode(),
+                           timeframe=timeframe.rstrip(b'\0').decode())
+
+
+def _write_header(f, n_rows, capacity, symbol, timeframe):
+    header = HEADER.pack(MAGIC, VERSION, len(CACHE_COLUMNS), n_rows, capacity,
+                         symbol.encode()[:16], timeframe.encode()[:8])
+    f.seek(0)
+    f.write(header.ljust(HEADER_SIZE, b'\0'))
+
+
+def _column_offset(j, capacity):
+    return HEADER_SIZE + j * capacity * 8
+
+
+def write_cache(path, columns, symbol='', timeframe='', capacity=None):
+    # columns: mapping with the CACHE_COLUMNS names -> equally long 1-d arrays
+    n = len(columns['timestamp'])
+    capacity = max(n, capacity or 0)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as f:
+        _write_header(f, n, capacity, symbol, timeframe)
+        for j, (name, dtype) in enumerate(CACHE_COLUMNS):
+            f.seek(_column_offset(j, capacity))
+            f.write(np.ascontiguousarray(columns[name], dtype=dtype).tobytes())
+        f.truncate(_column_offset(len(CACHE_COLUMNS), capacity))
+    os.replace(tmp, path)
+
+
+def open_columns(path, mode='r'):
+    header = read_header(path)
+    cols = {}
+    for j, (name, dtype) in enumerate(CACHE_COLUMNS):
+        if header.n_rows:
+            cols[name] = np.memmap(path, dtype=dtype, mode=mode, shape=(header.n_rows,),
+                                   offset=_column_offset(j, header.capacity))
+        else:
+            cols[name] = np.empty(0, dtype=dtype)
+    return header, cols
+
+
+def append_rows(path, columns, symbol='', timeframe=''):
+    # Appends rows in place when capacity allows, otherwise rewrites with doubled capacity.
+    n_new = len(columns['timestamp'])
+    if not os.path.exists(path):
+        write_cache(path, columns, symbol, timeframe)
+        return
+    header = read_header(path)
+    if n_new == 0:
+        return
+    n_total = header.n_rows + n_new
+    if n_total > header.capacity:
+        _, old = open_columns(path)
+        merged = {name: np.concatenate((old[name], np.asarray(columns[name], dtype=dtype)))
+                  for name, dtype in CACHE_COLUMNS}
+        del old
+        write_cache(path, merged, header.symbol, header.timeframe, capacity=2 * n_total)
+        return
+    with open(path, 'r+b') as f:
+        for j, (name, dtype) in enumerate(CACHE_COLUMNS):
+            f.seek(_column_offset(j, header.capacity) + header.n_rows * 8)
+            f.write(np.ascontiguousarray(columns[name], dtype=dtype).tobytes())
+        f.flush()
+        _write_header(f, n_total, header.capacity, header.symbol, header.timeframe)
+
+
+def convert_csv(csv_path, cache_path=None, symbol='', timeframe=''):
+    import pandas as pd
+    cache_path = cache_path or cache_path_for(csv_path)
+    df = pd.read_csv(csv_path, usecols=[name for name, _ in CACHE_COLUMNS])
+    df = df.sort_values(by='timestamp')
+    df = df[df['close'].notna()]
+    write_cache(cache_path, {name: df[name].to_numpy() for name, _ in CACHE_COLUMNS},
+                symbol, timeframe)
+    return cache_path
+
+
+def realized_sigma(close, bars_per_day=1440):
+    log_return = np.diff(np.log(close))
+    if len(log_return) < 2:
+        return float('nan')
+    return float(np.std(log_return, ddof=1)) * math.sqrt(bars_per_day)
+
+
+def load_market_data(path, spread=1.0):
+    # OHLCV columns are zero-copy memmaps; only bid/ask are derived arrays.
+    header, cols = open_columns(path)
+    md_queue = MarketData.from_ohlcv(cols['timestamp'], cols['close'], cols['volume'], spread,
+                                     open=cols['open'], high=cols['high'], low=cols['low'])
+    return md_queue, header
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert an OHLCV CSV into a binary tick cache.')
+    parser.add_argument('csv_path')
+    parser.add_argument('--out', default=None)
+    parser.add_argument('--symbol', default='')
+    parser.add_argument('--timeframe', default='')
+    args = parser.parse_args()
+    out = convert_csv(args.csv_path, args.out, args.symbol, args.timeframe)
+    header = read_header(out)
+    print(f"Wrote {header.n_rows} rows of {header.symbol or '?'} {header.timeframe or ''} to {out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+import itertools
+from types import SimpleNamespace
+
+import numpy as np
+
+from strategy.execution import FILLED, NOT_FILLED
+from strategy.quotes import HIGH_VOL, NORMAL, QuoteEngine, time_left_schedule
+from strategy.volatility import LogReturnVolatility, RollingVolatility
+
+
+def param_grid(**axes):
+    # Cartesian product of parameter axes -> dict of equally long 1-d arrays (one entry per lane).
+    names = list(axes)
+    combos = list(itertools.product(*(np.atleast_1d(axes[n]) for n in names)))
+    return {n: np.array([c[i] for c in combos]) for i, n in enumerate(names)}
+
+
+class UniformStreams:
+    # One independent numpy Generator per lane, consumed in order. Lane i yields exactly the
+    # same uniforms as ExecutionModel(seed=seeds[i]) does in the scalar loop.
+    def __init__(self, seeds, block=4096):
+        self.gens = [np.random.default_rng(s) for s in seeds]
+        self.block = block
+        self.buf = np.empty((len(self.gens), block))
+        self.cursor = np.full(len(self.gens), block)
+
+    def draw(self, lanes):
+        for i in lanes[self.cursor[lanes] == self.block]:
+            self.buf[i] = self.gens[i].random(self.block)
+            self.cursor[i] = 0
+        u = self.buf[lanes, self.cursor[lanes]]
+        self.cursor[lanes] += 1
+        return u
+
+
+class BatchStoikovEngine:
+    # Runs the StoikovStrategy.run loop for N parameter lanes at once over one RealDataSim price path.
+    # gamma, k, lambda_inventory and order_size may be scalars or length-N arrays; lane i with seeds[i]
+    # reproduces StoikovStrategy(RealDataSim(..., seed=seeds[i]), ...) exactly.
+    def __init__(self, sim, gamma, k, sigma, seeds, lambda_inventory=0.02, order_size=1,
+                 terminal_time=True, adjust_delay=1, min_order_size=1, precision=2,
+                 volatility_window=30, record_series=True):
+        gamma, k, lambda_inventory, order_size = np.broadcast_arrays(
+            np.asarray(gamma, dtype=float), np.asarray(k, dtype=float),
+            np.asarray(lambda_inventory, dtype=float), np.asarray(order_size, dtype=float))
+        self.n_lanes = max(len(np.atleast_1d(gamma)), len(seeds))
+        self.gamma = np.broadcast_to(gamma, self.n_lanes).copy()
+        self.k = np.broadcast_to(k, self.n_lanes).copy()
+        self.lambda_inventory = np.broadcast_to(lambda_inventory, self.n_lanes).copy()
+        self.order_size = np.broadcast_to(order_size, self.n_lanes).copy()
+        if len(seeds) != self.n_lanes:
+            raise ValueError(f"expected {self.n_lanes} seeds, got {len(seeds)}")
+
+        self.sim = sim
+        self.sigma = sigma
+        self.seeds = list(seeds)
+        self.terminal_time = terminal_time
+        self.adjust_delay = adjust_delay
+        self.min_order_size = min_order_size
+        self.precision = precision
+        self.record_series = record_series
+
+        # Same risk settings as StoikovStrategy
+        self.max_inventory = 5
+        self.max_drawdown = 3000
+        self.pause_duration = 30
+        self.volatility_window = volatility_window
+        self.volatility_threshold = 0.0015
+        self.max_hold_steps = 60
+
+    def run(self):
+        md = self.sim.md_queue
+        n, T = self.n_lanes, len(md)
+        model = self.sim.execution_model
+        prices = md.price
+        # best_bid/best_ask in the scalar loop are running extrema of all quotes seen so far
+        best_bid = np.maximum.accumulate(md.bid_price)
+        best_ask = np.minimum.accumulate(md.ask_price)
+        time_left = time_left_schedule(np.arange(T + 1), md.receive_ts[0], md.receive_ts[-1],
+                                       self.terminal_time)
+        sigma2 = self.sigma ** 2
+
+        # per-regime, per-lane quote constants; lanes pick a row by their volatility regime
+        quotes = QuoteEngine(self.gamma, self.k, self.sigma, self.lambda_inventory, self.min_order_size,
+                             self.precision)
+        gamma_table = quotes.regime_table('gammas')
+        gamma_sigma2_table = quotes.regime_table('gamma_sigma2')
+        log_term_table = quotes.regime_table('log_term')
+        regime = np.full(n, NORMAL)
+        gamma = gamma_table[NORMAL]
+        pos = np.zeros(n)
+        cash = np.zeros(n)
+        max_pnl = np.zeros(n)
+        worst_drawdown = np.zeros(n)
+        pause_until = np.full(n, -1)
+        breached = np.zeros(n, dtype=bool)
+        prev_sign = np.zeros(n)
+        hold_start = np.zeros(n)
+        n_trades = np.zeros(n, dtype=np.int64)
+        n_orders = np.zeros(n, dtype=np.int64)
+        n_high_vol = np.zeros(n, dtype=np.int64)
+        n_pauses = np.zeros(n, dtype=np.int64)
+        n_unwinds = np.zeros(n, dtype=np.int64)
+
+        volatility = LogReturnVolatility(RollingVolatility(self.volatility_window - 1))
+        pnl = np.zeros(n)
+
+        streams = UniformStreams(self.seeds)
+        times, realized, unrealized, pnl_series, inventory = [], [], [], [], []
+        all_lanes = np.arange(n)
+
+        def place(lanes, t, size, is_bid, price):
+            # Vectorized RealDataSim.place_order + StoikovStrategy.place_order for the given lanes
+            mid = prices[t - 1]
+            new_mid = prices[t] if t < T else mid
+            outcome = model.simulate_fills(self.sim.queue_position_ratio, np.abs(price - mid) / mid,
+                                           new_mid - mid, u=streams.draw(lanes))
+            filled = outcome == FILLED
+            traded = outcome != NOT_FILLED
+            exec_price = np.where(filled, price, new_mid)
+            sign = np.where(is_bid, 1.0, -1.0)
+            lanes_t = lanes[traded]
+            pos[lanes_t] += (sign * size)[traded]
+            cash[lanes_t] -= (sign * size * exec_price)[traded]
+            n_trades[lanes_t] += 1
+            n_orders[lanes[~traded]] += 1
+
+        last_readjust = 0
+        for t in range(1, T + 1):
+            if not t - last_readjust > self.adjust_delay:
+                continue
+            last_readjust = t
+
+            T_minus_t = time_left[t]
+            mid = (best_bid[t - 1] + best_ask[t - 1]) / 2
+            central = mid - (pos / self.min_order_size) * gamma * sigma2 * T_minus_t
+
+            # --- Volatility Adaptation ---
+            volatility.update(central)
+            if volatility.estimator.count >= self.volatility_window:
+                high_vol = volatility.std > self.volatility_threshold
+                n_high_vol += high_vol
+                regime = np.where(high_vol, HIGH_VOL, NORMAL)
+                gamma = gamma_table[regime, all_lanes]
+
+            # --- Max Drawdown Check ---
+            unreal = pos * central
+            pnl = cash + unreal
+            max_pnl = np.maximum(max_pnl, pnl)
+            drawdown = max_pnl - pnl
+            np.maximum(worst_drawdown, drawdown, out=worst_drawdown)
+            if self.record_series:
+                times.append(t)
+                realized.append(cash.copy())
+                unrealized.append(unreal)
+                pnl_series.append(pnl)
+                inventory.append(pos.copy())
+
+            pause = (drawdown > self.max_drawdown) & ~breached
+            pause_until[pause] = t + self.pause_duration
+            breached |= pause
+            n_pauses += pause
+            breached &= ~((t >= pause_until) & (drawdown < self.max_drawdown))
+
+            active = t >= pause_until
+            sign = np.sign(pos)
+            flip = active & (sign != prev_sign)
+            prev_sign[flip] = sign[flip]
+            hold_start[flip] = t
+
+            unwind = active & (np.abs(pos) >= self.max_inventory) & (t - hold_start > self.max_hold_steps)
+            if unwind.any():
+                lanes = all_lanes[unwind]
+                n_unwinds[lanes] += 1
+                place(lanes, t, np.abs(pos[lanes]), pos[lanes] < 0, central[lanes])
+            quoting = active & ~unwind
+            if not quoting.any():
+                continue
+
+            base_spread = gamma_sigma2_table[regime, all_lanes] * T_minus_t + log_term_table[regime, all_lanes]
+            spread = base_spread + self.lambda_inventory * (np.abs(pos) ** 2)
+            skew = -pos * gamma * sigma2 * T_minus_t
+            price_bid = np.round(central - spread / 2 + skew, self.precision)
+            price_ask = np.round(central + spread / 2 + skew, self.precision)
+
+            lanes = all_lanes[quoting & (pos < self.max_inventory)]
+            place(lanes, t, self.order_size[lanes], True, price_bid[lanes])
+            lanes = all_lanes[quoting & (pos > -self.max_inventory)]
+            place(lanes, t, self.order_size[lanes], False, price_ask[lanes])
+
+        return SimpleNamespace(
+            gamma=self.gamma, k=self.k, lambda_inventory=self.lambda_inventory,
+            order_size=self.order_size, seeds=np.array(self.seeds),
+            cur_pos=pos, cash=cash, final_pnl=pnl, worst_drawdown=worst_drawdown,
+            n_trades=n_trades, n_orders=n_orders,
+            n_high_vol=n_high_vol, n_pauses=n_pauses, n_unwinds=n_unwinds,
+            time=np.array(times),
+            realized_pnl=np.array(realized).T if times else np.empty((n, 0)),
+            unrealized_pnl=np.array(unrealized).T if times else np.empty((n, 0)),
+            pnl=np.array(pnl_series).T if times else np.empty((n, 0)),
+            inventory=np.array(inventory).T if times else np.empty((n, 0)),
+        )
@@ -0,0 +1,270 @@
+"""Walk-forward calibration of fill intensity and volatility.
+
+For every rolling window of bars, a limit order resting at relative distance
+d from bar i's close is counted as filled if bar i + 1 trades through it (low
+<= close * (1 - d) for a bid, high >= close * (1 + d) for an ask). The touch
+probability is fitted by maximum likelihood as
+
+    p(d) = A * exp(-beta * d)
+
+(Bernoulli likelihood over a grid of distances, damped Newton steps run for
+all windows at once). The fit maps onto the simulator and the strategy as
+
+    ExecutionModel.beta  = beta
+    ExecutionModel.alpha = -(log(A) + 2) / queue_position_ratio   (same p at d = 0)
+    StoikovStrategy.k    = beta / mid     (intensity decay per unit of price)
+    StoikovStrategy.sigma = realized sigma of the window (tick_cache.realized_sigma)
+
+Fits are cached per (symbol, window, hash of the window's data), so
+recalibrating after new bars are appended only fits the new windows.
+`run_walk_forward` backtests with each window's parameters switched in from
+the bar after the window ends (no look-ahead).
+
+    calib = calibrate(RealDataSim('BTCUSDT_1min.ticks').md_queue, window=1440, cache=FitCache())
+    run_walk_forward(strategy, calib)
+    python -m strategy.calibration BTCUSDT_1min.csv --window 240
+"""
+import argparse
+import hashlib
+import math
+import os
+import pickle
+import time
+from collections import OrderedDict
+from types import SimpleNamespace
+
+import numpy as np
+
+from strategy.quotes import QUOTE_PARAMS
+
+# relative distances from the close at which touches are counted (0 to 37.5 bp)
+LEVELS = np.arange(16) * 0.00025
+FIT_FIELDS = ('A', 'beta', 'sigma', 'mid', 'n_obs')
+
+
+class FitCache:
+    # LRU cache of per-window fits keyed by (symbol, window, data hash). save() / load() keep it
+    # across processes.
+    def __init__(self, maxsize=100_000):
+        self.maxsize = maxsize
+        self._fits = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._fits)
+
+    def get(self, key):
+        fit = self._fits.get(key)
+        if fit is None:
+            self.misses += 1
+            return None
+        self._fits.move_to_end(key)
+        self.hits += 1
+        return fit
+
+    def put(self, key, fit):
+        self._fits[key] = fit
+        self._fits.move_to_end(key)
+        while len(self._fits) > self.maxsize:
+            self._fits.popitem(last=False)
+
+    def save(self, path):
+        tmp = f"{path}.tmp"
+        with open(tmp, 'wb') as f:
+            pickle.dump(self._fits, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, maxsize=100_000):
+        cache = cls(maxsize)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                cache._fits = pickle.load(f)
+        return cache
+
+
+def touch_counts(close, high, low, levels=LEVELS):
+    # (n - 1, len(levels)) number of sides (0..2) whose order at distance d from close[i] is
+    # touched by bar i + 1
+    ref = close[:-1, None]
+    bid = low[1:, None] <= ref * (1 - levels)
+    ask = high[1:, None] >= ref * (1 + levels)
+    return bid.view(np.int8) + ask.view(np.int8)
+
+
+def _loglik(a, b, hits, trials, levels):
+    # Bernoulli log-likelihood of log p = a - b * d; -inf where some p >= 1
+    u = a[..., None] - b[..., None] * levels
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        ll = (hits * u + (trials - hits) * np.log1p(-np.exp(u))).sum(axis=-1)
+    return np.where((u < 0).all(axis=-1) & np.isfinite(ll), ll, -np.inf)
+
+
+def fit_intensity(hits, trials, levels=LEVELS, iterations=30, n_steps=8):
+    # MLE of (A, beta) per row: hits[w, j] touches out of trials[w] at distance levels[j].
+    # Starts from a least-squares fit of log frequencies, then damped Newton steps (the step
+    # length is picked per row from 1, 1/2, ..., 1/2**(n_steps-1) by likelihood).
+    hits = np.asarray(hits, dtype=np.float64)
+    trials = np.asarray(trials, dtype=np.float64)[:, None]
+    levels = np.asarray(levels, dtype=np.float64)
+    logf = np.log((hits + 0.5) / (trials + 1.0))
+    dc = levels - levels.mean()
+    b = np.maximum(-(logf * dc).sum(axis=1) / (dc * dc).sum(), 0.0)
+    a = np.minimum(logf.mean(axis=1) + b * levels.mean(), -1e-6)
+    a = np.minimum(a, (b[:, None] * levels).min(axis=1) - 1e-6)
+    ll = _loglik(a, b, hits, trials, levels)
+    factors = 0.5 ** np.arange(n_steps)
+    for _ in range(iterations):
+        u = a[:, None] - b[:, None] * levels
+        p = np.exp(u)
+        odds = p / (1 - p)
+        resid = hits - (trials - hits) * odds
+        w = (trials - hits) * odds / (1 - p)
+        g_a, g_b = resid.sum(axis=1), -(resid * levels).sum(axis=1)
+        h_aa, h_ab, h_bb = -w.sum(axis=1), (w * levels).sum(axis=1), -(w * levels * levels).sum(axis=1)
+        det = h_aa * h_bb - h_ab * h_ab
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step_a = -(h_bb * g_a - h_ab * g_b) / det
+            step_b = -(h_aa * g_b - h_ab * g_a) / det
+        a_c = a[:, None] + factors * step_a[:, None]
+        b_c = b[:, None] + factors * step_b[:, None]
+        ll_c = _loglik(a_c, b_c, hits[:, None, :], trials[:, :, None], levels)
+        best = ll_c.argmax(axis=1)
+        rows = np.arange(len(a))
+        better = ll_c[rows, best] > ll
+        if not better.any():
+            break
+        a = np.where(better, a_c[rows, best], a)
+        b = np.where(better, b_c[rows, best], b)
+        ll = np.where(better, ll_c[rows, best], ll)
+    return np.exp(a), b
+
+
+def window_starts(n_bars, window, step):
+    return np.arange(0, n_bars - window + 1, step)
+
+
+def _window_key(symbol, window, levels, close, high, low):
+    h = hashlib.blake2b(digest_size=16)
+    for col in (levels, close, high, low):
+        h.update(np.ascontiguousarray(col, dtype=np.float64).tobytes())
+    return symbol, window, h.hexdigest()
+
+
+def calibrate(md_queue, window=1440, step=None, symbol='', levels=LEVELS, cache=None,
+              queue_position_ratio=0.5, bars_per_day=1440):
+    # Fits for every window [start, start + window) of the bars (step defaults to window).
+    # Returns arrays: start, end (bar indices), A, beta, alpha, k, sigma, mid, n_obs.
+    close = np.asarray(md_queue.price, dtype=np.float64)
+    high = np.asarray(md_queue.high, dtype=np.float64)
+    low = np.asarray(md_queue.low, dtype=np.float64)
+    levels = np.asarray(levels, dtype=np.float64)
+    step = step or window
+    starts = window_starts(len(close), window, step)
+    fits = np.full((len(starts), len(FIT_FIELDS)), np.nan)
+
+    keys = [_window_key(symbol, window, levels, close[s:s + window], high[s:s + window], low[s:s + window])
+            for s in starts]
+    missing = []
+    for i, key in enumerate(keys):
+        fit = cache.get(key) if cache is not None else None
+        if fit is None:
+            missing.append(i)
+        else:
+            fits[i] = fit
+
+    if missing:
+        missing = np.array(missing)
+        # touch counts and log-return moments per window from cumulative sums over all bars
+        touches = np.concatenate((np.zeros((1, len(levels)), np.int64),
+                                  np.cumsum(touch_counts(close, high, low, levels), axis=0, dtype=np.int64)))
+        r = np.diff(np.log(close))
+        r1 = np.concatenate(([0.0], np.cumsum(r)))
+        r2 = np.concatenate(([0.0], np.cumsum(r * r)))
+        c1 = np.concatenate(([0.0], np.cumsum(close)))
+        s = starts[missing]
+        e = s + window - 1  # observations / returns i in [s, e) use bars i and i + 1 < s + window
+        n_obs = e - s
+        A, beta = fit_intensity(touches[e] - touches[s], 2 * n_obs, levels)
+        mean = (r1[e] - r1[s]) / n_obs
+        var = ((r2[e] - r2[s]) - n_obs * mean * mean) / np.maximum(n_obs - 1, 1)
+        sigma = np.sqrt(np.maximum(var, 0.0)) * math.sqrt(bars_per_day)
+        mid = (c1[s + window] - c1[s]) / window
+        fits[missing] = np.column_stack((A, beta, sigma, mid, n_obs))
+        if cache is not None:
+            for i in missing:
+                cache.put(keys[i], tuple(fits[i].tolist()))
+
+    A, beta, sigma, mid, n_obs = fits.T
+    return SimpleNamespace(
+        start=starts, end=starts + window,
+        A=A, beta=beta,
+        alpha=-(np.log(A) + 2.0) / queue_position_ratio,
+        k=beta / mid,
+        sigma=sigma, mid=mid, n_obs=n_obs.astype(np.int64),
+    )
+
+
+def run_walk_forward(strategy, calib, fields=('k', 'sigma', 'alpha', 'beta')):
+    # strategy.run() with time-varying parameters: the fit of the window ending at bar `end` is
+    # applied from bar `end` on (quote parameters such as k / sigma through set_quote_params, others
+    # such as alpha / beta on the simulator's execution model). Returns strategy.finish() and records each switch in
+    # strategy.logs as a 'recalibrated' event.
+    sim = strategy.sim
+    model = sim.execution_model
+    quote_fields = [f for f in fields if f in QUOTE_PARAMS]
+    model_fields = [f for f in fields if f not in QUOTE_PARAMS]
+    for f in fields:
+        if not hasattr(calib, f):
+            raise ValueError(f"calibration has no field {f!r}")
+        if f in model_fields and (f.startswith('_') or not hasattr(model, f)):
+            raise ValueError(f"{f!r} is neither a quote parameter nor an execution model attribute")
+    strategy.start(sim.md_queue[0].receive_ts, sim.md_queue[-1].receive_ts)
+    apply_at = calib.end
+    nxt = 0
+    while True:
+        cur_time, updates = sim.tick()
+        if updates is None:
+            break
+        # tick t delivers bar t - 1
+        while nxt < len(apply_at) and sim.t - 1 >= apply_at[nxt]:
+            if np.isfinite(calib.beta[nxt]):
+                if quote_fields:
+                    strategy.set_quote_params(**{f: float(getattr(calib, f)[nxt]) for f in quote_fields})
+                for f in model_fields:
+                    setattr(model, f, float(getattr(calib, f)[nxt]))
+                strategy.logs.append({'time': cur_time, 'event': 'recalibrated'})
+            nxt += 1
+        strategy.step(cur_time, updates)
+    return strategy.finish()
+
+
+def main():
+    from simulator.real_data_sim import RealDataSim
+
+    parser = argparse.ArgumentParser(description="Rolling-window fill-intensity / sigma calibration")
+    parser.add_argument('data', help="OHLCV CSV or .ticks file")
+    parser.add_argument('--window', type=int, default=1440, help="bars per window")
+    parser.add_argument('--step', type=int, default=None, help="bars between window starts")
+    parser.add_argument('--symbol', default='')
+    parser.add_argument('--cache', default=None, help="pickle file to keep fits between runs")
+    args = parser.parse_args()
+
+    md = RealDataSim(args.data).md_queue
+    cache = FitCache.load(args.cache) if args.cache else FitCache()
+    start = time.perf_counter()
+    calib = calibrate(md, args.window, args.step, symbol=args.symbol, cache=cache)
+    elapsed = time.perf_counter() - start
+    print(f"{'bars':>15} {'A':>7} {'beta':>9} {'alpha':>7} {'k':>9} {'sigma':>7}")
+    for i in range(len(calib.start)):
+        print(f"{calib.start[i]:>7}-{calib.end[i]:<7} {calib.A[i]:7.3f} {calib.beta[i]:9.1f} "
+              f"{calib.alpha[i]:7.3f} {calib.k[i]:9.5f} {calib.sigma[i]:7.4f}")
+    print(f"{len(calib.start)} windows over {len(md)} bars in {elapsed:.3f}s "
+          f"(cache: {cache.hits} hits, {cache.misses} misses)")
+    if args.cache:
+        cache.save(args.cache)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+from collections import OrderedDict
+
+from strategy.recorder import Recorder
+
+
+class BacktestEngine:
+    # Owns the tick loop, order routing and position / cash accounting of one strategy. Per tick,
+    # md updates go to strategy.on_market_data(ts, update), fills of resting orders are booked and
+    # passed to strategy.on_fill(trade), then strategy.on_tick(ts) quotes through place_order /
+    # cancel_all. Callbacks and simulator methods are bound once in start(): a tick does no
+    # attribute lookups on the strategy and allocates nothing of its own.
+    def __init__(self, strategy, recorder=None):
+        self.strategy = strategy
+        # fills (and resting orders, if the recorder keeps them) are recorded here; strategies
+        # record md themselves, if at all. The default recorder keeps fills only.
+        self.recorder = (recorder if recorder is not None
+                         else Recorder(record_md=False, record_orders=False))
+        self.position = 0
+        self.cash = 0
+        self.open_orders = OrderedDict()
+        self.n_orders = 0  # resting orders placed
+        # optional external limit check applied to every order, e.g. portfolio-level limits
+        # (simulator.portfolio): risk.allow(side, size, position) -> bool
+        self.risk = None
+
+    def run(self):
+        # start() + step() per tick of strategy.sim + finish()
+        sim = self.strategy.sim
+        self.start(sim.md_queue[0].receive_ts, sim.md_queue[-1].receive_ts)
+        tick, step = sim.tick, self.step
+        while True:
+            ts, updates = tick()
+            if updates is None:
+                break
+            step(ts, updates)
+        return self.finish()
+
+    # start / step / finish let other sources drive the loop (live feeds, checkpoints, portfolios).
+    # start() binds the current strategy.sim, so a simulator swapped in before it is used.
+    def start(self, t_min, t_max):
+        strategy = self.strategy
+        sim = strategy.sim
+        self._place, self._cancel = sim.place_order, sim.cancel_order
+        self._on_market_data = strategy.on_market_data
+        self._on_fill = strategy.on_fill
+        self._on_tick = strategy.on_tick
+        self._record_trade = self.recorder.record_trade
+        self._record_order = self.recorder.record_order
+        strategy.on_start(t_min, t_max)
+
+    def step(self, ts, updates):
+        for update in updates:
+            if update.type == 'md':
+                self._on_market_data(ts, update)
+            elif update.type == 'own_trade':
+                # fill of a resting order (event-driven simulators such as OrderBookSim)
+                self._book(update)
+            elif update.type == 'limit_order':
+                # an order placed as 'pending' now rests at the exchange (simulator.live)
+                self._rest(update)
+        self._on_tick(ts)
+
+    def finish(self):
+        self.recorder.close()
+        return self.strategy.on_finish()
+
+    def place_order(self, ts, size, side, price):
+        # Immediate fills are booked (and passed to on_fill) before this returns; other orders rest
+        # until cancel_all(). 'pending' orders (sent asynchronously) are only recorded once they are
+        # acknowledged as resting. Orders rejected by the risk check are not sent and return None.
+        risk = self.risk
+        if risk is not None and not risk.allow(side, size, self.position):
+            return None
+        order = self._place(ts, size, side, price)
+        kind = order.type
+        if kind == 'own_trade':
+            self._book(order)
+        else:
+            self.open_orders[order.order_id] = order
+            if kind != 'pending':
+                self._rest(order)
+        return order
+
+    def cancel_all(self, ts):
+        open_orders, cancel = self.open_orders, self._cancel
+        while open_orders:
+            order_id, _ = open_orders.popitem(last=False)
+            cancel(ts, order_id)
+
+    def _rest(self, order):
+        self.n_orders += 1
+        self._record_order(order)
+
+    def _book(self, trade):
+        self._record_trade(trade)
+        if trade.side == 'BID':
+            self.position += trade.size
+            self.cash -= trade.size * trade.price
+        else:
+            self.position -= trade.size
+            self.cash += trade.size * trade.price
+        self._on_fill(trade)
+
+
+class Strategy:
+    # Base of strategies driven by a BacktestEngine. Subclasses set self.sim and self.engine and
+    # override the callbacks they need; position and cash are the engine's.
+    def on_start(self, t_min, t_max):
+        pass
+
+    def on_market_data(self, ts, update):
+        pass
+
+    def on_fill(self, trade):
+        pass
+
+    def on_tick(self, ts):
+        pass
+
+    def on_finish(self):
+        return None
+
+    def run(self):
+        return self.engine.run()
+
+    def start(self, t_min, t_max):
+        self.engine.start(t_min, t_max)
+
+    def step(self, ts, updates):
+        self.engine.step(ts, updates)
+
+    def finish(self):
+        return self.engine.finish()
+
+    def place_order(self, ts, size, side, price):
+        return self.engine.place_order(ts, size, side, price)
+
+    @property
+    def risk(self):
+        return self.engine.risk
+
+    @risk.setter
+    def risk(self, value):
+        self.engine.risk = value
+
+    @property
+    def cur_pos(self):
+        return self.engine.position
+
+    @cur_pos.setter
+    def cur_pos(self, value):
+        self.engine.position = value
+
+    @property
+    def cash(self):
+        return self.engine.cash
+
+    @cash.setter
+    def cash(self, value):
+        self.engine.cash = value
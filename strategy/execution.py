@@ -1,32 +1,92 @@
-import random
+import math
 import numpy as np
 
+# Outcome codes returned by ExecutionModel.simulate_fills
+NOT_FILLED, FILLED, SLIPPAGE = 0, 1, 2
+OUTCOMES = ("not_filled", "filled", "slippage")
+
+
 class ExecutionModel:
-    def __init__(self, alpha=5.0, beta=15.0, slippage_chance=0.15):
-        self.alpha = alpha  
-        self.beta = beta    
-        self.slippage_chance = slippage_chance  
+    def __init__(self, alpha=5.0, beta=15.0, slippage_chance=0.15, rng=None, seed=None,
+                 block_size=4096):
+        self.alpha = alpha
+        self.beta = beta
+        self.slippage_chance = slippage_chance
+        # Each model owns its Generator, so runs are reproducible and safe to run in parallel.
+        self.rng = rng if rng is not None else np.random.default_rng(seed)
+        # Uniforms are drawn in blocks; the per-order path is a single array index. Draw order is
+        # the same as calling rng.random() once per order.
+        self.block_size = block_size
+        self._uniforms = []
+        self._next = 0
+
+    def reseed(self, seed=None):
+        # fresh stream, e.g. for runs forked from one checkpoint; drops the buffered block
+        self.rng = np.random.default_rng(seed)
+        self._uniforms = []
+        self._next = 0
+
+    def next_uniform(self):
+        if self._next == len(self._uniforms):
+            self._uniforms = self.rng.random(self.block_size).tolist()
+            self._next = 0
+        u = self._uniforms[self._next]
+        self._next += 1
+        return u
+
+    def uniforms(self, n):
+        # The next n uniforms of the same stream next_uniform() consumes.
+        out = np.empty(n)
+        filled = 0
+        while filled < n:
+            if self._next == len(self._uniforms):
+                self._uniforms = self.rng.random(self.block_size).tolist()
+                self._next = 0
+            take = min(n - filled, len(self._uniforms) - self._next)
+            out[filled:filled + take] = self._uniforms[self._next:self._next + take]
+            self._next += take
+            filled += take
+        return out
 
     def compute_fill_probability(self, queue_position_ratio, price_distance, order_size_ratio=1.0):
-       
+        # Works on scalars or arrays
         prob_queue = np.exp(-self.alpha * queue_position_ratio)
         prob_distance = np.exp(-self.beta * price_distance)
-        prob_size = np.exp(-2.0 * order_size_ratio)  
+        prob_size = np.exp(-2.0 * order_size_ratio)
         return prob_queue * prob_distance * prob_size
 
     def simulate_fill(self, queue_position_ratio, price_distance, price_movement, order_size_ratio=1.0):
-        
-        base_fill_prob = self.compute_fill_probability(queue_position_ratio, price_distance, order_size_ratio)
+        # Scalar fast path: math.exp instead of NumPy calls on scalars
+        base_fill_prob = math.exp(-self.alpha * queue_position_ratio) * \
+            math.exp(-self.beta * price_distance) * math.exp(-2.0 * order_size_ratio)
 
         if price_movement * (1 if queue_position_ratio < 0.5 else -1) > 0:
             base_fill_prob += 0.1
 
         base_fill_prob = max(0.0, min(1.0, base_fill_prob))
 
-        r = random.random()
+        r = self.next_uniform()
         if r < base_fill_prob:
             return "filled"
         elif r < base_fill_prob + self.slippage_chance:
             return "slippage"
         else:
             return "not_filled"
+
+    def simulate_fills(self, queue_position_ratio, price_distance, price_movement,
+                       order_size_ratio=1.0, u=None):
+        # Batch version of simulate_fill over arrays of orders; returns int8 outcome codes
+        # (NOT_FILLED / FILLED / SLIPPAGE). Uniforms come from this model's stream in order
+        # unless supplied via `u`.
+        queue_position_ratio, price_distance, price_movement, order_size_ratio = np.broadcast_arrays(
+            queue_position_ratio, price_distance, price_movement, order_size_ratio)
+        prob = self.compute_fill_probability(queue_position_ratio, price_distance, order_size_ratio)
+        favourable = price_movement * np.where(queue_position_ratio < 0.5, 1, -1) > 0
+        prob = np.clip(prob + 0.1 * favourable, 0.0, 1.0)
+
+        if u is None:
+            u = self.uniforms(prob.size).reshape(prob.shape)
+        outcome = np.full(prob.shape, NOT_FILLED, dtype=np.int8)
+        outcome[u < prob + self.slippage_chance] = SLIPPAGE
+        outcome[u < prob] = FILLED
+        return outcome
@@ -0,0 +1,445 @@
+"""Compiled fast path for StoikovStrategy on RealDataSim.
+
+`simulate` is the whole StoikovStrategy.run loop over the market data
+columns (running best bid/ask, rolling volatility and regime switch, drawdown
+pause/resume, forced unwind, quoting, RealDataSim fills) in one function of
+scalars and flat arrays. It is compiled with Numba when that is installed;
+otherwise the same source runs as plain Python over lists, which is still
+several times faster than the method-per-phase loop.
+
+`run_compiled(strategy)` is a drop-in for `strategy.run()`: it draws the
+execution model's uniforms up front, runs the kernel and writes fills,
+orders, the PnL series, logs and the final position/cash back into the
+strategy, recorder and simulator, so the results (and the simulator's RNG
+and order-id state afterwards) are the same as the reference loop's.
+
+    python -m strategy.kernel BTCUSDT_1min.csv --seed 7
+
+runs both, checks they agree and prints ticks per second for each.
+"""
+import argparse
+import contextlib
+import copy
+import io
+import itertools
+import math
+import time
+
+import numpy as np
+
+from simulator.real_data_sim import RealDataSim
+from strategy.recorder import RECORD_DTYPE
+from strategy.volatility import RollingVolatility
+
+try:
+    import numba
+except ImportError:  # optional dependency: without it the kernel runs as plain Python
+    numba = None
+
+HAVE_NUMBA = numba is not None
+
+# event codes written by the kernel, in StoikovStrategy.logs naming
+EVENTS = ('high_volatility', 'drawdown_pause', 'resume_trading', 'forced_unwind')
+HIGH_VOLATILITY, DRAWDOWN_PAUSE, RESUME_TRADING, FORCED_UNWIND = range(4)
+
+
+def _jit(fn):
+    return numba.njit(cache=True, nogil=True)(fn) if HAVE_NUMBA else fn
+
+
+@_jit
+def round_half_even(x, scale):
+    # round(x, ndigits) with scale = 10.0 ** ndigits, bit-for-bit like CPython's correctly rounded
+    # round(): the exact product x * scale (Dekker two-product) is rounded half-to-even, then
+    # divided back (one correctly rounded division = the nearest double to the decimal result)
+    p = x * scale
+    c = 134217729.0 * x
+    xh = c - (c - x)
+    xl = x - xh
+    c = 134217729.0 * scale
+    sh = c - (c - scale)
+    sl = scale - sh
+    e = ((xh * sh - p) + xh * sl + xl * sh) + xl * sl
+    r = math.floor(p)
+    d = p - r
+    if d > 0.5 or (d == 0.5 and (e > 0 or (e == 0 and r % 2 == 1))):
+        r += 1
+    return r / scale
+
+
+@_jit
+def simulate(prices, bids, asks, uniforms,
+             adjust_delay, terminal_time, t_min, t_span,
+             gammas, gamma_sigma2, log_term, sigma2, min_order_size, lambda_inventory, scale,
+             order_size, max_inventory, max_drawdown, pause_duration, max_hold_steps,
+             volatility_window, volatility_threshold, vol_buf,
+             alpha, beta, slippage_chance, queue_position_ratio, first_order_id,
+             rec_id, rec_ts, rec_side, rec_size, rec_price, rec_fill,
+             s_time, s_cash, s_unreal, s_pnl, s_pos,
+             ev_time, ev_code, ev_value):
+    # Inputs are per-tick columns and the quote / risk / execution settings; outputs go to the
+    # rec_* (every placed order, rec_fill = 1 for immediate fills), s_* (PnL series) and ev_*
+    # (log events) buffers. Returns (counts..., final state...).
+    T = len(prices)
+    window = len(vol_buf)
+    best_bid = -math.inf
+    best_ask = math.inf
+    last_readjust = 0
+    T_minus_t = 1.0
+    pos = 0.0
+    cash = 0.0
+    pnl = 0.0
+    max_pnl = 0.0
+    pause_until = -1
+    breached = False
+    prev_sign = 0
+    hold_start = 0
+    regime = 0
+    # rolling volatility of log returns of the central price (RollingVolatility, ddof=0)
+    last_central = math.nan
+    v_count = 0
+    v_i = 0
+    v_mean = 0.0
+    v_m2 = 0.0
+    n_rec = 0
+    n_series = 0
+    n_events = 0
+    n_u = 0
+    price_bid = price_ask = 0.0
+    q_sign = 1.0 if queue_position_ratio < 0.5 else -1.0
+    base_prob = math.exp(-alpha * queue_position_ratio)
+
+    for t in range(1, T + 1):
+        bid = bids[t - 1]
+        ask = asks[t - 1]
+        if bid > best_bid:
+            best_bid = bid
+        if ask < best_ask:
+            best_ask = ask
+        if not t - last_readjust > adjust_delay:
+            continue
+        last_readjust = t
+        if terminal_time:
+            T_minus_t = 1 - (t - t_min) / t_span
+
+        if best_bid == -math.inf or best_ask == math.inf:
+            continue
+        mid = (best_bid + best_ask) / 2
+        central = mid - (pos / min_order_size) * gammas[regime] * sigma2 * T_minus_t
+
+        # volatility regime
+        if last_central == last_central:
+            x = math.log(central / last_central)
+            if v_count < window:
+                delta = x - v_mean
+                v_mean = v_mean + delta / (v_count + 1)
+                v_m2 = v_m2 + delta * (x - v_mean)
+            else:
+                old = vol_buf[v_i]
+                delta = x - old
+                new_mean = v_mean + delta / window
+                v_m2 = v_m2 + delta * (x - new_mean + old - v_mean)
+                v_mean = new_mean
+            vol_buf[v_i] = x
+            v_count += 1
+            v_i += 1
+            if v_i == window:
+                v_i = 0
+                total = 0.0
+                for j in range(window):
+                    total += vol_buf[j]
+                v_mean = total / window
+                total = 0.0
+                for j in range(window):
+                    total += (vol_buf[j] - v_mean) * (vol_buf[j] - v_mean)
+                v_m2 = total
+        last_central = central
+        if v_count >= volatility_window:
+            var = v_m2 / (v_count if v_count < window else window)
+            volatility = var ** 0.5 if var > 0 else 0.0
+            if volatility > volatility_threshold:
+                ev_time[n_events] = t
+                ev_code[n_events] = HIGH_VOLATILITY
+                ev_value[n_events] = volatility
+                n_events += 1
+                regime = 1
+            else:
+                regime = 0
+
+        # drawdown check
+        unrealized = pos * central
+        pnl = cash + unrealized
+        if pnl > max_pnl:
+            max_pnl = pnl
+        drawdown = max_pnl - pnl
+        s_time[n_series] = t
+        s_cash[n_series] = cash
+        s_unreal[n_series] = unrealized
+        s_pnl[n_series] = pnl
+        s_pos[n_series] = pos
+        n_series += 1
+        if drawdown > max_drawdown and not breached:
+            pause_until = t + pause_duration
+            breached = True
+            ev_time[n_events] = t
+            ev_code[n_events] = DRAWDOWN_PAUSE
+            ev_value[n_events] = drawdown
+            n_events += 1
+        if t >= pause_until and drawdown < max_drawdown and breached:
+            breached = False
+            ev_time[n_events] = t
+            ev_code[n_events] = RESUME_TRADING
+            ev_value[n_events] = drawdown
+            n_events += 1
+        if t < pause_until:
+            continue
+
+        sign = 1 if pos > 0 else (-1 if pos < 0 else 0)
+        if sign != prev_sign:
+            prev_sign = sign
+            hold_start = t
+
+        # forced unwind at the central price, otherwise a bid and an ask
+        unwind = abs(pos) >= max_inventory and t - hold_start > max_hold_steps
+        if unwind:
+            ev_time[n_events] = t
+            ev_code[n_events] = FORCED_UNWIND
+            ev_value[n_events] = pos
+            n_events += 1
+            n_orders = 1
+        else:
+            penalty = lambda_inventory * (abs(pos) ** 2)
+            spread = gamma_sigma2[regime] * T_minus_t + log_term[regime] + penalty
+            skew = -pos * gammas[regime] * sigma2 * T_minus_t
+            price_bid = round_half_even(central - spread / 2 + skew, scale)
+            price_ask = round_half_even(central + spread / 2 + skew, scale)
+            n_orders = 2
+
+        mid = prices[t - 1]
+        new_mid = prices[t] if t < T else mid
+        movement = new_mid - mid
+        for j in range(n_orders):
+            if unwind:
+                size = abs(pos)
+                side = 1 if pos > 0 else 0
+                price = central
+            elif j == 0:
+                if not pos < max_inventory:
+                    continue
+                size = order_size
+                side = 0
+                price = price_bid
+            else:
+                if not pos > -max_inventory:
+                    continue
+                size = order_size
+                side = 1
+                price = price_ask
+
+            # RealDataSim.place_order / ExecutionModel.simulate_fill
+            distance = abs(price - mid) / mid
+            prob = base_prob * math.exp(-beta * distance) * math.exp(-2.0)
+            if movement * q_sign > 0:
+                prob += 0.1
+            prob = 0.0 if not prob > 0.0 else (prob if prob < 1.0 else 1.0)
+            r = uniforms[n_u]
+            n_u += 1
+            fill = 0
+            if r < prob:
+                fill = 1
+            elif r < prob + slippage_chance:
+                fill = 1
+                price = new_mid
+            rec_id[n_rec] = first_order_id + n_rec
+            rec_ts[n_rec] = t
+            rec_side[n_rec] = side
+            rec_size[n_rec] = size
+            rec_price[n_rec] = price
+            rec_fill[n_rec] = fill
+            n_rec += 1
+            if fill:
+                if side == 0:
+                    pos += size
+                    cash -= size * price
+                else:
+                    pos -= size
+                    cash += size * price
+
+    return (n_rec, n_series, n_events, n_u, pos, cash, pnl, max_pnl, regime, pause_until,
+            breached, prev_sign, hold_start, last_readjust, best_bid, best_ask, T_minus_t)
+
+
+def _check_supported(strategy):
+    from strategy.stoikov import StoikovStrategy
+    sim = strategy.sim
+    if type(strategy) is not StoikovStrategy or type(sim) is not RealDataSim:
+        raise TypeError("the compiled backend runs StoikovStrategy on RealDataSim only "
+                        f"(got {type(strategy).__name__} on {type(sim).__name__})")
+    if not isinstance(getattr(sim.md_queue, 'price', None), np.ndarray):
+        raise TypeError("the compiled backend needs in-memory market data columns")
+    if sim.t != 0 or hasattr(strategy, '_t_span'):
+        raise ValueError("the compiled backend runs a fresh strategy / simulator from the start")
+    if strategy.risk is not None:
+        raise ValueError("external risk hooks are not supported by the compiled backend")
+    estimator = strategy.recent_prices.estimator
+    if type(estimator) is not RollingVolatility or estimator.ddof != 0:
+        raise ValueError("the compiled backend implements the default rolling volatility only")
+
+
+def _buffers(n, dtype, compiled):
+    return np.empty(n, dtype) if compiled else [0] * n
+
+
+def run_compiled(strategy, compiled=None):
+    # Same result as strategy.run(). compiled=None uses Numba when installed; compiled=False
+    # forces the pure-Python kernel.
+    _check_supported(strategy)
+    compiled = HAVE_NUMBA if compiled is None else compiled
+    if compiled and not HAVE_NUMBA:
+        raise ImportError("numba is not installed")
+    kernel = simulate if compiled or not HAVE_NUMBA else simulate.py_func
+    sim = strategy.sim
+    md = sim.md_queue
+    T = len(md)
+    model = sim.execution_model
+    quotes = strategy.quotes
+    t_min, t_max = int(md.receive_ts[0]), int(md.receive_ts[-1])
+    strategy.start(t_min, t_max)
+
+    # the uniforms the run can need (at most two orders per tick), drawn from a copy so that
+    # the model itself only advances by the number actually used
+    uniforms = copy.deepcopy(model).uniforms(2 * T)
+    first_order_id = next(sim._order_ids)
+    columns = (md.price, md.bid_price, md.ask_price, uniforms)
+    if compiled:
+        columns = tuple(np.ascontiguousarray(c, dtype=float) for c in columns)
+    else:
+        columns = tuple(np.asarray(c, dtype=float).tolist() for c in columns)
+    rec = [_buffers(2 * T, dt, compiled) for dt in (np.int64, np.int64, np.int8, float, float, np.int8)]
+    series = [_buffers(T, float, compiled) for _ in range(5)]
+    events = [_buffers(3 * T + 1, dt, compiled) for dt in (np.int64, np.int8, float)]
+    tables = (quotes.gammas, quotes.gamma_sigma2, quotes.log_term)
+    if compiled:
+        tables = tuple(np.array(v, dtype=float) for v in tables)
+    vol_buf = _buffers(strategy.recent_prices.estimator.window, float, compiled)
+
+    (n_rec, n_series, n_events, n_u, pos, cash, pnl, max_pnl, regime, pause_until, breached,
+     prev_sign, hold_start, last_readjust, best_bid, best_ask, T_minus_t) = kernel(
+        *columns,
+        strategy.adjust_delay, bool(strategy.terminal_time), t_min, t_max - t_min,
+        *tables, quotes._sigma2, float(quotes.min_order_size), float(quotes.lambda_inventory),
+        10.0 ** quotes.precision,
+        float(strategy.order_size), float(strategy.max_inventory), float(strategy.max_drawdown),
+        int(strategy.pause_duration), strategy.max_hold_steps,
+        strategy.volatility_window, strategy.volatility_threshold, vol_buf,
+        model.alpha, model.beta, model.slippage_chance, sim.queue_position_ratio, first_order_id,
+        *rec, *series, *events)
+
+    # simulator state as after the reference loop
+    sim.t = T
+    sim._order_ids = itertools.count(first_order_id + n_rec)
+    model.uniforms(n_u)
+
+    recorder = strategy.recorder
+    recorder.record_md_block(md.receive_ts, md.price, md.bid_price, md.ask_price)
+    recorder.record_pnl_block(*(np.asarray(c[:n_series], dtype=float) for c in series))
+    records = np.empty(n_rec, RECORD_DTYPE)
+    for name, col in zip(RECORD_DTYPE.names, rec):
+        records[name] = col[:n_rec]
+    fill = np.asarray(rec[5][:n_rec], dtype=bool)
+    recorder.record_block(records[fill], records[~fill])
+
+    for t, code, value in zip(*(np.asarray(c[:n_events]).tolist() for c in events)):
+        strategy.logs.append({'time': t, 'event': EVENTS[code]})
+        strategy._emit(_message(strategy, t, code, value))
+
+    integral = isinstance(strategy.order_size, int)
+    strategy.cur_pos = int(pos) if integral else pos
+    strategy.cash = cash
+    strategy.pnl = pnl
+    strategy.max_pnl = max_pnl
+    strategy.regime = regime
+    strategy.gamma = quotes.gammas[regime]
+    strategy.k = quotes.ks[regime]
+    strategy.pause_until = pause_until
+    strategy.drawdown_breached = bool(breached)
+    strategy.prev_sign = prev_sign
+    strategy.hold_start_time = hold_start
+    strategy._last_readjust = last_readjust
+    strategy.cur_time = T
+    strategy.T_minus_t = T_minus_t
+    strategy.best_bid, strategy.best_ask = best_bid, best_ask
+    return strategy.finish()
+
+
+def _message(strategy, t, code, value):
+    if code == HIGH_VOLATILITY:
+        return f"⚠️ High volatility: {value:.5f}. Increasing risk aversion at t={t}"
+    if code == DRAWDOWN_PAUSE:
+        return f"‼️ Drawdown = {value:.2f}, pausing trading for {strategy.pause_duration} steps."
+    if code == RESUME_TRADING:
+        return f"✅ Drawdown recovered. Resuming trading at time {t}."
+    return f"⚠️ Forced unwind at t={t} to prevent stuck position."
+
+
+def compare_runs(reference, fast):
+    # names of the results that differ between two finished strategies
+    def records(log):
+        return [(r.order_id, r.ts, r.side, r.size, r.price) for r in log]
+
+    diffs = []
+    for name in ('cur_pos', 'cash', 'pnl', 'max_pnl', 'logs', 'regime', 'pause_until'):
+        if getattr(reference, name) != getattr(fast, name):
+            diffs.append(name)
+    for name in ('trades_list', 'all_orders'):
+        if records(getattr(reference, name)) != records(getattr(fast, name)):
+            diffs.append(name)
+    for name in ('time_list', 'realized_pnl_list', 'unrealized_pnl_list', 'pnl_list'):
+        if not np.array_equal(getattr(reference, name), getattr(fast, name)):
+            diffs.append(name)
+    if reference.sim.execution_model.next_uniform() != fast.sim.execution_model.next_uniform():
+        diffs.append('rng')
+    return diffs
+
+
+def main():
+    from strategy.stoikov import StoikovStrategy
+
+    parser = argparse.ArgumentParser(description="Check the compiled Stoikov kernel against the "
+                                                 "reference loop and compare their speed")
+    parser.add_argument('data', help="OHLCV CSV or .ticks file")
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--gamma', type=float, default=0.05)
+    parser.add_argument('--k', type=float, default=1.5)
+    parser.add_argument('--python', action='store_true', help="force the pure-Python kernel")
+    args = parser.parse_args()
+
+    def make():
+        sim = RealDataSim(args.data, seed=args.seed)
+        return StoikovStrategy(sim=sim, gamma=args.gamma, k=args.k, sigma=sim.realized_sigma,
+                               terminal_time=True, adjust_delay=1, order_size=1, min_order_size=1,
+                               precision=2, verbose=False)
+
+    compiled = False if args.python else None
+    if compiled is not False and HAVE_NUMBA:
+        run_compiled(make())  # JIT warm-up (cached on disk afterwards)
+    reference, fast = make(), make()
+    n = len(reference.sim.md_queue)
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        reference.run()
+        t_ref = time.perf_counter() - start
+        start = time.perf_counter()
+        run_compiled(fast, compiled)
+        t_fast = time.perf_counter() - start
+
+    kind = 'numba' if HAVE_NUMBA and compiled is not False else 'python'
+    print(f"reference: {n / t_ref:,.0f} ticks/s")
+    print(f"kernel ({kind}): {n / t_fast:,.0f} ticks/s ({t_ref / t_fast:.1f}x)")
+    diffs = compare_runs(reference, fast)
+    print("results identical" if not diffs else f"MISMATCH: {', '.join(diffs)}")
+    return 1 if diffs else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -1,70 +1,55 @@
-import math
+from strategy.engine import BacktestEngine, Strategy
 
-class NaiveMMStrategy:
-    def __init__(self, sim, base_spread=10, volatility_multiplier=1.5, order_size=1, max_inventory=10, precision=2):
+class NaiveMMStrategy(Strategy):
+    def __init__(self, sim, base_spread=10, volatility_multiplier=1.5, order_size=1, max_inventory=10, precision=2,
+                 recorder=None):
         self.sim = sim
         self.base_spread = base_spread
         self.volatility_multiplier = volatility_multiplier
         self.order_size = order_size
         self.max_inventory = max_inventory
         self.precision = precision
+        # order routing, fills and inventory / cash (cur_pos / cash) are the engine's; resting
+        # orders are only kept if a recorder that records them is passed (strategy.recorder)
+        self.engine = BacktestEngine(self, recorder)
+        self.mid_prices = []
+        self.last_mid_price = None
 
-    def run(self):
-        trades = []
-        inventory = 0
-        cash = 0
-        mid_prices = []
-        last_mid_price = None
+    def on_market_data(self, ts, update):
+        self.mid_prices.append(update.price)
 
-        while True:
-            ts, updates = self.sim.tick()
-            if updates is None:
-                break
+    def on_tick(self, ts):
+        # fills of resting orders from event-driven simulators have been booked by now
+        engine = self.engine
+        engine.cancel_all(ts)
 
-            update = updates[0]
-            mid_price = update.price
-            mid_prices.append(mid_price)
+        mid_price = self.mid_prices[-1]
 
-            if last_mid_price is not None:
-                volatility = abs(mid_price - last_mid_price)
-            else:
-                volatility = 0
+        if self.last_mid_price is not None:
+            volatility = abs(mid_price - self.last_mid_price)
+        else:
+            volatility = 0
 
-            last_mid_price = mid_price
+        self.last_mid_price = mid_price
 
-          
-            dynamic_spread = self.base_spread + self.volatility_multiplier * volatility
+        bid_price, ask_price = self._compute_quotes(mid_price, volatility)
 
-            half_spread = dynamic_spread / 2
-            bid_price = round(mid_price - half_spread, self.precision)
-            ask_price = round(mid_price + half_spread, self.precision)
+        inventory = engine.position
+        bid_qty = self.order_size if inventory < self.max_inventory else 0
+        ask_qty = self.order_size if inventory > -self.max_inventory else 0
 
-            
-            bid_qty = self.order_size if inventory < self.max_inventory else 0
-            ask_qty = self.order_size if inventory > -self.max_inventory else 0
+        if bid_qty > 0:
+            engine.place_order(ts, bid_qty, 'BID', bid_price)
+        if ask_qty > 0:
+            engine.place_order(ts, ask_qty, 'ASK', ask_price)
 
-            ts_trades = []
+    def on_finish(self):
+        return self.engine.recorder.trades, self.mid_prices
 
-            if bid_qty > 0:
-                result = self.sim.place_order(ts, bid_qty, 'BID', bid_price)
-                if getattr(result, 'type', None) == 'own_trade':
-                    ts_trades.append(result)
-
-            if ask_qty > 0:
-                result = self.sim.place_order(ts, ask_qty, 'ASK', ask_price)
-                if getattr(result, 'type', None) == 'own_trade':
-                    ts_trades.append(result)
-
-           
-            for tr in ts_trades:
-                if tr.side == 'BID':
-                    inventory += tr.size
-                    cash -= tr.price * tr.size
-                else:
-                    inventory -= tr.size
-                    cash += tr.price * tr.size
-
-            trades.extend(ts_trades)
-
-        return trades, mid_prices
+    def _compute_quotes(self, mid_price, volatility):
+        dynamic_spread = self.base_spread + self.volatility_multiplier * volatility
 
+        half_spread = dynamic_spread / 2
+        bid_price = round(mid_price - half_spread, self.precision)
+        ask_price = round(mid_price + half_spread, self.precision)
+        return bid_price, ask_price
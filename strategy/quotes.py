@@ -0,0 +1,87 @@
+import math
+
+import numpy as np
+
+# Volatility regimes of StoikovStrategy: gamma and k are scaled by these factors
+NORMAL, HIGH_VOL = 0, 1
+REGIME_MULTIPLIERS = (1.0, 1.5)
+# parameters QuoteEngine.set_params() (and StoikovStrategy.set_quote_params) accept
+QUOTE_PARAMS = ('gamma', 'k', 'sigma', 'lambda_inventory', 'min_order_size', 'precision')
+
+
+def time_left_schedule(times, t_min, t_max, terminal_time=True):
+    # T_minus_t for every step in `times` at once (same arithmetic as the per-step formula)
+    times = np.asarray(times)
+    if not terminal_time:
+        return np.ones(len(times))
+    return 1 - (times - t_min) / (t_max - t_min)
+
+
+class QuoteEngine:
+    # Avellaneda-Stoikov quote terms, precomputed per volatility regime:
+    #   gamma_sigma2 = gamma * sigma**2                  (times T_minus_t in spread and skew)
+    #   log_term     = 2 / gamma * log(1 + gamma / k)
+    # and, lazily per (regime, position), the reservation offset, skew coefficient and inventory
+    # penalty, so a quote is a couple of lookups, multiplies and adds. Terms are grouped exactly as
+    # in the original expressions, so quotes are bit-for-bit unchanged.
+    #
+    # gamma / k / lambda_inventory may be scalars (StoikovStrategy) or per-lane arrays
+    # (BatchStoikovEngine); the per-position cache is only used on the scalar path.
+    # Call set_params() after changing any parameter: it rebuilds the tables.
+    def __init__(self, gamma, k, sigma, lambda_inventory=0.02, min_order_size=1, precision=2):
+        self.gamma = gamma
+        self.k = k
+        self.sigma = sigma
+        self.lambda_inventory = lambda_inventory
+        self.min_order_size = min_order_size
+        self.precision = precision
+        self._build()
+
+    def set_params(self, **params):
+        for name, value in params.items():
+            if name not in QUOTE_PARAMS:
+                raise AttributeError(f"unknown quote parameter: {name}")
+            setattr(self, name, value)
+        self._build()
+
+    def _build(self):
+        sigma2 = self.sigma ** 2
+        log = math.log if np.ndim(self.gamma) == 0 and np.ndim(self.k) == 0 else np.log
+        self.gammas, self.ks, self.gamma_sigma2, self.log_term = [], [], [], []
+        for m in REGIME_MULTIPLIERS:
+            gamma = self.gamma * m if m != 1.0 else self.gamma
+            k = self.k * m if m != 1.0 else self.k
+            self.gammas.append(gamma)
+            self.ks.append(k)
+            self.gamma_sigma2.append(gamma * sigma2)
+            self.log_term.append(2 / gamma * log(1 + gamma / k))
+        self._sigma2 = sigma2
+        self._position_terms = [{} for _ in REGIME_MULTIPLIERS]
+
+    def position_terms(self, regime, pos):
+        # (reservation offset, skew coefficient, inventory penalty); both coefficients are then
+        # multiplied by T_minus_t
+        cache = self._position_terms[regime]
+        terms = cache.get(pos)
+        if terms is None:
+            gamma = self.gammas[regime]
+            terms = cache[pos] = (
+                (pos / self.min_order_size) * gamma * self._sigma2,
+                -pos * gamma * self._sigma2,
+                self.lambda_inventory * (abs(pos) ** 2),
+            )
+        return terms
+
+    def central_price(self, regime, mid, pos, T_minus_t):
+        return mid - self.position_terms(regime, pos)[0] * T_minus_t
+
+    def quote(self, regime, central_price, pos, T_minus_t):
+        _, skew_coef, penalty = self.position_terms(regime, pos)
+        spread = self.gamma_sigma2[regime] * T_minus_t + self.log_term[regime] + penalty
+        skew = skew_coef * T_minus_t
+        return (round(central_price - spread / 2 + skew, self.precision),
+                round(central_price + spread / 2 + skew, self.precision))
+
+    def regime_table(self, name):
+        # (n_regimes, n_lanes) array of a per-regime term for the vectorized path
+        return np.stack([np.broadcast_to(v, np.shape(self.gamma)) for v in getattr(self, name)])
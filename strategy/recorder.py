@@ -0,0 +1,249 @@
+import array
+import math
+import os
+import struct
+from types import SimpleNamespace
+
+import numpy as np
+
+from simulator.market_data import MarketData
+
+SERIES_FIELDS = ('time', 'realized', 'unrealized', 'pnl', 'inventory')
+MD_FIELDS = ('receive_ts', 'price', 'bid_price', 'ask_price')
+
+# Spilled order / fill record: order_id, ts, side (0 = BID, 1 = ASK), size, price
+RECORD = struct.Struct('<qqbdd')
+RECORD_DTYPE = np.dtype([('order_id', '<i8'), ('ts', '<i8'), ('side', 'i1'),
+                         ('size', '<f8'), ('price', '<f8')])
+SIDES = ('BID', 'ASK')
+
+
+class Columns:
+    # Growable typed columns (array.array: amortized O(1) append, 8 bytes per value).
+    def __init__(self, fields, typecodes=None):
+        self.fields = fields
+        typecodes = typecodes or 'd' * len(fields)
+        self._cols = {name: array.array(tc) for name, tc in zip(fields, typecodes)}
+
+    def __len__(self):
+        return len(self._cols[self.fields[0]])
+
+    def __getitem__(self, name):
+        col = self._cols[name]
+        return np.frombuffer(col, dtype=col.typecode).copy() if len(col) else np.empty(0, col.typecode)
+
+    def appenders(self):
+        return tuple(self._cols[name].append for name in self.fields)
+
+    def extend(self, *columns):
+        # append whole columns (one array per field, in field order)
+        for name, values in zip(self.fields, columns):
+            col = self._cols[name]
+            col.frombytes(np.ascontiguousarray(values, dtype=col.typecode).tobytes())
+
+    def halve(self):
+        # keep every other row (rows 0, 2, 4, ...)
+        for col in self._cols.values():
+            col[:] = col[::2]
+
+    @property
+    def nbytes(self):
+        return sum(col.itemsize * len(col) for col in self._cols.values())
+
+
+class SpillFile:
+    # Append-only binary log of orders or fills. Iterating reads the records back as the same
+    # SimpleNamespace records the simulator produced, so it can stand in for a list.
+    def __init__(self, path, record_type):
+        self.path = path
+        self.type = record_type
+        self._f = open(path, 'wb')
+        self._n = 0
+
+    def append(self, rec):
+        (self._f or self._reopen()).write(RECORD.pack(rec.order_id, rec.ts, SIDES.index(rec.side), rec.size, rec.price))
+        self._n += 1
+
+    def extend_array(self, records):
+        # append a RECORD_DTYPE array in one write
+        (self._f or self._reopen()).write(np.ascontiguousarray(records, dtype=RECORD_DTYPE).tobytes())
+        self._n += len(records)
+
+    def __len__(self):
+        return self._n
+
+    def flush(self):
+        if self._f is not None and not self._f.closed:
+            self._f.flush()
+
+    def close(self):
+        # a later append reopens the file (see _reopen)
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+    # Checkpoints store the path and record count. The file is reopened on the next append and
+    # truncated back to that count, so appends continue from the checkpointed state.
+    def __getstate__(self):
+        self.flush()
+        return {'path': self.path, 'type': self.type, 'n': self._n}
+
+    def __setstate__(self, state):
+        self.path = state['path']
+        self.type = state['type']
+        self._n = state['n']
+        self._f = None
+
+    def _reopen(self):
+        self._f = open(self.path, 'r+b')
+        self._f.truncate(self._n * RECORD.size)
+        self._f.seek(0, os.SEEK_END)
+        return self._f
+
+    def copy_to(self, path):
+        # same records in a new file, e.g. for a run forked from a checkpoint
+        self.flush()
+        with open(self.path, 'rb') as src, open(path, 'wb') as dst:
+            dst.write(src.read(self._n * RECORD.size))
+        clone = SpillFile.__new__(SpillFile)
+        clone.__setstate__(self.__getstate__())
+        clone.path = path
+        return clone
+
+    def to_array(self):
+        self.flush()
+        return np.fromfile(self.path, dtype=RECORD_DTYPE, count=self._n)
+
+    def __iter__(self):
+        return iter_records(self.to_array(), self.type)
+
+
+def iter_records(records, record_type):
+    # RECORD_DTYPE array -> the SimpleNamespace records the simulator produces
+    for order_id, ts, side, size, price in records.tolist():
+        yield SimpleNamespace(order_id=order_id, ts=ts, side=SIDES[side], size=size,
+                              price=price, type=record_type)
+
+
+class Recorder:
+    # Run history for a strategy.
+    #   decimation   - keep one PnL sample every `decimation` calls to record_pnl
+    #   max_points   - when the PnL series reaches this length, drop every other sample and double
+    #                  the decimation, so the series stays bounded but still spans the whole run
+    #   record_md    - also keep receive_ts / price / bid / ask per tick (market_data()). Off by
+    #                  default: the simulator's md_queue already holds them, and this is the only
+    #                  record that grows with every tick regardless of max_points
+    #   record_orders - keep every resting order placed (orders is None otherwise)
+    #   spill_dir    - write fills and orders to append-only files there instead of keeping them
+    def __init__(self, decimation=1, max_points=None, record_md=False, spill_dir=None,
+                 record_orders=True):
+        self.decimation = decimation
+        self.max_points = max_points
+        self.series = Columns(SERIES_FIELDS)
+        self._append_series = self.series.appenders()
+        self.md = Columns(MD_FIELDS, 'qddd') if record_md else None
+        self._append_md = self.md.appenders() if record_md else None
+        self._calls = 0
+        if spill_dir is not None:
+            os.makedirs(spill_dir, exist_ok=True)
+            self.trades = SpillFile(os.path.join(spill_dir, 'fills.bin'), 'own_trade')
+            self.orders = SpillFile(os.path.join(spill_dir, 'orders.bin'), 'limit_order')
+        else:
+            self.trades = []
+            self.orders = []
+        if not record_orders:
+            self.orders = None
+
+    def record_md(self, update):
+        if self._append_md is None:
+            return
+        ts, price, bid, ask = self._append_md
+        ts(update.receive_ts)
+        price(update.price)
+        bid(math.nan if update.bid_price is None else update.bid_price)
+        ask(math.nan if update.ask_price is None else update.ask_price)
+
+    def record_pnl(self, time, realized, unrealized, pnl, inventory):
+        calls = self._calls
+        self._calls += 1
+        if calls % self.decimation:
+            return
+        for append, value in zip(self._append_series, (time, realized, unrealized, pnl, inventory)):
+            append(value)
+        if self.max_points is not None and len(self.series) >= self.max_points:
+            self.series.halve()
+            self.decimation *= 2
+
+    def record_pnl_block(self, *columns):
+        # same samples as calling record_pnl once per row of the columns
+        if self.max_points is not None:
+            for row in zip(*(np.asarray(c).tolist() for c in columns)):
+                self.record_pnl(*row)
+            return
+        first = -self._calls % self.decimation
+        self._calls += len(columns[0])
+        self.series.extend(*(np.asarray(c)[first::self.decimation] for c in columns))
+
+    def record_md_block(self, receive_ts, price, bid_price, ask_price):
+        if self.md is not None:
+            self.md.extend(receive_ts, price, bid_price, ask_price)
+
+    def record_trade(self, trade):
+        self.trades.append(trade)
+
+    def record_order(self, order):
+        if self.orders is None:
+            return
+        self.orders.append(order)
+
+    def record_block(self, trades, orders):
+        # fills and orders given as RECORD_DTYPE arrays
+        for log, records, record_type in ((self.trades, trades, 'own_trade'),
+                                          (self.orders, orders, 'limit_order')):
+            if log is None:
+                continue
+            if isinstance(log, SpillFile):
+                log.extend_array(records)
+            else:
+                log.extend(iter_records(records, record_type))
+
+    def market_data(self):
+        # None unless recorded (record_md=True); mid prices are also in the simulator's md_queue
+        if self.md is None:
+            return None
+        return MarketData(*(self.md[name] for name in MD_FIELDS))
+
+    def updates(self):
+        # md and fills in time order (fills at ts i follow the i-th md update), generated lazily
+        trades = iter(self.trades)
+        pending = next(trades, None)
+        md = self.market_data() or ()
+        for i, update in enumerate(md, 1):
+            yield update
+            while pending is not None and pending.ts <= i:
+                yield pending
+                pending = next(trades, None)
+        while pending is not None:
+            yield pending
+            pending = next(trades, None)
+
+    def relocate(self, spill_dir):
+        # move spilled fills / orders to copies in spill_dir (forked runs must not share files)
+        os.makedirs(spill_dir, exist_ok=True)
+        if isinstance(self.trades, SpillFile):
+            self.trades = self.trades.copy_to(os.path.join(spill_dir, 'fills.bin'))
+        if isinstance(self.orders, SpillFile):
+            self.orders = self.orders.copy_to(os.path.join(spill_dir, 'orders.bin'))
+
+    @property
+    def spills(self):
+        return isinstance(self.trades, SpillFile) or isinstance(self.orders, SpillFile)
+
+    def close(self):
+        for log in (self.trades, self.orders):
+            if isinstance(log, SpillFile):
+                log.close()
+
+    @property
+    def nbytes(self):
+        return self.series.nbytes + (self.md.nbytes if self.md is not None else 0)
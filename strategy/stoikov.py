@@ -1,11 +1,15 @@
+import csv
 import math
 import numpy as np
-import pandas as pd
-from collections import OrderedDict
+from strategy.engine import BacktestEngine, Strategy
+from strategy.quotes import HIGH_VOL, NORMAL, QuoteEngine
+from strategy.recorder import Recorder
+from strategy.volatility import LogReturnVolatility, RollingVolatility
 
-class StoikovStrategy:
+class StoikovStrategy(Strategy):
     def __init__(self, sim, gamma, k, sigma, terminal_time, adjust_delay,
-                 order_size, min_order_size, precision):
+                 order_size, min_order_size, precision, lambda_inventory=0.02,
+                 volatility_window=30, volatility_estimator=None, verbose=True, recorder=None):
         self.sim = sim
         self.gamma = gamma
         self.k = k
@@ -15,20 +19,22 @@ class StoikovStrategy:
         self.order_size = order_size
         self.min_order_size = min_order_size
         self.precision = precision
+        self.lambda_inventory = lambda_inventory
+        self.verbose = verbose
 
-        self.md_list = []
-        self.trades_list = []
-        self.updates_list = []
-        self.all_orders = []
-        self.ongoing_orders = OrderedDict()
+        # fills, orders and the PnL series (md too, with Recorder(record_md=True)) go to typed /
+        # spillable storage (strategy.recorder);
+        # the engine routes orders and keeps position / cash (cur_pos / cash)
+        self.recorder = recorder if recorder is not None else Recorder()
+        self.engine = BacktestEngine(self, self.recorder)
 
         self.best_bid = -math.inf
         self.best_ask = math.inf
         self.cur_time = 0
         self.T_minus_t = 1
-        self.cur_pos = 0
 
-        # Risk management
+        # Risk management (external limits, e.g. simulator.portfolio, are the engine's: self.risk)
+        self.max_inventory = 5
         self.max_drawdown = 3000
         self.max_pnl = 0
         self.pause_duration = 30
@@ -36,11 +42,17 @@ class StoikovStrategy:
         self.drawdown_breached = False
 
         # Volatility adaptiveness
-        self.recent_prices = []
-        self.volatility_window = 30
+        self.volatility_window = volatility_window
+        # log returns of the last `volatility_window` central prices (any streaming estimator
+        # from strategy.volatility can be swapped in, e.g. EwmaVolatility)
+        self.recent_prices = LogReturnVolatility(
+            volatility_estimator or RollingVolatility(volatility_window - 1))
         self.volatility_threshold = 0.0015
         self.default_k = k
         self.default_gamma = gamma
+        # quote terms precomputed for the normal and high-volatility regimes
+        self.quotes = QuoteEngine(gamma, k, sigma, lambda_inventory, min_order_size, precision)
+        self.regime = NORMAL
 
         
         self.max_hold_steps = 60  # Max time in one direction
@@ -48,143 +60,171 @@ class StoikovStrategy:
         self.prev_sign = 0
 
         self.pnl = 0
-        self.cash = 0
 
        
         self.logs = []
-        self.realized_pnl_list = []
-        self.unrealized_pnl_list = []
-        self.pnl_list = []
-        self.time_list = []
-
-    def run(self):
-        last_readjust = 0
-        t_min = self.sim.md_queue[0].receive_ts
-        t_max = self.sim.md_queue[-1].receive_ts
-        max_inventory = 5
-
-        while True:
-            self.cur_time, updates = self.sim.tick()
-            if updates is None:
-                break
-
-            self.updates_list += updates
-            for update in updates:
-                if update.type == 'md':
-                    self.best_bid, self.best_ask = update_best_positions(
-                        self.best_bid, self.best_ask, update)
-                    self.md_list.append(update)
-
-            if self.cur_time - last_readjust > self.adjust_delay:
-                last_readjust = self.cur_time
-
-                while self.ongoing_orders:
-                    order_id, _ = self.ongoing_orders.popitem(last=False)
-                    self.sim.cancel_order(self.cur_time, order_id)
-
-                self.T_minus_t = 1 - (self.cur_time - t_min) / (t_max - t_min) if self.terminal_time else 1
-
-                central_price = self.get_central_price()
-                if central_price is None:
-                    continue
-
-                # --- Volatility Adaptation ---
-                self.recent_prices.append(central_price)
-                if len(self.recent_prices) > self.volatility_window:
-                    self.recent_prices.pop(0)
-                    log_returns = [
-                        math.log(self.recent_prices[i + 1] / self.recent_prices[i])
-                        for i in range(len(self.recent_prices) - 1)
-                    ]
-                    volatility = np.std(log_returns)
-
-                    if volatility > self.volatility_threshold:
-                        print(f"⚠️ High volatility: {volatility:.5f}. Increasing risk aversion at t={self.cur_time}")
-                        self.logs.append({'time': self.cur_time, 'event': 'high_volatility'})
-                        self.k = self.default_k * 1.5
-                        self.gamma = self.default_gamma * 1.5
-                    else:
-                        self.k = self.default_k
-                        self.gamma = self.default_gamma
-
-                # --- Max Drawdown Check ---
-                cur_mid = central_price
-                unrealized = self.cur_pos * cur_mid
-                self.pnl = self.cash + unrealized
-                self.max_pnl = max(self.max_pnl, self.pnl)
-                drawdown = self.max_pnl - self.pnl
-
-                self.realized_pnl_list.append(self.cash)
-                self.unrealized_pnl_list.append(unrealized)
-                self.pnl_list.append(self.pnl)
-                self.time_list.append(self.cur_time)
-
-                if drawdown > self.max_drawdown and not self.drawdown_breached:
-                    print(f"‼️ Drawdown = {drawdown:.2f}, pausing trading for {self.pause_duration} steps.")
-                    self.pause_until = self.cur_time + self.pause_duration
-                    self.drawdown_breached = True
-                    self.logs.append({'time': self.cur_time, 'event': 'drawdown_pause'})
-
-                if self.cur_time >= self.pause_until and drawdown < self.max_drawdown and self.drawdown_breached:
-                    print(f"✅ Drawdown recovered. Resuming trading at time {self.cur_time}.")
-                    self.drawdown_breached = False
-                    self.logs.append({'time': self.cur_time, 'event': 'resume_trading'})
-
-                if self.cur_time < self.pause_until:
-                    continue
 
-                
-                current_sign = int(np.sign(self.cur_pos))
-                if current_sign != self.prev_sign:
-                    self.prev_sign = current_sign
-                    self.hold_start_time = self.cur_time
-
-                if abs(self.cur_pos) >= max_inventory and (self.cur_time - self.hold_start_time) > self.max_hold_steps:
-                    print(f"⚠️ Forced unwind at t={self.cur_time} to prevent stuck position.")
-                    
-                    self.place_order(self.cur_time, abs(self.cur_pos), 'ASK' if self.cur_pos > 0 else 'BID', central_price)
-                    self.logs.append({'time': self.cur_time, 'event': 'forced_unwind'})
-                    continue
+    # run() / start() / step() / finish() come from Strategy and drive these callbacks through
+    # self.engine; start() + step() per tick + finish() is how other sources (simulator.live,
+    # simulator.checkpoint, simulator.portfolio) feed the same loop body.
+    def on_start(self, t_min, t_max):
+        self._last_readjust = 0
+        self._t_min = t_min
+        self._t_max = t_max
+        self._t_span = t_max - t_min
+        self._record_md = self.recorder.record_md
+
+    def on_market_data(self, ts, update):
+        self.best_bid, self.best_ask = update_best_positions(self.best_bid, self.best_ask, update)
+        self._record_md(update)
+
+    def on_tick(self, cur_time):
+        self.cur_time = cur_time
+        if self.cur_time - self._last_readjust > self.adjust_delay:
+            self._last_readjust = self.cur_time
+            engine = self.engine
+            engine.cancel_all(self.cur_time)
+
+            self.T_minus_t = 1 - (self.cur_time - self._t_min) / self._t_span if self.terminal_time else 1
+
+            central_price = self.get_central_price()
+            if central_price is None:
+                return
+
+            self._update_volatility(central_price)
+            self._check_drawdown(central_price)
+
+            if self.cur_time < self.pause_until:
+                return
 
             
-                base_spread = self.gamma * self.sigma**2 * self.T_minus_t + \
-                              2 / self.gamma * math.log(1 + self.gamma / self.k)
-                lambda_inventory = 0.02
-                spread = base_spread + lambda_inventory * (abs(self.cur_pos) ** 2)
-                skew = -self.cur_pos * self.gamma * self.sigma**2 * self.T_minus_t
+            current_sign = int(np.sign(self.cur_pos))
+            if current_sign != self.prev_sign:
+                self.prev_sign = current_sign
+                self.hold_start_time = self.cur_time
+
+            if abs(self.cur_pos) >= self.max_inventory and (self.cur_time - self.hold_start_time) > self.max_hold_steps:
+                self._emit(f"⚠️ Forced unwind at t={self.cur_time} to prevent stuck position.")
+                
+                engine.place_order(self.cur_time, abs(self.cur_pos), 'ASK' if self.cur_pos > 0 else 'BID', central_price)
+                self.logs.append({'time': self.cur_time, 'event': 'forced_unwind'})
+                return
 
-                price_bid = round(central_price - spread / 2 + skew, self.precision)
-                price_ask = round(central_price + spread / 2 + skew, self.precision)
+            price_bid, price_ask = self._compute_quotes(central_price)
 
-                if self.cur_pos < max_inventory:
-                    self.place_order(self.cur_time, self.order_size, 'BID', price_bid)
-                if self.cur_pos > -max_inventory:
-                    self.place_order(self.cur_time, self.order_size, 'ASK', price_ask)
+            if self.cur_pos < self.max_inventory:
+                engine.place_order(self.cur_time, self.order_size, 'BID', price_bid)
+            if self.cur_pos > -self.max_inventory:
+                engine.place_order(self.cur_time, self.order_size, 'ASK', price_ask)
 
-        pd.DataFrame(self.logs).to_csv('logs.csv', index=False)
+    def on_finish(self):
+        # the engine has closed the recorder
+        write_logs(self.logs, 'logs.csv')
         return self.trades_list, self.md_list, self.updates_list, self.all_orders
 
+    # Views of the recorded history under the names the plotting scripts use
+    @property
+    def trades_list(self):
+        return self.recorder.trades
+
+    @property
+    def all_orders(self):
+        return self.recorder.orders
+
+    @property
+    def md_list(self):
+        return self.recorder.market_data()
+
+    @property
+    def updates_list(self):
+        # md updates received, as a list (recorder.updates() interleaves the fills as well)
+        return list(self.recorder.market_data() or ())
+
+    @property
+    def time_list(self):
+        return self.recorder.series['time']
+
+    @property
+    def realized_pnl_list(self):
+        return self.recorder.series['realized']
+
+    @property
+    def unrealized_pnl_list(self):
+        return self.recorder.series['unrealized']
+
+    @property
+    def pnl_list(self):
+        return self.recorder.series['pnl']
+
+    # Phases of run() are methods so that simulator.profiling can time them without any
+    # overhead when profiling is off.
+    def _update_volatility(self, central_price):
+        self.recent_prices.update(central_price)
+        if self.recent_prices.estimator.count >= self.volatility_window:
+            volatility = self.recent_prices.std
+
+            if volatility > self.volatility_threshold:
+                self._emit(f"⚠️ High volatility: {volatility:.5f}. Increasing risk aversion at t={self.cur_time}")
+                self.logs.append({'time': self.cur_time, 'event': 'high_volatility'})
+                self.regime = HIGH_VOL
+            else:
+                self.regime = NORMAL
+            self.gamma = self.quotes.gammas[self.regime]
+            self.k = self.quotes.ks[self.regime]
+
+    def _check_drawdown(self, central_price):
+        cur_mid = central_price
+        unrealized = self.cur_pos * cur_mid
+        self.pnl = self.cash + unrealized
+        self.max_pnl = max(self.max_pnl, self.pnl)
+        drawdown = self.max_pnl - self.pnl
+
+        self.recorder.record_pnl(self.cur_time, self.cash, unrealized, self.pnl, self.cur_pos)
+
+        if drawdown > self.max_drawdown and not self.drawdown_breached:
+            self._emit(f"‼️ Drawdown = {drawdown:.2f}, pausing trading for {self.pause_duration} steps.")
+            self.pause_until = self.cur_time + self.pause_duration
+            self.drawdown_breached = True
+            self.logs.append({'time': self.cur_time, 'event': 'drawdown_pause'})
+
+        if self.cur_time >= self.pause_until and drawdown < self.max_drawdown and self.drawdown_breached:
+            self._emit(f"✅ Drawdown recovered. Resuming trading at time {self.cur_time}.")
+            self.drawdown_breached = False
+            self.logs.append({'time': self.cur_time, 'event': 'resume_trading'})
+
+    def _compute_quotes(self, central_price):
+        return self.quotes.quote(self.regime, central_price, self.cur_pos, self.T_minus_t)
+
+    def set_quote_params(self, **params):
+        # Change any of quotes.QUOTE_PARAMS mid-run; quote tables are rebuilt
+        for name, value in params.items():
+            setattr(self, name, value)
+        self.default_gamma = params.get('gamma', self.default_gamma)
+        self.default_k = params.get('k', self.default_k)
+        self.quotes.set_params(**params)
+        self.gamma = self.quotes.gammas[self.regime]
+        self.k = self.quotes.ks[self.regime]
+
+    def _emit(self, message):
+        if self.verbose:
+            print(message)
+
     def get_central_price(self):
         if self.best_bid == -math.inf or self.best_ask == math.inf:
             return None
         midprice = (self.best_bid + self.best_ask) / 2
-        indiff_price = midprice - (self.cur_pos / self.min_order_size) * \
-                       self.gamma * self.sigma**2 * self.T_minus_t
-        return indiff_price
-
-    def place_order(self, ts, size, side, price):
-        order = self.sim.place_order(ts, size, side, price)
-        if getattr(order, 'type', None) == 'own_trade':
-            self.trades_list.append(order)
-            if order.side == 'BID':
-                self.cur_pos += order.size
-                self.cash -= order.size * order.price
-            else:
-                self.cur_pos -= order.size
-                self.cash += order.size * order.price
-        else:
-            self.ongoing_orders[order.order_id] = order
-            self.all_orders.append(order)
+        return self.quotes.central_price(self.regime, midprice, self.cur_pos, self.T_minus_t)
+
+def write_logs(logs, path):
+    # logs.csv with one column per key (in order of first appearance), like DataFrame.to_csv
+    fields = list(dict.fromkeys(key for log in logs for key in log))
+    with open(path, 'w', newline='') as f:
+        if not fields:
+            f.write('\n')
+            return
+        writer = csv.DictWriter(f, fields, lineterminator='\n')
+        writer.writeheader()
+        writer.writerows(logs)
 
 def update_best_positions(best_bid, best_ask, update):
     if update.bid_price is not None:
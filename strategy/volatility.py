@@ -0,0 +1,150 @@
+import math
+
+import numpy as np
+
+# Incremental volatility estimators. All streaming estimators work on Python floats or on
+# NumPy arrays of any shape (one value per lane), so the scalar strategy and the batch engine
+# share the same code.
+
+
+class RollingVolatility:
+    # Standard deviation over the last `window` values: ring buffer + sliding Welford updates,
+    # O(1) per update. The mean/M2 are recomputed exactly each time the ring wraps (amortized
+    # O(1)) so rounding error cannot accumulate over long runs.
+    def __init__(self, window, ddof=0):
+        if window < 1:
+            raise ValueError("window must be >= 1")
+        self.window = window
+        self.ddof = ddof
+        self.count = 0
+        self._buf = [0.0] * window
+        self._i = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, x):
+        if self.count < self.window:
+            delta = x - self._mean
+            self._mean = self._mean + delta / (self.count + 1)
+            self._m2 = self._m2 + delta * (x - self._mean)
+        else:
+            old = self._buf[self._i]
+            delta = x - old
+            new_mean = self._mean + delta / self.window
+            self._m2 = self._m2 + delta * (x - new_mean + old - self._mean)
+            self._mean = new_mean
+        self._buf[self._i] = x
+        self.count += 1
+        self._i += 1
+        if self._i == self.window:
+            self._i = 0
+            self._recompute()
+
+    def _recompute(self):
+        mean = sum(self._buf) / self.window
+        self._mean = mean
+        self._m2 = sum((v - mean) * (v - mean) for v in self._buf)
+
+    @property
+    def ready(self):
+        return self.count >= self.window
+
+    @property
+    def mean(self):
+        return self._mean
+
+    @property
+    def variance(self):
+        n = min(self.count, self.window) - self.ddof
+        if n <= 0:
+            return 0.0
+        var = self._m2 / n
+        return var * (var > 0)  # clamp tiny negative rounding residue, works for floats and arrays
+
+    @property
+    def std(self):
+        return self.variance ** 0.5
+
+
+class EwmaVolatility:
+    # Exponentially weighted std: alpha = 2 / (span + 1), or pass alpha directly.
+    def __init__(self, span=30, alpha=None):
+        self.alpha = alpha if alpha is not None else 2.0 / (span + 1)
+        self.count = 0
+        self._mean = 0.0
+        self._var = 0.0
+
+    def update(self, x):
+        if self.count == 0:
+            self._mean = x
+            self._var = x * 0.0
+        else:
+            diff = x - self._mean
+            incr = self.alpha * diff
+            self._mean = self._mean + incr
+            self._var = (1 - self.alpha) * (self._var + diff * incr)
+        self.count += 1
+
+    @property
+    def mean(self):
+        return self._mean
+
+    @property
+    def variance(self):
+        return self._var
+
+    @property
+    def std(self):
+        return self._var ** 0.5
+
+
+class LogReturnVolatility:
+    # Feeds log returns of a price stream into a streaming estimator.
+    def __init__(self, estimator):
+        self.estimator = estimator
+        self.last_price = None
+
+    def update(self, price):
+        if self.last_price is not None:
+            ratio = price / self.last_price
+            self.estimator.update(math.log(ratio) if isinstance(ratio, float) else np.log(ratio))
+        self.last_price = price
+
+    @property
+    def std(self):
+        return self.estimator.std
+
+
+# --- Range-based (OHLC) per-bar variance estimators, vectorized over whole columns ---
+
+def parkinson_variance(high, low):
+    hl = np.log(np.asarray(high, dtype=float) / np.asarray(low, dtype=float))
+    return hl * hl / (4.0 * np.log(2.0))
+
+
+def garman_klass_variance(open_, high, low, close):
+    hl = np.log(np.asarray(high, dtype=float) / np.asarray(low, dtype=float))
+    co = np.log(np.asarray(close, dtype=float) / np.asarray(open_, dtype=float))
+    return 0.5 * hl * hl - (2.0 * np.log(2.0) - 1.0) * co * co
+
+
+def rolling_volatility(per_bar_variance, window):
+    # sqrt of the trailing `window`-bar mean of per-bar variances (NaN until the window is full),
+    # computed with one cumulative sum.
+    v = np.asarray(per_bar_variance, dtype=float)
+    out = np.full(len(v), np.nan)
+    if len(v) >= window:
+        c = np.concatenate(([0.0], np.cumsum(v)))
+        out[window - 1:] = np.sqrt(np.maximum((c[window:] - c[:-window]) / window, 0.0))
+    return out
+
+
+def ohlc_volatility(md_queue, window, method='garman_klass'):
+    # Per-bar rolling volatility from the MarketData OHLC columns.
+    if method == 'parkinson':
+        v = parkinson_variance(md_queue.high, md_queue.low)
+    elif method == 'garman_klass':
+        v = garman_klass_variance(md_queue.open, md_queue.high, md_queue.low, md_queue.price)
+    else:
+        raise ValueError(f"unknown OHLC volatility method: {method}")
+    return rolling_volatility(v, window)
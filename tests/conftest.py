@@ -0,0 +1,37 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DATA = os.path.join(ROOT, 'BTCUSDT_1min.csv')
+
+
+@pytest.fixture(autouse=True)
+def _workdir(tmp_path, monkeypatch):
+    # strategies write logs.csv (and plots) into the working directory
+    monkeypatch.chdir(tmp_path)
+
+
+@pytest.fixture
+def data_path():
+    return DATA
+
+
+@pytest.fixture
+def make_stoikov():
+    # StoikovStrategy on a fresh RealDataSim(data, seed=seed) with main.py's settings
+    from simulator.real_data_sim import RealDataSim
+    from strategy.stoikov import StoikovStrategy
+
+    def make(seed=7, data=DATA, sim=None, **params):
+        sim = sim if sim is not None else RealDataSim(data, seed=seed)
+        settings = dict(gamma=0.05, k=1.5, terminal_time=True, adjust_delay=1, order_size=1,
+                        min_order_size=1, precision=2)
+        settings.update(params)
+        if 'sigma' not in settings:
+            settings['sigma'] = sim.realized_sigma
+        return StoikovStrategy(sim=sim, **settings)
+    return make
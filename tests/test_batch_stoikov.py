@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+from simulator.real_data_sim import RealDataSim
+from strategy.batch_stoikov import BatchStoikovEngine, param_grid
+
+
+def test_lane_matches_scalar_run_with_its_seed(data_path, make_stoikov):
+    grid = param_grid(gamma=[0.01, 0.2], k=[0.5, 1.5], lambda_inventory=[0.0, 0.02], order_size=[1, 2])
+    seeds = list(range(100, 100 + len(grid['gamma'])))
+    sim = RealDataSim(data_path)
+    res = BatchStoikovEngine(sim, sigma=sim.realized_sigma, seeds=seeds, **grid).run()
+
+    for lane, seed in enumerate(seeds):
+        strategy = make_stoikov(seed, **{name: values[lane] for name, values in grid.items()})
+        trades, _, _, orders = strategy.run()
+        assert len(trades) == res.n_trades[lane]
+        assert len(orders) == res.n_orders[lane]
+        assert strategy.cur_pos == res.cur_pos[lane]
+        assert strategy.pnl_list[-1] == res.final_pnl[lane]
+        assert np.array_equal(strategy.time_list, res.time)
+        assert np.array_equal(strategy.pnl_list, res.pnl[lane])
+
+
+def test_seeds_must_match_lanes(data_path):
+    sim = RealDataSim(data_path)
+    with pytest.raises(ValueError):
+        BatchStoikovEngine(sim, gamma=[0.05, 0.1], k=1.5, sigma=0.02, seeds=[1])
@@ -0,0 +1,61 @@
+import pytest
+
+from simulator import checkpoint
+from strategy.kernel import compare_runs
+from strategy.recorder import Recorder
+
+
+def test_resume_from_checkpoint_matches_uninterrupted_run(make_stoikov, tmp_path):
+    path = str(tmp_path / 'warm.ckpt')
+    uninterrupted = make_stoikov(seed=7)
+    uninterrupted.run()
+
+    checkpoint.warm_up(make_stoikov(seed=7), 400, path)
+    resumed = checkpoint.load(path)
+    checkpoint.resume(resumed)
+    assert compare_runs(uninterrupted, resumed) == []
+    assert resumed.engine.n_orders == uninterrupted.engine.n_orders
+
+
+def test_periodic_checkpoints_resume_exactly(make_stoikov, tmp_path):
+    path = str(tmp_path / 'run.ckpt')
+    uninterrupted = make_stoikov(seed=3)
+    uninterrupted.run()
+
+    interrupted = make_stoikov(seed=3)
+    checkpoint.resume(interrupted, every=250, path=path, until=600)  # last save at tick 500
+    resumed = checkpoint.load(path)
+    assert resumed.sim.t == 500
+    checkpoint.resume(resumed)
+    assert compare_runs(uninterrupted, resumed) == []
+
+
+def test_resume_with_spilled_history(make_stoikov, tmp_path):
+    uninterrupted = make_stoikov(seed=5, recorder=Recorder(spill_dir=str(tmp_path / 'a')))
+    uninterrupted.run()
+
+    path = str(tmp_path / 'warm.ckpt')
+    checkpoint.warm_up(make_stoikov(seed=5, recorder=Recorder(spill_dir=str(tmp_path / 'b'))), 300, path)
+    resumed = checkpoint.load(path)
+    checkpoint.resume(resumed)
+    assert compare_runs(uninterrupted, resumed) == []
+
+
+def test_fork_without_changes_continues_the_run(make_stoikov, tmp_path):
+    path = str(tmp_path / 'warm.ckpt')
+    uninterrupted = make_stoikov(seed=7)
+    uninterrupted.run()
+    checkpoint.warm_up(make_stoikov(seed=7), 400, path)
+
+    same, wider = checkpoint.fork(path, [{}, {'gamma': 0.2}])
+    checkpoint.resume(same)
+    checkpoint.resume(wider)
+    assert compare_runs(uninterrupted, same) == []
+    assert compare_runs(uninterrupted, wider) != []
+
+
+def test_fork_rejects_unknown_parameters(make_stoikov, tmp_path):
+    path = str(tmp_path / 'warm.ckpt')
+    checkpoint.warm_up(make_stoikov(seed=7), 100, path)
+    with pytest.raises(ValueError):
+        checkpoint.fork(path, [{'no_such_parameter': 1}])
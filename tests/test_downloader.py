@@ -0,0 +1,63 @@
+import asyncio
+import os
+
+import numpy as np
+import pytest
+
+from simulator import tick_cache
+from simulator.downloader import StubExchange, download, store_path, sync_store
+from simulator.real_data_sim import RealDataSim
+
+DAY = 86_400_000
+START = 1709251200000  # 2024-03-01T00:00:00Z
+PAIRS = [('BTC/USDT', '1m'), ('ETH/USDT', '5m')]
+
+
+def _columns(path):
+    _, cols = tick_cache.open_columns(path)
+    return {name: np.array(cols[name]) for name, _ in tick_cache.CACHE_COLUMNS}
+
+
+def test_store_names_match_the_bundled_data(tmp_path):
+    assert os.path.basename(store_path(tmp_path, 'BTC/USDT', '1m')) == 'BTCUSDT_1min.ticks'
+    assert os.path.basename(store_path(tmp_path, 'ETH/USDT', '1h')) == 'ETHUSDT_1h.ticks'
+
+
+def test_resumed_download_matches_one_full_download(tmp_path):
+    full_dir, resumed_dir = str(tmp_path / 'full'), str(tmp_path / 'resumed')
+    added = asyncio.run(download(StubExchange(START, now=START + 2 * DAY, max_limit=500), PAIRS, full_dir, since=START))
+    assert added == {('BTC/USDT', '1m'): 2880, ('ETH/USDT', '5m'): 576}
+
+    # first day, then resume: only the new closed bars are fetched and appended
+    first = asyncio.run(download(StubExchange(START, now=START + DAY, max_limit=500), PAIRS, resumed_dir, since=START))
+    assert first == {('BTC/USDT', '1m'): 1440, ('ETH/USDT', '5m'): 288}
+    exchange = StubExchange(START, now=START + 2 * DAY, max_limit=500)
+    second = asyncio.run(download(exchange, PAIRS, resumed_dir, since=START))
+    assert second == {('BTC/USDT', '1m'): 1440, ('ETH/USDT', '5m'): 288}
+    again = asyncio.run(download(exchange, PAIRS, resumed_dir, since=START))
+    assert again == {('BTC/USDT', '1m'): 0, ('ETH/USDT', '5m'): 0}
+
+    for symbol, timeframe in PAIRS:
+        full, resumed = (_columns(store_path(d, symbol, timeframe)) for d in (full_dir, resumed_dir))
+        for name in full:
+            assert np.array_equal(full[name], resumed[name]), (symbol, timeframe, name)
+        assert np.all(np.diff(full['timestamp']) > 0)
+
+
+def test_network_errors_are_retried(tmp_path):
+    exchange = StubExchange(START, now=START + DAY, max_limit=500, fail_every=2)
+    added = asyncio.run(download(exchange, PAIRS[:1], str(tmp_path), since=START))
+    assert added == {('BTC/USDT', '1m'): 1440}
+
+
+def test_store_of_another_pair_is_rejected(tmp_path):
+    path = store_path(str(tmp_path), 'BTC/USDT', '1m')
+    asyncio.run(sync_store(StubExchange(START, now=START + DAY), 'BTC/USDT', '1m', path, START))
+    with pytest.raises(ValueError):
+        asyncio.run(sync_store(StubExchange(START, now=START + DAY), 'ETH/USDT', '1m', path, START))
+
+
+def test_store_is_read_for_the_csv_name(tmp_path):
+    asyncio.run(download(StubExchange(START, now=START + DAY), PAIRS[:1], str(tmp_path), since=START))
+    sim = RealDataSim(str(tmp_path / 'BTCUSDT_1min.csv'))  # no CSV: the fetched store is used
+    assert len(sim.md_queue) == 1440
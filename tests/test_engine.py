@@ -0,0 +1,37 @@
+import pickle
+
+from simulator.minimal_sim import MinimalSim
+from simulator.orders import Order
+from simulator.real_data_sim import RealDataSim
+from strategy.naive_mm import NaiveMMStrategy
+from strategy.recorder import Recorder
+
+
+def test_every_simulator_order_has_a_type(data_path):
+    for sim in (MinimalSim(T=50, seed=1), RealDataSim(data_path, seed=1)):
+        sim.tick()
+        orders = [sim.place_order(1, 1, side, price) for side in ('BID', 'ASK') for price in (1.0, 1e9)]
+        assert all(type(o) is Order and o.type in ('limit_order', 'own_trade') for o in orders)
+
+
+def test_engine_counts_resting_orders_and_books_fills(data_path):
+    strategy = NaiveMMStrategy(RealDataSim(data_path, seed=3), base_spread=5, volatility_multiplier=2.0,
+                               recorder=Recorder(record_orders=True))
+    trades, _ = strategy.run()
+    engine = strategy.engine
+    assert engine.n_orders == len(engine.recorder.orders) > 0
+    assert all(o.type == 'limit_order' for o in engine.recorder.orders)
+    assert engine.position == sum(t.size if t.side == 'BID' else -t.size for t in trades)
+    assert engine.cash == sum(t.size * t.price if t.side == 'ASK' else -t.size * t.price for t in trades)
+
+
+def test_stoikov_runs_on_minimal_sim(make_stoikov):
+    strategy = make_stoikov(sim=MinimalSim(T=300, seed=4), sigma=0.1)
+    trades, _, _, orders = strategy.run()
+    assert trades and len(orders) == strategy.engine.n_orders
+
+
+def test_orders_pickle():
+    order = pickle.loads(pickle.dumps(Order(1, 2, 'BID', 1, 100.0, 'limit_order')))
+    assert (order.order_id, order.ts, order.side, order.size, order.price, order.type) == \
+        (1, 2, 'BID', 1, 100.0, 'limit_order')
@@ -0,0 +1,42 @@
+import pytest
+
+from simulator.order_book import OrderBookSim
+from strategy.kernel import HAVE_NUMBA, compare_runs, run_compiled
+from strategy.recorder import Recorder
+
+CONFIGS = [
+    dict(seed=7),
+    dict(seed=3, gamma=0.5, k=0.5, order_size=2),
+    dict(seed=3, gamma=0.01, k=3.0, order_size=0.5, adjust_delay=2, terminal_time=False, volatility_window=10),
+    dict(seed=4, recorder=lambda spill_dir: Recorder(decimation=3)),
+    dict(seed=4, recorder=lambda spill_dir: Recorder(max_points=100)),
+    dict(seed=5, recorder=lambda spill_dir: Recorder(record_md=True, spill_dir=spill_dir)),
+]
+
+
+@pytest.mark.parametrize('compiled', [False, pytest.param(True, marks=pytest.mark.skipif(
+    not HAVE_NUMBA, reason='numba is not installed'))])
+@pytest.mark.parametrize('config', CONFIGS)
+def test_run_compiled_matches_run(make_stoikov, config, compiled, tmp_path):
+    config = dict(config)
+    recorder = config.pop('recorder', None)
+    reference, fast = (make_stoikov(verbose=True, recorder=recorder(str(tmp_path / name)) if recorder else None,
+                                    **config) for name in ('reference', 'fast'))
+    expected = reference.run()
+    result = run_compiled(fast, compiled=compiled)
+
+    assert compare_runs(reference, fast) == []
+    assert len(result[0]) == len(expected[0])
+    assert reference.sim.t == fast.sim.t
+
+
+def test_rejects_unsupported_simulators(data_path, make_stoikov):
+    with pytest.raises(TypeError):
+        run_compiled(make_stoikov(sim=OrderBookSim(data_path, seed=1)))
+
+
+def test_rejects_a_started_run(make_stoikov):
+    strategy = make_stoikov()
+    strategy.sim.tick()
+    with pytest.raises(ValueError):
+        run_compiled(strategy)
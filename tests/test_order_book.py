@@ -0,0 +1,39 @@
+import pytest
+
+from simulator.order_book import OrderBook, RestingOrder
+
+
+def _book(*orders):
+    book = OrderBook()
+    for order_id, side, price, queue_ahead in orders:
+        book.add(RestingOrder(order_id, 0, side, price, 1.0, queue_ahead))
+    return book
+
+
+def test_traded_volume_works_down_the_queue_at_every_level():
+    # bar 90..110, volume 20, touch volume 2: 11 traded through 100, 6.5 through 95, 2 at 90
+    book = _book((1, 'BID', 100.0, 5.0), (2, 'BID', 95.0, 5.0), (3, 'BID', 90.0, 5.0))
+    trades = book.match(1, 90.0, 110.0, 20.0, 2.0)
+    assert [(t.order_id, t.size) for t in trades] == [(1, 1.0), (2, 0.5)]
+    assert book.orders[2].queue_ahead == 0.0
+    assert book.orders[3].queue_ahead == pytest.approx(4.5)  # 2 at the low less our 1.5 filled above
+
+
+def test_crossed_level_does_not_fill_through_a_long_queue():
+    book = _book((1, 'ASK', 95.0, 50.0))
+    assert book.match(1, 90.0, 100.0, 10.0, 1.0) == []
+    assert book.orders[1].queue_ahead == pytest.approx(50.0 - (1.0 + 9.0 * 0.5))
+
+
+def test_queue_drains_over_several_bars():
+    book = _book((1, 'BID', 100.0, 3.0))
+    assert book.match(1, 100.0, 101.0, 20.0, 2.0) == []
+    trades = book.match(2, 100.0, 101.0, 20.0, 2.0)
+    assert [(t.order_id, t.size) for t in trades] == [(1, 1.0)]
+    assert not book.orders
+
+
+def test_untouched_levels_keep_their_queue():
+    book = _book((1, 'BID', 80.0, 5.0), (2, 'ASK', 120.0, 5.0))
+    assert book.match(1, 90.0, 110.0, 20.0, 2.0) == []
+    assert book.orders[1].queue_ahead == book.orders[2].queue_ahead == 5.0
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from simulator.real_data_sim import RealDataSim
+from strategy.naive_mm import NaiveMMStrategy
+
+
+def _ticks(sim):
+    out = []
+    while True:
+        ts, updates = sim.tick()
+        if updates is None:
+            return out
+        out.extend((ts, u.type, u.receive_ts, u.price, u.bid_price, u.ask_price) for u in updates)
+
+
+@pytest.mark.parametrize('chunksize', [1, 97, 1000, 5000])
+def test_chunked_replay_matches_in_memory(data_path, chunksize):
+    in_memory = RealDataSim(data_path, seed=1, use_cache=False)
+    chunked = RealDataSim(data_path, seed=1, chunksize=chunksize)
+    assert len(chunked.md_queue) == len(in_memory.md_queue)
+    assert chunked.realized_sigma == pytest.approx(in_memory.realized_sigma, rel=1e-12)
+    assert _ticks(chunked) == _ticks(in_memory)
+
+
+def test_stoikov_on_chunked_data_matches_in_memory(data_path, make_stoikov):
+    in_memory = RealDataSim(data_path, seed=7, use_cache=False)
+    reference = make_stoikov(sim=in_memory)
+    chunked = make_stoikov(sim=RealDataSim(data_path, seed=7, chunksize=128), sigma=in_memory.realized_sigma)
+    trades, _, _, orders = reference.run()
+    chunked_trades, _, _, chunked_orders = chunked.run()
+
+    fills = lambda log: [(t.order_id, t.ts, t.side, t.size, t.price) for t in log]
+    assert fills(chunked_trades) == fills(trades)
+    assert fills(chunked_orders) == fills(orders)
+    assert np.array_equal(chunked.pnl_list, reference.pnl_list)
+    assert chunked.logs == reference.logs
+
+
+def test_naive_on_chunked_data_matches_in_memory(data_path):
+    runs = [NaiveMMStrategy(RealDataSim(data_path, seed=3, **kwargs), base_spread=5, volatility_multiplier=2.0)
+            for kwargs in ({'use_cache': False}, {'chunksize': 250})]
+    (trades, mids), (chunked_trades, chunked_mids) = (strategy.run() for strategy in runs)
+    assert [(t.ts, t.side, t.price) for t in chunked_trades] == [(t.ts, t.side, t.price) for t in trades]
+    assert chunked_mids == mids
+    assert runs[1].cash == runs[0].cash